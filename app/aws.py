@@ -0,0 +1,9 @@
+from functools import lru_cache
+
+
+# boto3 takes a while to import and set up, so only pay for it once per process and only if s3 is used.
+# A warm lambda container keeps the resource, and its connection pool, between invocations.
+@lru_cache(maxsize=None)
+def s3_resource():
+    import boto3
+    return boto3.resource("s3")
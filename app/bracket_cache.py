@@ -0,0 +1,177 @@
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .aws import s3_resource
+
+if TYPE_CHECKING:
+    import requests
+
+    from .bracket_fetcher import BracketFetcher
+
+BRACKET_FILE_NAME = "bracket.json"
+SCF_TITLE = "Stanley Cup Final"
+DEFAULT_TTL_SECONDS = 5 * 60
+
+
+@dataclass
+class CachedBracket:
+    payload: dict
+    etag: str
+    last_modified: str
+    fetched_at: float
+
+    def is_season_complete(self) -> bool:
+        for series in self.payload.get("series", []):
+            if series.get("seriesTitle") != SCF_TITLE:
+                continue
+            return max(series.get("topSeedWins", 0), series.get("bottomSeedWins", 0)) == 4
+        return False
+
+    def is_fresh(self, ttl_seconds: int) -> bool:
+        return time.time() - self.fetched_at < ttl_seconds
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "fetched_at": self.fetched_at,
+            "payload": self.payload
+        })
+
+    @staticmethod
+    def from_json(raw: str) -> "CachedBracket":
+        record = json.loads(raw)
+        return CachedBracket(
+            payload=record["payload"],
+            etag=record.get("etag"),
+            last_modified=record.get("last_modified"),
+            fetched_at=record.get("fetched_at", 0)
+        )
+
+
+class DiskStorage:
+    # stores each bracket next to that year's csvs, ie 2024/bracket.json
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, year: int) -> str:
+        return os.path.join(self.root, str(year), BRACKET_FILE_NAME)
+
+    def read(self, year: int) -> CachedBracket:
+        path = self._path(year)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return CachedBracket.from_json(f.read())
+
+    def write(self, year: int, record: CachedBracket):
+        path = self._path(year)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(record.to_json())
+
+
+class S3Storage:
+    # same layout as DiskStorage but in the bucket, ie s3://bucket/2024/bracket.json
+    def __init__(self, bucket_name: str):
+        self.bucket = s3_resource().Bucket(bucket_name)
+
+    def _key(self, year: int) -> str:
+        return f"{year}/{BRACKET_FILE_NAME}"
+
+    def read(self, year: int) -> CachedBracket:
+        try:
+            body = self.bucket.Object(self._key(year)).get()["Body"].read()
+        except self.bucket.meta.client.exceptions.NoSuchKey:
+            return None
+        return CachedBracket.from_json(body.decode("utf-8"))
+
+    def write(self, year: int, record: CachedBracket):
+        self.bucket.put_object(
+            Key=self._key(year),
+            Body=record.to_json().encode("utf-8"),
+            ContentType="application/json"
+        )
+
+
+class BracketCache:
+    def __init__(
+        self,
+        storage,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        offline: bool = False,
+        fetcher: "BracketFetcher" = None
+    ):
+        self.storage = storage
+        self.ttl_seconds = ttl_seconds
+        self.offline = offline
+        self.fetcher = fetcher
+        # year -> size of the body the api sent on the last get, 0 if it came from storage or was a 304
+        self.fetched_bytes: dict[int, int] = {}
+
+    def get(self, year: int, url: str) -> dict:
+        return self.get_many({year: url})[year]
+
+    def get_many(self, urls: dict[int, str]) -> dict[int, dict]:
+        payloads: dict[int, dict] = {}
+        stale: dict[int, CachedBracket] = {}
+        for year in urls:
+            self.fetched_bytes[year] = 0
+            cached = self.storage.read(year)
+            if self.offline:
+                if cached is None:
+                    raise Exception(f"No recorded bracket for {year}, cannot run offline")
+                payloads[year] = cached.payload
+            # a finished season can never change so never ask again
+            elif cached and (cached.is_season_complete() or cached.is_fresh(self.ttl_seconds)):
+                payloads[year] = cached.payload
+            else:
+                stale[year] = cached
+
+        if not stale:
+            return payloads
+
+        for year in stale:
+            print(f"Calling API: {urls[year]}")
+        responses = self._get_fetcher().fetch_all({
+            year: (urls[year], self._conditional_headers(cached))
+            for year, cached in stale.items()
+        })
+        for year, response in responses.items():
+            payloads[year] = self._store(year, stale[year], response)
+        return payloads
+
+    def _get_fetcher(self) -> "BracketFetcher":
+        # requests is slow to import, so it only comes in once a bracket actually needs fetching
+        if self.fetcher is None:
+            from .bracket_fetcher import BracketFetcher
+            self.fetcher = BracketFetcher()
+        return self.fetcher
+
+    def _conditional_headers(self, cached: CachedBracket) -> dict[str, str]:
+        headers = {}
+        if cached and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached and cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+        return headers
+
+    def _store(self, year: int, cached: CachedBracket, response: "requests.Response") -> dict:
+        if response.status_code == 304:
+            cached.fetched_at = time.time()
+            self.storage.write(year, cached)
+            return cached.payload
+
+        response.raise_for_status()
+        self.fetched_bytes[year] = len(response.content)
+        record = CachedBracket(
+            payload=response.json(),
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            fetched_at=time.time()
+        )
+        self.storage.write(year, record)
+        return record.payload
@@ -0,0 +1,117 @@
+import asyncio
+import random
+from typing import Hashable
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT_SECONDS = 10
+DEFAULT_DEADLINE_SECONDS = 30
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF_SECONDS = 0.5
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class BracketFetcher:
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+        deadline_seconds: float = DEFAULT_DEADLINE_SECONDS,
+        retries: int = DEFAULT_RETRIES,
+        backoff_seconds: float = DEFAULT_BACKOFF_SECONDS
+    ):
+        self.concurrency = concurrency
+        self.timeout_seconds = timeout_seconds
+        self.deadline_seconds = deadline_seconds
+        self.retries = retries
+        self.backoff_seconds = backoff_seconds
+
+        # one keep-alive pool shared by every request, sized to the concurrency limit
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def fetch(self, url: str, headers: dict = None) -> requests.Response:
+        return asyncio.run(self.fetch_async(url, headers))
+
+    def fetch_all(self, requests_by_key: dict[Hashable, tuple[str, dict]]) -> dict[Hashable, requests.Response]:
+        return asyncio.run(self.fetch_all_async(requests_by_key))
+
+    async def fetch_all_async(
+        self,
+        requests_by_key: dict[Hashable, tuple[str, dict]]
+    ) -> dict[Hashable, requests.Response]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        keys = list(requests_by_key.keys())
+        responses = await asyncio.gather(*(
+            self.fetch_async(url, headers, semaphore)
+            for url, headers in requests_by_key.values()
+        ))
+        return dict(zip(keys, responses))
+
+    async def fetch_async(
+        self,
+        url: str,
+        headers: dict = None,
+        semaphore: asyncio.Semaphore = None
+    ) -> requests.Response:
+        # the deadline covers every attempt and the backoff between them, not each attempt on its own
+        semaphore = semaphore or asyncio.Semaphore(1)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline_seconds
+        for attempt in range(self.retries + 1):
+            is_last_attempt = attempt == self.retries
+            try:
+                response = await self._get(url, headers, semaphore, deadline)
+                if response.status_code not in RETRY_STATUS_CODES or is_last_attempt:
+                    return response
+                response.close()  # hand its connection back to the pool before trying again
+            except (requests.ConnectionError, requests.Timeout):
+                if is_last_attempt:
+                    raise
+            backoff = self._backoff(attempt)
+            if loop.time() + backoff >= deadline:
+                raise asyncio.TimeoutError(f"Gave up on {url} after {attempt + 1} attempts")
+            await asyncio.sleep(backoff)
+
+    async def _get(
+        self,
+        url: str,
+        headers: dict,
+        semaphore: asyncio.Semaphore,
+        deadline: float
+    ) -> requests.Response:
+        # a thread can't be cancelled, so one that's still waiting on the server at the deadline keeps its
+        # slot until it returns. Giving the slot back early would let a slow server get more requests than
+        # the concurrency limit, exactly when it's struggling.
+        loop = asyncio.get_running_loop()
+        await asyncio.wait_for(semaphore.acquire(), deadline - loop.time())
+        seconds_left = deadline - loop.time()
+        if seconds_left <= 0:
+            semaphore.release()
+            raise asyncio.TimeoutError()
+        request = asyncio.ensure_future(asyncio.to_thread(
+            self.session.get,
+            url,
+            headers=headers or {},
+            timeout=min(self.timeout_seconds, seconds_left)
+        ))
+        request.add_done_callback(lambda _: semaphore.release())
+        try:
+            return await asyncio.wait_for(asyncio.shield(request), seconds_left)
+        except asyncio.TimeoutError:
+            request.add_done_callback(_close_abandoned)
+            raise
+
+    def _backoff(self, attempt: int) -> float:
+        # full jitter so concurrent retries don't all land on the server at once
+        return random.uniform(0, self.backoff_seconds * 2 ** attempt)
+
+
+def _close_abandoned(request: asyncio.Future):
+    # nobody is waiting on the response any more, so free its connection
+    if not request.cancelled() and request.exception() is None:
+        request.result().close()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import json
+import os
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# serves one bracket file as if it were api-web.nhle.com, for running the live daemon without the real api.
+# The file is read on every request, so editing its wins plays out a game.
+def make_handler(path: str) -> type[BaseHTTPRequestHandler]:
+    class BracketHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with open(path, 'rb') as f:
+                raw = f.read()
+            record = json.loads(raw)
+            if "payload" in record:
+                raw = json.dumps(record["payload"]).encode("utf-8")  # a recorded YEAR/bracket.json
+            etag = f'"{hashlib.sha256(raw).hexdigest()[:16]}"'
+
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", formatdate(os.path.getmtime(path), usegmt=True))
+            self.end_headers()
+            self.wfile.write(raw)
+
+    return BracketHandler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("bracket", help="a playoff-bracket api response or a recorded YEAR/bracket.json")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("localhost", args.port), make_handler(args.bracket))
+    print(f"Serving {args.bracket} on http://localhost:{args.port}/")
+    server.serve_forever()
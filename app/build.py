@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .bracket_cache import BracketCache, DiskStorage
+from .csv_to_html import render, write_html
+from .history import DiskHistoryStorage, HistoryIndex, S3HistoryStorage, Season, load_history, save_history
+from .history_html import write_history_pages
+from .nhl_api_handler import NHL_API_URL
+from .page_shards import PageShards, write_shards
+from .pick_store import PICK_STORE_FILE_NAME, PickStore, compile_store, is_store_current
+from .standings_feed import StandingsFeed, read_feed, write_feed
+
+MANIFEST_FILE_NAME = "build_manifest.json"
+
+
+def parse_years(years_arg: str) -> list[int]:
+    years = []
+    for part in years_arg.split(","):
+        if "-" in part:
+            start, end = map(int, part.split("-"))
+            years.extend(range(start, end + 1))
+        else:
+            years.append(int(part))
+    return years
+
+
+def hash_inputs(year: int, payload: dict) -> str:
+    digest = hashlib.sha256()
+    for round in range(1, 5):
+        file_path = os.path.join(str(year), f"round{round}.csv")
+        if os.path.exists(file_path):
+            with open(file_path, "rb") as f:
+                digest.update(f.read())
+    digest.update(json.dumps(payload, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def read_manifest(path: str) -> dict[str, str]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def write_manifest(path: str, manifest: dict[str, str]):
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def build_year(year: int) -> tuple[float, Season]:
+    # the parent already fetched every bracket into YEAR/bracket.json so workers never touch the network
+    start = time.perf_counter()
+    pick_store = PickStore(PICK_STORE_FILE_NAME)
+    history = HistoryIndex()  # just this year, the parent merges it into the full history
+    feed = StandingsFeed(read_feed(str(year)))
+    shards = PageShards()
+    chunks, out_path = render(
+        str(year),
+        BracketCache(DiskStorage("."), offline=True),
+        pick_store=pick_store,
+        history=history,
+        feed=feed,
+        shards=shards
+    )
+    write_html(chunks, out_path)
+    write_feed(str(year), feed)
+    write_shards(str(year), shards)
+    return time.perf_counter() - start, history.seasons[year]
+
+
+def upload_history(history: HistoryIndex, bucket_name: str):
+    # seeds the history.json the lambda reads, which only ever adds the current season to it
+    missing = history.missing_years()
+    if missing:
+        raise Exception(f"Not uploading history.json, it is missing {', '.join(map(str, missing))}")
+    storage = S3HistoryStorage(bucket_name)
+    # merged rather than replaced so a season the lambda added that wasn't built here is kept
+    uploaded = load_history(storage)
+    for season in history.seasons.values():
+        uploaded.update(season)
+    save_history(storage, uploaded)
+    print(f"Uploaded the history of {len(uploaded.seasons)} years to s3://{bucket_name}/history.json")
+
+
+def build(years: list[int], jobs: int, offline: bool, force: bool, upload_history_bucket: str = None):
+    years = [year for year in years if os.path.isdir(str(year))]
+    manifest = read_manifest(MANIFEST_FILE_NAME)
+    history_storage = DiskHistoryStorage(".")
+    history = load_history(history_storage)
+
+    # every stale bracket is fetched concurrently over one keep-alive pool
+    bracket_cache = BracketCache(DiskStorage("."), offline=offline)
+    payloads = bracket_cache.get_many({year: NHL_API_URL.format(year) for year in years})
+    input_hashes = {year: hash_inputs(year, payloads[year]) for year in years}
+    if not is_store_current(PICK_STORE_FILE_NAME, years):
+        compile_store(PICK_STORE_FILE_NAME, payloads)
+
+    stale_years = [
+        year
+        for year in years
+        if force
+        or manifest.get(str(year)) != input_hashes[year]
+        or not os.path.exists(os.path.join(str(year), "index.html"))
+        or year not in history.seasons
+    ]
+
+    timings: dict[int, float] = {}
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for year, (seconds, season) in zip(stale_years, executor.map(build_year, stale_years)):
+            timings[year] = seconds
+            manifest[str(year)] = input_hashes[year]
+            history.update(season)
+    write_manifest(MANIFEST_FILE_NAME, manifest)
+
+    # only the rebuilt years changed, every other season comes straight from history.json
+    start = time.perf_counter()
+    save_history(history_storage, history)
+    write_history_pages(history, ".")
+    history_seconds = time.perf_counter() - start
+
+    print(f"{'Year':<6}{'Status':<10}{'Seconds':>8}")
+    for year in years:
+        if year in timings:
+            print(f"{year:<6}{'built':<10}{timings[year]:>8.3f}")
+        else:
+            print(f"{year:<6}{'skipped':<10}{'-':>8}")
+    print(f"Built {len(timings)} of {len(years)} years in {sum(timings.values()):.3f}s of worker time")
+    print(f"Updated the history of {len(history.seasons)} years in {history_seconds:.3f}s")
+
+    if upload_history_bucket:
+        upload_history(history, upload_history_bucket)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", required=True, help="ie 1997-2024 or 2022,2024")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--offline", action="store_true", help="only use the recorded YEAR/bracket.json files")
+    parser.add_argument("--force", action="store_true", help="rebuild even if the inputs have not changed")
+    parser.add_argument(
+        "--upload-history",
+        metavar="BUCKET",
+        help="then merge history.json into s3://BUCKET/history.json, the lambda only publishes the index pages "
+             "once it has every season"
+    )
+    args = parser.parse_args()
+
+    build(parse_years(args.years), args.jobs, args.offline, args.force, args.upload_history)
@@ -1,9 +1,14 @@
-from collections import namedtuple
+from collections import Counter, namedtuple
 from dataclasses import dataclass
 from enum import Enum
 
 PickResult = namedtuple("PickResult", "series_letter pick points possible_points team_status games_status")
-Row = namedtuple("Row", "person pick_results total_points possible_points")
+# teams_correct and games_correct are the tiebreakers, counted while the row is scored
+Row = namedtuple(
+    "Row",
+    "person pick_results total_points possible_points teams_correct games_correct",
+    defaults=(0, 0)
+)
 Scoring = namedtuple("Scoring", "team games bonus")
 SummaryRow = namedtuple("SummaryRow", "person round_totals total_points possible_points")
 Team = namedtuple("Team", "name short logo rank is_top_seed")
@@ -27,9 +32,13 @@ class Pick:
         return f"{self.team.short} {self.games}"
 
 
-def excel_rank(values, target):
-    sorted_values = sorted(values, reverse=True)
-    try:
-        return sorted_values.index(target) + 1
-    except ValueError:
-        return None
+# excel's RANK for every value at once: ties share a rank and the next one skips past them.
+# Scores repeat a lot, so only the distinct values are sorted.
+def excel_ranks(values) -> dict:
+    counts = Counter(values)
+    ranks = {}
+    rank = 1
+    for value in sorted(counts, reverse=True):
+        ranks[value] = rank
+        rank += counts[value]
+    return ranks
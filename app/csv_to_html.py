@@ -1,13 +1,28 @@
 #!/usr/bin/env python3
-import csv
 import os
 import sys
+from typing import Iterable, Iterator
 
-from .common import Scoring, Winner, Pick, PickResult, PickStatus, Row
+from .bracket_cache import BracketCache
+from .common import Scoring, Pick, PickResult, PickStatus, Row
+from .fragment_cache import FragmentCache
+from .history import HistoryIndex, summarize_season
 from .projection_calculator import ProjectionCalculator
+from .scenario_calculator import MAX_SCENARIO_WORK, ScenarioCalculator
+from .scoring import SeriesScorer
+# the scoring functions lived here before app/scoring.py, scripts still import them from here
+from .scoring import calculate_possible_points, get_games_status, get_pick_status, get_points, get_team_status  # noqa: F401
+from .simulator import Simulator, read_strengths
 from .html_generator import HtmlGenerator
+from .max_points_solver import MaxPointsSolver
 from .nhl_api_handler import NhlApiHandler
-from .series import Series, ALL_SERIES
+from .page_shards import PageShards
+from .phase_timer import PhaseTimer
+from .pick_reader import read_pick_file
+from .pick_store import PickStore, source_key
+from .series import ALL_SERIES
+from .standings_feed import StandingsFeed, make_feed
+from .warm_state import WarmState
 
 PEOPLE = [
     'Benedict',
@@ -36,87 +51,6 @@ SCORING = [
 ]
 
 
-def read_csv(csv_filename: str, skip_headers: bool) -> list:
-    with open(csv_filename, 'r') as f:
-        reader = csv.reader(f)
-        if skip_headers:
-            next(reader, None)  # skip the headers
-        return [row for row in reader]
-
-
-def read_old_picks(
-        rows: list[Row],
-        nhl_api_handler: NhlApiHandler,
-        year: int,
-        round: int
-        ) -> dict[str, list[Pick]]:
-    series_order = get_series_import_order(year, round)
-
-    trs = {}
-    for row in rows:
-        tds = []
-
-        person = row[0]
-        if person.lower() == "dad":
-            person = "Derrick"
-        elif person.lower() in ["mom", "chris"]:
-            person = "Chrissy"
-        elif person.lower() == "m.c.b.":
-            person = "Marc"
-        person = person.capitalize()
-
-        col_iter = iter(row[1:])
-
-        i = 0
-        for col in col_iter:
-            raw_team, num_games = map(lambda r: r.strip(), col.split("-"))
-            team_name = strip_rank(raw_team)
-
-            pick = Pick(
-                series_letter=series_order[i],
-                team=nhl_api_handler.get_team(team_name),
-                games=int(num_games)
-            )
-
-            tds.append(pick)
-            i += 1
-
-        trs[person] = tds
-    return trs
-
-
-def read_picks(
-    rows: list[Row],
-    nhl_api_handler: NhlApiHandler,
-    year: int,
-    round: int
-) -> dict[str, list[Pick]]:
-    series_order = get_series_import_order(year, round)
-
-    trs = {}
-    for row in rows:
-        tds = []
-        person = row[1].capitalize()
-        col_iter = iter(row[2:])
-
-        i = 0
-        for col in col_iter:
-            team_name = strip_rank(col)
-            num_games = next(col_iter)
-
-            pick = Pick(
-                series_letter=series_order[i],
-                team=nhl_api_handler.get_team(team_name),
-                games=int(num_games)
-            )
-
-            tds.append(pick)
-            i += 1
-
-        trs[person] = tds
-    return trs
-
-
 # !!!HACK ALERT!!!
 # since previous forms dont follow the letter order that the api does,
 # hardcode the order the picks are in. Future years should match
@@ -139,7 +73,7 @@ def get_series_import_order(year: int, round: int) -> list[str]:
     elif year == 2022:
         pick_order = [
             ['G', 'H', 'A', 'B', 'C', 'D', 'E', 'F'],
-            ['K', 'I', 'J', 'L'],
+            ['K', 'L', 'I', 'J'],
             ['N', 'M'],
             ['O']
         ]
@@ -307,11 +241,19 @@ def get_series_import_order(year: int, round: int) -> list[str]:
     return pick_order[round - 1]
 
 
-def strip_rank(team_name: str) -> str:
-    i = team_name.find('(')
-    if i == -1:
-        return team_name
-    return team_name[:i-1]  # strip the end, including the space before (
+def read_round_picks(
+    file_path: str,
+    nhl_api_handler: NhlApiHandler,
+    year: int,
+    round: int,
+    pick_store: PickStore = None
+) -> dict[str, list[Pick]]:
+    series_order = get_series_import_order(year, round)
+    if pick_store:
+        picks_by_person = pick_store.get(year, round, source_key(file_path, series_order), nhl_api_handler)
+        if picks_by_person is not None:
+            return picks_by_person
+    return read_pick_file(file_path, nhl_api_handler, series_order)
 
 
 def build_data(
@@ -320,127 +262,86 @@ def build_data(
     picks_by_person: dict[str, list[Pick]],
     series_letters: list[str]
 ) -> list[Row]:
+    scorers = {letter: SeriesScorer(nhl_api_handler.get_series(letter), scoring) for letter in series_letters}
+    correct = PickStatus.CORRECT
     rows = []
 
     for person, picks in picks_by_person.items():
         pick_results = []
         total_points = 0
         total_possible_points = 0
+        teams_correct = 0
+        games_correct = 0
+        picks_by_letter = {p.series_letter: p for p in reversed(picks)}  # first pick wins on duplicates
 
         for series_letter in series_letters:
-            pick = next(p for p in picks if p.series_letter == series_letter)
-            series = nhl_api_handler.get_series(pick.series_letter)
-
-            winner = series.get_winner()
-            team_status = get_team_status(pick, winner)
-            games_status = get_games_status(pick, winner, series)
-
-            points = get_points(scoring, team_status, games_status)
+            pick = picks_by_letter[series_letter]
+            points, possible_points, team_status, games_status = scorers[series_letter].score(pick)
             total_points += points
-
-            possible_points = points if winner else calculate_possible_points(pick, series, scoring, team_status, games_status)
             total_possible_points += possible_points
+            teams_correct += team_status is correct
+            games_correct += games_status is correct
 
-            p = PickResult(series.letter, pick, points, possible_points, team_status, games_status)
+            p = PickResult(series_letter, pick, points, possible_points, team_status, games_status)
             pick_results.append(p)
 
-        rows.append(Row(person.capitalize(), pick_results, total_points, total_possible_points))
+        rows.append(Row(
+            person.capitalize(),
+            pick_results,
+            total_points,
+            total_possible_points,
+            teams_correct,
+            games_correct
+        ))
 
     return rows
 
 
-def get_pick_status(pick: Pick, winner: Winner, predicate: callable) -> PickStatus:
-    if not winner:
-        return PickStatus.UNKNOWN
-    if predicate(pick, winner):
-        return PickStatus.CORRECT
-    return PickStatus.INCORRECT
-
-
-def get_team_status(pick: Pick, winner: Winner) -> PickStatus:
-    return get_pick_status(
-        pick,
-        winner,
-        lambda p, w: p.team.short == w.team.short
-    )
-
-
-def get_games_status(pick: Pick, winner: Winner, series: Series) -> PickStatus:
-    # sometimes we can assign correctness early
-    if winner is None:
-        games_played = series.total_games()
-        # since we know the 7th game will be the last we can give points early
-        if games_played == 6 and pick.games == 7:
-            return PickStatus.CORRECT
-        # if >= games than the guess have been played, it's a bad guess
-        if games_played >= pick.games:
-            return PickStatus.INCORRECT
-        # certain games become impossible, ie both teams win 1 each so 4 games is impossible
-        min_games_for_winner = min(series.top_seed_wins, series.bottom_seed_wins) + 4
-        if pick.games < min_games_for_winner:
-            return PickStatus.INCORRECT
-    return get_pick_status(
-        pick,
-        winner,
-        lambda p, w: p.games == w.games
-    )
-
-
-def get_points(scoring: Scoring, team_status: PickStatus, games_status: PickStatus) -> int:
-    correct_team = team_status == PickStatus.CORRECT
-    correct_games = games_status == PickStatus.CORRECT
-    points = 0
-    points += scoring.team if correct_team else 0
-    points += scoring.games if correct_games else 0
-    points += scoring.bonus if correct_team and correct_games else 0
-    return points
-
-
-# this function should ONLY be called when there is no winner
-def calculate_possible_points(
-    pick: Pick,
-    series: Series,
-    scoring: Scoring,
-    team_status: PickStatus,
-    games_status: PickStatus
-) -> int:
-    possible_from_team = scoring.team if team_status in [PickStatus.CORRECT, PickStatus.UNKNOWN] else 0
-    possible_from_games = scoring.games if games_status in [PickStatus.CORRECT, PickStatus.UNKNOWN] else 0
-
-    if series.top_seed_wins < series.bottom_seed_wins:
-        current_loser_team = series.bottom_seed
-        current_loser_wins = series.bottom_seed_wins
-        current_leader_team = series.top_seed
-        current_leader_wins = series.top_seed_wins
-    else:
-        current_loser_team = series.top_seed
-        current_loser_wins = series.top_seed_wins
-        current_leader_team = series.bottom_seed
-        current_leader_wins = series.bottom_seed_wins
-
-    num_games_leader_needs = 4 - current_leader_wins
-    num_games_loser_needs = 4 - current_loser_wins
-
-    is_loser_bonus_possible = pick.team == current_loser_team and pick.games >= (num_games_loser_needs + current_loser_wins + current_leader_wins)
-    is_leader_bonus_possible = pick.team == current_leader_team and pick.games >= (num_games_leader_needs + current_leader_wins + current_loser_wins)
-    is_bonus_possible = is_loser_bonus_possible or is_leader_bonus_possible
-
-    if is_bonus_possible:
-        return possible_from_team + possible_from_games + scoring.bonus
-    return max(possible_from_team, possible_from_games)
-
-
-def write_html(html, filename):
+def write_html(chunks: Iterable[str], filename):
     with open(filename, 'w') as f:
-        for row in html:
-            f.write(row)
+        for chunk in chunks:
+            f.write(chunk)
+
+
+def main(
+    folder_name: str,
+    bracket_cache: BracketCache = None,
+    num_simulations: int = 0,
+    simulation_seed: int = 0,
+    fragment_cache: FragmentCache = None,
+    state: WarmState = None,
+    pick_store: PickStore = None,
+    history: HistoryIndex = None,
+    feed: StandingsFeed = None,
+    shards: PageShards = None,
+    timer: PhaseTimer = None
+) -> tuple[str, str]:
+    chunks, out_path = render(
+        folder_name,
+        bracket_cache,
+        num_simulations,
+        simulation_seed,
+        fragment_cache,
+        state,
+        pick_store,
+        history,
+        feed,
+        shards,
+        timer
+    )
+    return ''.join(chunks), out_path
 
 
-def main(folder_name: str) -> tuple[str, str]:
+def read_rounds(
+    folder_name: str,
+    nhl_api_handler: NhlApiHandler,
+    state: WarmState = None,
+    pick_store: PickStore = None,
+    timer: PhaseTimer = None
+) -> tuple[list[list[Row]], list[dict[str, list[Pick]]]]:
     year = int(folder_name.rstrip('/'))
-    nhl_api_handler = NhlApiHandler(year)
-    nhl_api_handler.load()
-
+    state = state or WarmState()
+    timer = timer or PhaseTimer()
     all_rows = []
     all_picks = []
     for i in range(4):  # 4 rounds in the playoffs
@@ -448,14 +349,23 @@ def main(folder_name: str) -> tuple[str, str]:
         round_scoring = SCORING[i]
         file_path = os.path.join(folder_name, f'round{round}.csv')
         if os.path.exists(file_path):
-            if year < 2008:
-                csv_rows = read_csv(file_path, False)
-                picks_by_person = read_old_picks(csv_rows, nhl_api_handler, year, round)
-            else:
-                csv_rows = read_csv(file_path, True)
-                picks_by_person = read_picks(csv_rows, nhl_api_handler, year, round)
+            with timer.span("read picks") as fields:
+                picks_key, picks_by_person = state.get_picks(
+                    file_path,
+                    nhl_api_handler,
+                    lambda: read_round_picks(file_path, nhl_api_handler, year, round, pick_store)
+                )
+                fields["people"] = len(picks_by_person)
             all_picks.append(picks_by_person)
-            round_rows = build_data(round_scoring, nhl_api_handler, picks_by_person, ALL_SERIES[i])
+            with timer.span("build_data"):
+                round_rows = state.get_rows(
+                    file_path,
+                    picks_key,
+                    nhl_api_handler,
+                    round_scoring,
+                    ALL_SERIES[i],
+                    lambda: build_data(round_scoring, nhl_api_handler, picks_by_person, ALL_SERIES[i])
+                )
             all_rows.append(round_rows)
         else:
             round_rows = []
@@ -469,26 +379,113 @@ def main(folder_name: str) -> tuple[str, str]:
                     0
                 ))
             all_rows.append(round_rows)
-
-    winner_projections = ProjectionCalculator(
-        all_rows,
-        all_picks,
+    return all_rows, all_picks
+
+
+def render(
+    folder_name: str,
+    bracket_cache: BracketCache = None,
+    num_simulations: int = 0,
+    simulation_seed: int = 0,
+    fragment_cache: FragmentCache = None,
+    state: WarmState = None,
+    pick_store: PickStore = None,
+    history: HistoryIndex = None,
+    feed: StandingsFeed = None,
+    shards: PageShards = None,
+    timer: PhaseTimer = None
+) -> tuple[Iterator[str], str]:
+    year = int(folder_name.rstrip('/'))
+    state = state or WarmState()  # nothing kept between calls
+    timer = timer or PhaseTimer()
+    nhl_api_handler = state.get_api(year, bracket_cache, timer)
+
+    all_rows, all_picks = read_rounds(folder_name, nhl_api_handler, state, pick_store, timer)
+
+    with timer.span("projections"):
+        winner_projections = ProjectionCalculator(
+            all_rows,
+            all_picks,
+            nhl_api_handler,
+            year
+        ).calculate(
+            SCORING,
+            nhl_api_handler.get_scf_teams()
+        )
+    round_paths = [os.path.join(folder_name, f'round{round}.csv') for round in range(1, 5)]
+    csv_paths = [file_path for file_path in round_paths if os.path.exists(file_path)]
+    # read_rounds left each csv's picks key in the state, fragments and scenarios are keyed on them
+    picks_keys = [state.picks[file_path][0] if file_path in csv_paths else None for file_path in round_paths]
+    with timer.span("scenarios"):
+        scenarios = state.get_scenarios(
+            csv_paths,
+            nhl_api_handler,
+            lambda: ScenarioCalculator(
+                all_rows,
+                all_picks,
+                nhl_api_handler,
+                SCORING
+            ).calculate(MAX_SCENARIO_WORK)
+        )
+    simulation = None
+    if num_simulations:
+        with timer.span("simulation", simulations=num_simulations):
+            simulation = Simulator(
+                all_rows,
+                all_picks,
+                nhl_api_handler,
+                SCORING,
+                read_strengths(folder_name, nhl_api_handler)
+            ).calculate(num_simulations, simulation_seed)
+    with timer.span("max points"):
+        max_points = MaxPointsSolver(
+            all_rows,
+            all_picks,
+            nhl_api_handler,
+            SCORING
+        ).solve()
+    scf_series = nhl_api_handler.get_series_or_none(ALL_SERIES[-1][0])
+    if fragment_cache and scf_series and scf_series.is_over():
+        # the season is done so this page is rendered for the last time
+        fragment_cache.evict(year)
+        fragment_cache = None
+    html_generator = HtmlGenerator(
         nhl_api_handler,
-        year
-    ).calculate(
-        SCORING,
-        nhl_api_handler.get_scf_teams()
+        all_rows,
+        max_points,
+        fragment_cache=fragment_cache,
+        shards=shards,
+        timer=timer,
+        picks_keys=picks_keys
     )
-    html = HtmlGenerator(
-        nhl_api_handler,
-        all_rows
-    ).make_html(
+    if history is not None:
+        with timer.span("history"):
+            history.update(summarize_season(
+                year,
+                bool(scf_series and scf_series.is_over()),
+                html_generator.all_rows,
+                html_generator.standings,
+                html_generator.leaders
+            ))
+    if feed is not None:
+        with timer.span("feed"):
+            feed.update(make_feed(
+                year,
+                nhl_api_handler,
+                html_generator.all_rows,
+                html_generator.standings,
+                html_generator.leaders,
+                winner_projections
+            ))
+    chunks = timer.time_chunks("render", html_generator.stream_html(
         SCORING,
         year,
-        winner_projections
-    )
+        winner_projections,
+        scenarios,
+        simulation
+    ))
     out_path = os.path.join(folder_name, 'index.html')
-    return html, out_path
+    return chunks, out_path
 
 
 if __name__ == '__main__':
@@ -0,0 +1,79 @@
+import hashlib
+import os
+import shutil
+
+from .aws import s3_resource
+
+FRAGMENTS_DIR_NAME = "fragments"
+# bump whenever the markup of a cached section changes so old fragments are never spliced in
+FRAGMENT_VERSION = 1
+
+
+def fragment_key(*parts) -> str:
+    # everything that goes into a section's html, so equal keys always mean equal html
+    digest = hashlib.sha256(repr((FRAGMENT_VERSION, parts)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class DiskFragmentStorage:
+    # stores fragments next to that year's csvs, ie 2024/fragments/<key>.html
+    def __init__(self, root: str):
+        self.root = root
+
+    def _dir(self, year: int) -> str:
+        return os.path.join(self.root, str(year), FRAGMENTS_DIR_NAME)
+
+    def read(self, year: int, key: str) -> str:
+        path = os.path.join(self._dir(year), f"{key}.html")
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return f.read()
+
+    def write(self, year: int, key: str, html: str):
+        os.makedirs(self._dir(year), exist_ok=True)
+        with open(os.path.join(self._dir(year), f"{key}.html"), 'w') as f:
+            f.write(html)
+
+    def clear(self, year: int):
+        shutil.rmtree(self._dir(year), ignore_errors=True)
+
+
+class S3FragmentStorage:
+    # same layout as DiskFragmentStorage but in the bucket, ie s3://bucket/2024/fragments/<key>.html
+    def __init__(self, bucket_name: str):
+        self.bucket = s3_resource().Bucket(bucket_name)
+
+    def _prefix(self, year: int) -> str:
+        return f"{year}/{FRAGMENTS_DIR_NAME}/"
+
+    def read(self, year: int, key: str) -> str:
+        try:
+            body = self.bucket.Object(f"{self._prefix(year)}{key}.html").get()["Body"].read()
+        except self.bucket.meta.client.exceptions.NoSuchKey:
+            return None
+        return body.decode("utf-8")
+
+    def write(self, year: int, key: str, html: str):
+        self.bucket.put_object(
+            Key=f"{self._prefix(year)}{key}.html",
+            Body=html.encode("utf-8"),
+            ContentType="text/html"
+        )
+
+    def clear(self, year: int):
+        self.bucket.objects.filter(Prefix=self._prefix(year)).delete()
+
+
+class FragmentCache:
+    def __init__(self, storage):
+        self.storage = storage
+
+    def get(self, year: int, key: str) -> str:
+        return self.storage.read(year, key)
+
+    def put(self, year: int, key: str, html: str):
+        self.storage.write(year, key, html)
+
+    def evict(self, year: int):
+        self.storage.clear(year)
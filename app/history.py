@@ -0,0 +1,181 @@
+import json
+import os
+from collections import namedtuple
+from dataclasses import dataclass, field
+
+from .aws import s3_resource
+from .common import PickStatus, Row
+from .leader_calculator import Leaders
+from .standings import Standings
+
+HISTORY_FILE_NAME = "history.json"
+# bump whenever what a season records changes so stale indexes are rebuilt rather than misread
+HISTORY_VERSION = 1
+FIRST_YEAR = 1997
+# seasons there are no picks for, 2005 was lost to the lockout
+YEARS_WITHOUT_POOL = (2005, 2013)
+
+# one person's finish in one season
+Standing = namedtuple(
+    "Standing",
+    "person rank total_points possible_points round_totals teams_correct games_correct decided_picks"
+)
+Season = namedtuple("Season", "year complete winner standings")
+
+
+@dataclass
+class Career:
+    person: str
+    seasons: int = 0
+    titles: int = 0
+    total_points: int = 0
+    teams_correct: int = 0
+    games_correct: int = 0
+    decided_picks: int = 0
+    finishes: dict[int, int] = field(default_factory=dict)  # year -> rank
+
+    def accuracy(self) -> float:
+        return self.teams_correct / self.decided_picks if self.decided_picks else 0.0
+
+    def best_finish(self) -> int:
+        return min(self.finishes.values())
+
+
+def summarize_season(
+    year: int,
+    complete: bool,
+    all_rows: list[list[Row]],
+    standings: Standings,
+    leaders: Leaders
+) -> Season:
+    summary_map = standings.summary_map
+    rank_map = standings.rank_map
+    picks_made = dict.fromkeys(summary_map, 0)
+    decided_picks = dict.fromkeys(summary_map, 0)
+    for round_rows in all_rows:
+        for row in round_rows:
+            for result in row.pick_results:
+                if result.pick is None:
+                    continue  # a round without a csv yet
+                picks_made[row.person] += 1
+                if result.team_status != PickStatus.UNKNOWN:
+                    decided_picks[row.person] += 1
+
+    season_standings = [
+        Standing(
+            summary_row.person,
+            rank_map[summary_row.person],
+            summary_row.total_points,
+            summary_row.possible_points,
+            summary_row.round_totals,
+            standings.teams_correct[summary_row.person],
+            standings.games_correct[summary_row.person],
+            decided_picks[summary_row.person]
+        )
+        for summary_row in sorted(summary_map.values(), key=lambda s: (rank_map[s.person], s.person))
+        if picks_made[summary_row.person]  # placeholder rows for people who never picked
+    ]
+    return Season(year, complete, leaders.winner if complete else None, season_standings)
+
+
+class HistoryIndex:
+    # every season's final standings, small enough to rebuild the all time page from in milliseconds.
+    # Careers are kept as running totals so replacing one season only touches that season's people.
+    # Only finished seasons count towards them, a live rank or total would move and then be taken back.
+    def __init__(self):
+        self.seasons: dict[int, Season] = {}
+        self.careers: dict[str, Career] = {}
+
+    def update(self, season: Season):
+        previous = self.seasons.get(season.year)
+        if previous:
+            self._add(previous, -1)
+        self.seasons[season.year] = season
+        self._add(season, 1)
+
+    def _add(self, season: Season, sign: int):
+        if not season.complete:
+            return
+        for standing in season.standings:
+            career = self.careers.setdefault(standing.person, Career(standing.person))
+            career.seasons += sign
+            career.titles += sign * (standing.person == season.winner)
+            career.total_points += sign * standing.total_points
+            career.teams_correct += sign * standing.teams_correct
+            career.games_correct += sign * standing.games_correct
+            career.decided_picks += sign * standing.decided_picks
+            if sign > 0:
+                career.finishes[season.year] = standing.rank
+            else:
+                del career.finishes[season.year]
+            if not career.seasons:
+                del self.careers[standing.person]
+
+    def missing_years(self) -> list[int]:
+        # seasons up to the latest one that aren't here yet, ie history.json was never built for them
+        latest = max(self.seasons, default=FIRST_YEAR)
+        return [
+            year
+            for year in range(FIRST_YEAR, latest)
+            if year not in self.seasons and year not in YEARS_WITHOUT_POOL
+        ]
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "version": HISTORY_VERSION,
+            "seasons": [
+                [season.year, season.complete, season.winner, [list(standing) for standing in season.standings]]
+                for season in sorted(self.seasons.values())
+            ],
+        }, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, text: str) -> "HistoryIndex":
+        history = cls()
+        if not text:
+            return history
+        data = json.loads(text)
+        if data["version"] != HISTORY_VERSION:
+            return history  # every season is missing, so each one is rebuilt and re-added
+        for year, complete, winner, standings in data["seasons"]:
+            history.update(Season(year, complete, winner, [Standing(*standing) for standing in standings]))
+        return history
+
+
+class DiskHistoryStorage:
+    def __init__(self, root: str):
+        self.path = os.path.join(root, HISTORY_FILE_NAME)
+
+    def read(self) -> str:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'r') as f:
+            return f.read()
+
+    def write(self, text: str):
+        with open(self.path, 'w') as f:
+            f.write(text)
+
+
+class S3HistoryStorage:
+    # s3://bucket/history.json, next to the pages it's rendered into
+    def __init__(self, bucket_name: str):
+        self.bucket = s3_resource().Bucket(bucket_name)
+
+    def read(self) -> str:
+        try:
+            body = self.bucket.Object(HISTORY_FILE_NAME).get()["Body"].read()
+        except self.bucket.meta.client.exceptions.NoSuchKey:
+            return None
+        return body.decode("utf-8")
+
+    def write(self, text: str):
+        self.bucket.put_object(Key=HISTORY_FILE_NAME, Body=text.encode("utf-8"), ContentType="application/json")
+
+
+def load_history(storage) -> HistoryIndex:
+    return HistoryIndex.from_json(storage.read())
+
+
+def save_history(storage, history: HistoryIndex):
+    storage.write(history.to_json())
@@ -0,0 +1,134 @@
+import os
+
+from airium import Airium
+
+from .history import FIRST_YEAR, HistoryIndex
+from .html_templates import head_html, indent
+
+YEAR_INDEX_FILE_NAME = "index.html"
+ALL_TIME_FILE_NAME = "all_time.html"
+# these pages sit above the year folders
+CSS_DIR = "css"
+
+js = """
+window.onload = function() {
+    $('#allTimeTable').DataTable({
+        paging: false,
+        searching: false,
+        info: false,
+        order: [
+            [3, 'desc'],
+        ],
+        columnDefs: [
+            { targets: '_all', className: 'dt-body-center dt-head-center' }
+        ]
+    });
+}
+"""
+
+
+def _raw(a: Airium, html: str):
+    # html that is already indented for the current level, airium indents the first line itself
+    a(html[len(indent(a.current_level)):])
+
+
+def year_page_href(year: int) -> str:
+    return f"{year}/index.html"
+
+
+def render_year_index(history: HistoryIndex) -> str:
+    a = Airium()
+    a('<!DOCTYPE html>')
+    with a.html(lang='en'):
+        _raw(a, head_html(a.current_level, "", "Bryan Family Playoff Pool", CSS_DIR))
+        with a.body():
+            with a.div():
+                a.h1(_t="Bryan Family Playoff Pool", klass='text-center bg-secondary', style="--bs-bg-opacity: .2;")
+            with a.div(id='allTime'):
+                with a.a(href=ALL_TIME_FILE_NAME):
+                    a.strong(_t="All time leaderboard →")
+            with a.table(klass='table table-striped containing_table table-hover', id='yearTable'):
+                with a.tr():
+                    a.th(_t='Year')
+                    a.th(_t='Winner')
+                    a.th(_t='People')
+                for season in sorted(history.seasons.values(), reverse=True):
+                    if season.winner:
+                        winner = season.winner
+                    elif season.complete:
+                        winner = "Tiebreak needs to be decided manually!"
+                    else:
+                        winner = "In progress"
+                    with a.tr():
+                        with a.td():
+                            a.a(_t=season.year, href=year_page_href(season.year))
+                        a.td(_t=winner, klass='person')
+                        a.td(_t=len(season.standings))
+    return str(a)
+
+
+def render_all_time(history: HistoryIndex) -> str:
+    a = Airium()
+    a('<!DOCTYPE html>')
+    with a.html(lang='en'):
+        _raw(a, head_html(a.current_level, js, "All Time Bryan Family Playoff Pool", CSS_DIR))
+        with a.body():
+            with a.div(id='backToIndex'):
+                with a.a(href=YEAR_INDEX_FILE_NAME):
+                    a.strong(_t="← Back to all years")
+            with a.div():
+                a.h1(_t="All Time", klass='text-center bg-secondary', style="--bs-bg-opacity: .2;")
+            with a.table(klass='table table-striped containing_table table-hover', id='allTimeTable'):
+                with a.thead():
+                    with a.tr():
+                        a.th(_t='')
+                        a.th(_t='Seasons')
+                        a.th(_t='Titles')
+                        a.th(_t='Career Points')
+                        a.th(_t='Points per Season')
+                        a.th(_t='Teams Correct')
+                        a.th(_t='Games Correct')
+                        a.th(_t='Accuracy')
+                        a.th(_t='Best Finish')
+                with a.tbody():
+                    careers = sorted(history.careers.values(), key=lambda c: (c.total_points, c.person), reverse=True)
+                    for career in careers:
+                        with a.tr():
+                            a.td(_t=career.person, klass='person')
+                            a.td(_t=str(career.seasons))
+                            a.td(_t=str(career.titles))
+                            a.td(_t=str(career.total_points), klass='points')
+                            a.td(_t=f"{career.total_points / career.seasons:.1f}")
+                            a.td(_t=str(career.teams_correct))
+                            a.td(_t=str(career.games_correct))
+                            a.td(_t=f"{career.accuracy():.1%}")
+                            a.td(_t=str(career.best_finish()), klass='rank')
+    return str(a)
+
+
+def history_pages(history: HistoryIndex) -> dict[str, str]:
+    # file name -> html, both live next to the year folders. Empty while history.json is missing seasons,
+    # pages built from part of it would replace the published ones that list every year
+    missing = history.missing_years()
+    if missing:
+        print(
+            f"Not rendering {YEAR_INDEX_FILE_NAME} or {ALL_TIME_FILE_NAME}, history.json is missing "
+            f"{', '.join(map(str, missing))}. Build them with python -m app.build --years {FIRST_YEAR}-YEAR"
+            " and add --upload-history BUCKET for the lambda"
+        )
+        return {}
+    return {
+        YEAR_INDEX_FILE_NAME: render_year_index(history),
+        ALL_TIME_FILE_NAME: render_all_time(history),
+    }
+
+
+def write_history_pages(history: HistoryIndex, root: str):
+    pages = history_pages(history)
+    for file_name in (YEAR_INDEX_FILE_NAME, ALL_TIME_FILE_NAME):
+        path = os.path.join(root, file_name)
+        if file_name in pages:
+            with open(path, 'w') as f:
+                f.write(pages[file_name])
+        elif os.path.exists(path):
+            os.remove(path)  # left by a build from part of the history, publish.sh would copy it
@@ -1,9 +1,23 @@
+from typing import Callable, Iterator
+
 from airium import Airium
 
-from .common import Row, Scoring, SummaryRow, excel_rank
+from .common import PickResult, Row, Scoring, SummaryRow
+from .fragment_cache import FragmentCache, fragment_key
+from .html_templates import head_html, indent, round_row_html, summary_row_html
 from .leader_calculator import LeaderCalculator
+from .max_points_solver import MaxPoints
 from .nhl_api_handler import NhlApiHandler
+from .page_shards import SEARCH_INDEX_FILE_NAME, SHARDS_DIR_NAME, PageShards, shard_url_prefix
+from .phase_timer import PhaseTimer
 from .projection_calculator import ProjectionCell
+from .round_scores import series_state
+from .scenario_calculator import ScenarioOdds, ScenarioReport
+from .simulator import Probability, SimulationOdds, SimulationReport
+from .standings import calculate_standings
+
+# how many table rows are rendered before they are handed off, keeps memory flat for big pools
+ROWS_PER_CHUNK = 500
 
 js = """
 window.onload = function() {
@@ -35,59 +49,243 @@ window.onload = function() {
 }
 """
 
+# for a sharded page: fill each table a shard at a time as it scrolls into view, and search every shard by name
+shard_js = """
+window.addEventListener('load', function() {
+    const MAX_MATCHES = 50;
+    const shards = {};
+
+    function fetchShard(url) {
+        if (!shards[url]) {
+            shards[url] = fetch(url)
+                .then(response => response.text())
+                .then(html => {
+                    const template = document.createElement('template');
+                    template.innerHTML = html;
+                    return Array.from(template.content.querySelectorAll('tr'));
+                });
+        }
+        return shards[url];
+    }
+
+    const observer = new IntersectionObserver(function(entries) {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                loadNextShard(entry.target);
+            }
+        });
+    }, {rootMargin: '1000px'});
+
+    function loadNextShard(sentinel) {
+        const body = sentinel.parentElement;
+        const shard = Number(body.dataset.loaded || 0);
+        if (body.dataset.loading) {
+            return;
+        }
+        if (shard >= Number(body.dataset.shards)) {
+            observer.unobserve(sentinel);
+            sentinel.remove();
+            return;
+        }
+        body.dataset.loading = 'true';
+        fetchShard(body.dataset.shardBase + shard + '.html').then(rows => {
+            rows.forEach(row => body.insertBefore(row.cloneNode(true), sentinel));
+            body.dataset.loaded = shard + 1;
+            delete body.dataset.loading;
+            // observing again checks right away whether the sentinel is still on screen
+            observer.unobserve(sentinel);
+            observer.observe(sentinel);
+        });
+    }
+
+    document.querySelectorAll('tbody.shard_rows').forEach(body => {
+        const sentinel = document.createElement('tr');
+        sentinel.className = 'shard_sentinel';
+        sentinel.innerHTML = '<td colspan="100">Loading...</td>';
+        body.appendChild(sentinel);
+        observer.observe(sentinel);
+    });
+
+    const search = document.getElementById('personSearch');
+    let index = null;
+    let timer = null;
+    let latest = 0;
+
+    function showMatches() {
+        const query = search.value.trim().toLowerCase();
+        const current = ++latest;
+        index = index || fetch(search.dataset.index).then(response => response.json());
+        index.then(index => {
+            const matches = [];
+            for (let i = 0; query && i < index.names.length && matches.length < MAX_MATCHES; i++) {
+                if (index.names[i].toLowerCase().includes(query)) {
+                    matches.push(i);
+                }
+            }
+            document.querySelectorAll('tbody.shard_rows').forEach(body => {
+                const results = body.previousElementSibling;
+                const table = index.tables[body.closest('table').id];
+                const names = new Set(matches.map(i => index.names[i]));
+                const wanted = [...new Set(matches.map(i => table[i]).filter(shard => shard >= 0))].sort((a, b) => a - b);
+                Promise.all(wanted.map(shard => fetchShard(body.dataset.shardBase + shard + '.html'))).then(shardRows => {
+                    if (current !== latest) {
+                        return;  // a newer search already replaced this one
+                    }
+                    results.replaceChildren(...shardRows.flat()
+                        .filter(row => names.has(row.querySelector('td.person').textContent.trim()))
+                        .map(row => row.cloneNode(true)));
+                    body.hidden = query !== '';
+                });
+            });
+        });
+    }
+
+    search.addEventListener('input', function() {
+        clearTimeout(timer);
+        timer = setTimeout(showMatches, 200);
+    });
+});
+"""
+
 
 class HtmlGenerator:
     def __init__(
         self,
         nhl_api_handler: NhlApiHandler,
         all_rows: list[list[Row]],
+        max_points: dict[str, MaxPoints] = None,
+        use_templates: bool = True,
+        fragment_cache: FragmentCache = None,
+        shards: PageShards = None,
+        timer: PhaseTimer = None,
+        picks_keys: list[tuple] = None
     ) -> None:
+        timer = timer or PhaseTimer()
         self.api = nhl_api_handler
         self.all_rows = all_rows
+        self.max_points = max_points
+        # render table rows from precompiled templates instead of element by element with airium
+        self.use_templates = use_templates
+        self.fragment_cache = fragment_cache
+        # each round's WarmState picks key, None for a round without a csv. Fragments are keyed on it
+        self.picks_keys = picks_keys or []
 
-        self.summary_map = self._generate_summary_rows()
-        self.rank_map = self.calculate_rank_map(self.summary_map)
-        self.leaders = LeaderCalculator().calculate(all_rows, self.summary_map, self.rank_map)
+        self._pad_rounds()
+        with timer.span("standings", people=len(self.all_rows[0]) if self.all_rows else 0):
+            self.standings = calculate_standings(self.all_rows, max_points)
+        self.summary_map = self.standings.summary_map
+        self.rank_map = self.standings.rank_map
+        with timer.span("leaders"):
+            self.leaders = LeaderCalculator().calculate(self.standings)
+        # small pools keep every row in the page, big ones only get the tables and fetch their rows
+        self.shards = shards if shards and shards.wanted(len(self.summary_map)) else None
         self.a = Airium()
 
     def make_html(
         self,
         scoring: list[Scoring],
         year: int,
-        projections: dict[str, dict[int, ProjectionCell]]
+        projections: dict[str, dict[int, ProjectionCell]],
+        scenarios: ScenarioReport = None,
+        simulation: SimulationReport = None
     ) -> str:
-        self.a('<!DOCTYPE html>')
-        with self.a.html(lang='en'):
-            with self.a.head():
-                self.a.title(_t=f'{year} Bryan Family Playoff Pool')
-                self.a.link(href='../css/csv_to_html.css', rel='stylesheet')
-                self.a.link(href='../css/teams.css', rel='stylesheet')
+        return ''.join(self.stream_html(scoring, year, projections, scenarios, simulation))
 
-                self.a.script(src='https://code.jquery.com/jquery-3.7.1.min.js')
-                self.a.script(src="https://cdn.datatables.net/2.0.8/js/dataTables.js")
+    def stream_html(
+        self,
+        scoring: list[Scoring],
+        year: int,
+        projections: dict[str, dict[int, ProjectionCell]],
+        scenarios: ScenarioReport = None,
+        simulation: SimulationReport = None
+    ) -> Iterator[str]:
+        # the same document as make_html, handed out a section or a batch of rows at a time
+        line_break = ''
+        for chunk in self._render(scoring, year, projections, scenarios, simulation):
+            if chunk:
+                yield line_break + chunk
+                line_break = self.a.source_line_break_character
 
-                self.a.link(
-                    href='https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css',
-                    rel='stylesheet'
-                )
-                self.a.link(href='https://cdn.datatables.net/v/dt/dt-2.0.8/datatables.min.css', rel='stylesheet')
-                self.a.script(_t=js)
+    def _render(
+        self,
+        scoring: list[Scoring],
+        year: int,
+        projections: dict[str, dict[int, ProjectionCell]],
+        scenarios: ScenarioReport,
+        simulation: SimulationReport
+    ) -> Iterator[str]:
+        self.a('<!DOCTYPE html>')
+        with self.a.html(lang='en'):
+            page_js = js + shard_js if self.shards else js
+            self._raw(head_html(self.a.current_level, page_js, f'{year} Bryan Family Playoff Pool'))
             with self.a.body():
                 with self.a.div(id='backToIndex'):
                     with self.a.a(href="index.html"):
                         self.a.strong(_t="← Back to all years")
                 with self.a.div():
                     self.a.h1(_t=year, klass='text-center bg-secondary', style="--bs-bg-opacity: .2;")
+                if self.shards:
+                    with self.a.div(id='search'):
+                        self.a.input(
+                            type='search',
+                            id='personSearch',
+                            placeholder='Find someone',
+                            **{'data-index': f'{SHARDS_DIR_NAME}/{SEARCH_INDEX_FILE_NAME}'}
+                        )
                 self._display_tiebreaker()
                 if not self.leaders.winner:
                     self.a.h2(_t="Tiebreak needs to be decided manually!", style="color: red")
-                self._display_summary_table()
+                yield self._drain()
+                yield from self._display_summary_table()
+                yield from self._display_scenarios(scenarios)
+                yield from self._display_simulation(simulation)
                 for i, rows in enumerate(self.all_rows):
-                    self._display_round(i+1, rows, scoring[i])
-                self._display_projections(projections)
-        return str(self.a)
+                    yield from self._display_cached_round(i+1, rows, scoring[i])
+                yield from self._display_projections(projections)
+        yield self._drain()
+
+    def _raw(self, html: str):
+        # html that is already indented for the current level, airium indents the first line itself
+        self.a(html[len(indent(self.a.current_level)):])
 
-    def _generate_summary_rows(self) -> dict[str, SummaryRow]:
+    def _drain(self) -> str:
+        # hand off everything rendered so far. Tags still open stay on airium's stack and close
+        # into the next chunk, so the chunks joined by line breaks are exactly str(self.a).
+        # airium has no public way to take what's rendered, this is the one place that reads its
+        # _doc_elements list, as it is in the airium==0.2.6 pinned in requirements.txt
+        self.a.flush_()
+        chunk = self.a.source_line_break_character.join(self.a._doc_elements)
+        self.a._doc_elements.clear()
+        return chunk
+
+    def _display_rows(self, table_id: str, items: list, display_row: Callable) -> Iterator[str]:
+        # every item has a person and display_row renders its row. A page is handed off every ROWS_PER_CHUNK rows,
+        # a sharded page keeps only an empty body to fill and the rows go to shards instead
+        if not self.shards:
+            for i, item in enumerate(items):
+                if i and i % ROWS_PER_CHUNK == 0:
+                    yield self._drain()
+                display_row(item)
+            return
+
+        rows_per_shard = self.shards.rows_per_shard
+        with self.a.tbody(klass='search_results'):
+            pass
+        with self.a.tbody(
+            klass='shard_rows',
+            **{
+                'data-shards': str(-(-len(items) // rows_per_shard)),
+                'data-shard-base': shard_url_prefix(table_id),
+            }
+        ):
+            yield self._drain()
+            for shard, start in enumerate(range(0, len(items), rows_per_shard)):
+                shard_items = items[start:start + rows_per_shard]
+                for item in shard_items:
+                    display_row(item)
+                self.shards.add(table_id, shard, [item.person for item in shard_items], self._drain())
+
+    def _pad_rounds(self):
         # if not all 4 rounds have happened yet, put in 0s
         while len(self.all_rows) < 4:
             rows = [
@@ -95,18 +293,6 @@ class HtmlGenerator:
                 for row in self.all_rows[0]
             ]
             self.all_rows.append(rows)
-        # arrange by person and calculate scores
-        scores: dict[str, SummaryRow] = {}
-        for round_rows in self.all_rows:
-            for row in round_rows:
-                summary_row = scores.get(row.person, SummaryRow(row.person, [], 0, 0))
-                scores[row.person] = SummaryRow(
-                    row.person,
-                    summary_row.round_totals + [row.total_points],
-                    summary_row.total_points + row.total_points,
-                    summary_row.possible_points + row.possible_points
-                )
-        return scores
 
     def _display_tiebreaker(self):
         if len(self.leaders.leaders) > 1:
@@ -132,7 +318,7 @@ class HtmlGenerator:
                                 self.a.td(_t=self.leaders.teams_map[leader])
         return self.leaders.winner
 
-    def _display_summary_table(self):
+    def _display_summary_table(self) -> Iterator[str]:
         with self.a.div(id='summary'):
             self.a.h2(_t='Overall', href='overall')
             with self.a.table(klass='table table-striped containing_table table-hover', id='summaryTable'):
@@ -150,22 +336,148 @@ class HtmlGenerator:
                     key=lambda s: (s.total_points, s.person),
                     reverse=True
                 )
-                for summary_row in sorted_summaries:
-                    leader_class = ' leader' if self.rank_map[summary_row.person] == 1 else ''
-                    with self.a.tr(klass=leader_class):
-                        self.a.td(_t=summary_row.person, klass='person')
-                        for round in summary_row.round_totals:
-                            self.a.td(_t=self.to_str(round), klass='round_total')
-                        self.a.td(_t=self.to_str(summary_row.total_points), klass='points')
-                        self.a.td(_t=self.rank_map[summary_row.person], klass='rank')
-                        self.a.td(_t=self.to_str(summary_row.possible_points), klass='possible_points')
+                yield from self._display_rows('summaryTable', sorted_summaries, self._display_summary_row)
+        yield self._drain()
+
+    def _display_summary_row(self, summary_row: SummaryRow):
+        leader_class = ' leader' if self.rank_map[summary_row.person] == 1 else ''
+        if self.use_templates:
+            self._raw(summary_row_html(
+                self.a.current_level,
+                summary_row.person,
+                leader_class,
+                [self.to_str(round) for round in summary_row.round_totals],
+                self.to_str(summary_row.total_points),
+                self.rank_map[summary_row.person],
+                self.to_str(summary_row.possible_points)
+            ))
+            return
+        with self.a.tr(klass=leader_class):
+            self.a.td(_t=summary_row.person, klass='person')
+            for round in summary_row.round_totals:
+                self.a.td(_t=self.to_str(round), klass='round_total')
+            self.a.td(_t=self.to_str(summary_row.total_points), klass='points')
+            self.a.td(_t=self.rank_map[summary_row.person], klass='rank')
+            self.a.td(_t=self.to_str(summary_row.possible_points), klass='possible_points')
+
+    def _display_scenarios(self, scenarios: ScenarioReport) -> Iterator[str]:
+        if not scenarios or scenarios.num_scenarios <= 1:
+            return  # nothing left to decide
+
+        def percent(count: int) -> str:
+            return f'{100 * count / scenarios.num_scenarios:.1f}%'
+
+        def display_row(odds: ScenarioOdds):
+            if odds.is_clinched:
+                status, klass = 'Clinched', 'correct'
+            elif odds.is_eliminated:
+                status, klass = 'Eliminated', 'incorrect'
+            else:
+                status, klass = '-', ''
+            with self.a.tr():
+                self.a.td(_t=odds.person, klass='person')
+                self.a.td(_t=percent(odds.first))
+                self.a.td(_t=percent(odds.second))
+                self.a.td(_t=percent(odds.third))
+                self.a.td(_t=percent(odds.last))
+                self.a.td(_t=status, klass=klass)
+
+        if scenarios.odds is None:
+            with self.a.div(id='scenarios'):
+                self.a.h2(_t='Remaining Scenarios', href='scenarios')
+                self.a.p(_t=(
+                    f'There are too many of the {scenarios.num_scenarios:,} ways the rest of the playoffs can go '
+                    'to check them all yet, the odds will show once a few more games are played'
+                ))
+            yield self._drain()
+            return
+
+        with self.a.div(id='scenarios'):
+            self.a.h2(_t='Remaining Scenarios', href='scenarios')
+            self.a.p(_t=f'Out of every {scenarios.num_scenarios:,} ways the rest of the playoffs can go')
+            with self.a.table(klass='table table-striped containing_table table-hover', id='scenarioTable'):
+                with self.a.tr():
+                    self.a.th(_t='')
+                    self.a.th(_t='1st')
+                    self.a.th(_t='2nd')
+                    self.a.th(_t='3rd')
+                    self.a.th(_t='Last')
+                    self.a.th(_t='Status')
+                sorted_odds = sorted(
+                    scenarios.odds.values(),
+                    key=lambda o: (o.first, o.second, o.third, -o.last, o.person),
+                    reverse=True
+                )
+                yield from self._display_rows('scenarioTable', sorted_odds, display_row)
+        yield self._drain()
+
+    def _display_simulation(self, simulation: SimulationReport) -> Iterator[str]:
+        if not simulation:
+            return
+
+        def percent(probability: Probability) -> str:
+            return f'{probability.estimate:.1%} ({probability.low:.1%} - {probability.high:.1%})'
+
+        def display_row(odds: SimulationOdds):
+            with self.a.tr():
+                self.a.td(_t=odds.person, klass='person')
+                self.a.td(_t=percent(odds.first))
+                self.a.td(_t=percent(odds.second))
+                self.a.td(_t=percent(odds.third))
+                self.a.td(_t=percent(odds.last))
+
+        with self.a.div(id='simulation'):
+            self.a.h2(_t='Simulated Odds', href='simulation')
+            self.a.p(_t=f'From {simulation.num_simulations:,} simulated playoffs, with 95% confidence intervals')
+            with self.a.table(klass='table table-striped containing_table table-hover', id='simulationTable'):
+                with self.a.tr():
+                    self.a.th(_t='')
+                    self.a.th(_t='1st')
+                    self.a.th(_t='2nd')
+                    self.a.th(_t='3rd')
+                    self.a.th(_t='Last')
+                sorted_odds = sorted(
+                    simulation.odds.values(),
+                    key=lambda o: (o.first.estimate, o.second.estimate, o.third.estimate, o.person),
+                    reverse=True
+                )
+                yield from self._display_rows('simulationTable', sorted_odds, display_row)
+        yield self._drain()
+
+    def _display_cached_round(
+        self,
+        round: int,
+        rows: list[Row],
+        scoring: Scoring
+    ) -> Iterator[str]:
+        all_series = list(self.api.series_iter(round))
+        picks_key = self.picks_keys[round - 1] if round <= len(self.picks_keys) else None
+        if (
+            not self.fragment_cache
+            or self.shards
+            or picks_key is None
+            or not all(series.is_over() for series in all_series)
+        ):
+            yield from self._display_round(round, rows, scoring)
+            return
+
+        # a finished round's table can never change again, so render it once and splice it in after that.
+        # Its rows only come from the round's picks and series, so those are hashed rather than every row
+        yield self._drain()
+        key = fragment_key(round, self.a.current_level, picks_key, tuple(map(series_state, all_series)), scoring)
+        html = self.fragment_cache.get(self.api.year, key)
+        if html is None:
+            line_break = self.a.source_line_break_character
+            html = line_break.join(chunk for chunk in self._display_round(round, rows, scoring) if chunk)
+            self.fragment_cache.put(self.api.year, key, html)
+        yield html
 
     def _display_round(
         self,
         round: int,
         rows: list[Row],
         scoring: Scoring
-    ):
+    ) -> Iterator[str]:
         round_str = f'round{round}'
         with self.a.div(id=round_str):
             self.a.h2(_t=f'Round {round}', href=f'#{round_str}')
@@ -189,27 +501,49 @@ class HtmlGenerator:
                     self.a.th(_t='Points')
                     self.a.th(_t='Rank')
                     self.a.th(_t='Maximum Possible Points')
-                all_points = list(map(lambda r: r.total_points, rows))
-                for row in sorted(rows, key=lambda x: x.person):
-                    rank = excel_rank(all_points, row.total_points)
+                ranks = self.standings.round_ranks[round - 1]
+
+                def display_row(row: Row):
+                    rank = ranks[row.total_points]
                     leader_class = ' leader' if rank == 1 and row.total_points > 0 else ''
-                    with self.a.tr():
-                        self.a.td(_t=row.person, klass='person' + leader_class)
-                        for result in sorted(row.pick_results, key=lambda r: r.series_letter):
-                            with self.a.td():
-                                with self.a.div(klass='pick'):
-                                    with self.a.div(klass=f'img_container {result.team_status.name.lower()}'):
-                                        if result.pick:
-                                            self.a.img(src=result.pick.team.logo, alt=result.pick.team.short)
-                                    self.a.div(
-                                        _t=result.pick.games if result.pick else '',
-                                        klass=f'games {result.games_status.name.lower()}'
-                                    )
-                        self.a.td(_t=self.to_str(row.total_points), klass='points' + leader_class)
-                        self.a.td(_t=rank, klass='rank' + leader_class)
-                        self.a.td(_t=self.to_str(row.possible_points), klass='possible_points')
-
-    def _display_projections(self, projections: dict[int, dict[str, ProjectionCell]]):
+                    results = sorted(row.pick_results, key=lambda r: r.series_letter)
+                    if self.use_templates:
+                        self._raw(round_row_html(
+                            self.a.current_level,
+                            row.person,
+                            leader_class,
+                            results,
+                            self.to_str(row.total_points),
+                            rank,
+                            self.to_str(row.possible_points)
+                        ))
+                    else:
+                        self._display_round_row(row, rank, leader_class, results)
+
+                sorted_rows = sorted(rows, key=lambda x: x.person)
+                yield from self._display_rows(f'{round_str}Table', sorted_rows, display_row)
+        yield self._drain()
+
+    def _display_round_row(self, row: Row, rank: int, leader_class: str, results: list[PickResult]):
+        with self.a.tr():
+            self.a.td(_t=row.person, klass='person' + leader_class)
+            for result in results:
+                with self.a.td():
+                    with self.a.div(klass='pick'):
+                        with self.a.div(klass=f'img_container {result.team_status.name.lower()}'):
+                            if result.pick:
+                                self.a.img(src=result.pick.team.logo, alt=result.pick.team.short)
+                        self.a.div(
+                            _t=result.pick.games if result.pick else '',
+                            klass=f'games {result.games_status.name.lower()}'
+                        )
+            self.a.td(_t=self.to_str(row.total_points), klass='points' + leader_class)
+            self.a.td(_t=rank, klass='rank' + leader_class)
+            self.a.td(_t=self.to_str(row.possible_points), klass='possible_points')
+
+    def _display_projections(self, projections: dict[int, dict[str, ProjectionCell]]) -> Iterator[str]:
+        if not projections:
+            return
         with self.a.div():
             self.a.h2(_t='Final Projection', href='projections')
             with self.a.table(id='projectionTable', klass='table table-striped containing_table table-hover fw-bold'):
@@ -245,17 +579,9 @@ class HtmlGenerator:
                                                 self.a.td(_t=f"2nd: {', '. join(cell.second)}")
                                             with self.a.tr():
                                                 self.a.td(_t=f"3rd: {', '. join(cell.third)}")
+        yield self._drain()
 
     @staticmethod
     # hack necessary because airium considers 0 == None and doesnt display it
     def to_str(num: int) -> str:
         return '0' if num == 0 else str(num)
-
-    @staticmethod
-    def calculate_rank_map(scores: dict[str, SummaryRow]) -> dict[str, int]:
-        summary_rows = scores.values()
-        all_points = list(map(lambda r: r.total_points, summary_rows))
-        return {
-            summary_row.person: excel_rank(all_points, summary_row.total_points)
-            for summary_row in summary_rows
-        }
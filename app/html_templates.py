@@ -0,0 +1,158 @@
+from functools import lru_cache
+
+from airium import Airium, Tag
+
+from .common import PickResult
+
+# stands in for the page title while the head is rendered once and cached
+TITLE_PLACEHOLDER = "\0title\0"
+
+
+# the same attribute value airium would write
+def attribute(value) -> str:
+    value = str(value)
+    return Tag.escape_quotes(Tag.ATTRIBUTE_VALUE_SUBSTITUTES.get(value, value))
+
+
+# the same element text airium would write, it skips anything falsy
+def text(value) -> str:
+    return str(value or "")
+
+
+def indent(level: int) -> str:
+    return Airium.base_indent * level
+
+
+@lru_cache(maxsize=None)
+def head_template(level: int, js: str, css_dir: str = '../css') -> tuple[str, str]:
+    a = Airium(current_level=level)
+    with a.head():
+        a.title(_t=TITLE_PLACEHOLDER)
+        a.link(href=f'{css_dir}/csv_to_html.css', rel='stylesheet')
+        a.link(href=f'{css_dir}/teams.css', rel='stylesheet')
+
+        a.script(src='https://code.jquery.com/jquery-3.7.1.min.js')
+        a.script(src="https://cdn.datatables.net/2.0.8/js/dataTables.js")
+
+        a.link(
+            href='https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css',
+            rel='stylesheet'
+        )
+        a.link(href='https://cdn.datatables.net/v/dt/dt-2.0.8/datatables.min.css', rel='stylesheet')
+        a.script(_t=js)
+    before, after = str(a).split(TITLE_PLACEHOLDER)
+    return before, after
+
+
+def head_html(level: int, js: str, title: str, css_dir: str = '../css') -> str:
+    before, after = head_template(level, js, css_dir)
+    return before + text(title) + after
+
+
+@lru_cache(maxsize=None)
+def pick_cell_templates(level: int) -> tuple[str, str]:
+    # level is the row's, cells sit one deeper
+    td, pick, container, img = (indent(level + i) for i in range(1, 5))
+    with_pick = "\n".join([
+        f'{td}<td>',
+        f'{pick}<div class="pick">',
+        f'{container}<div class="img_container {{team_status}}">',
+        f'{img}<img src="{{logo}}" alt="{{short}}" />',
+        f'{container}</div>',
+        f'{container}<div class="games {{games_status}}">{{games}}</div>',
+        f'{pick}</div>',
+        f'{td}</td>',
+    ])
+    without_pick = "\n".join([
+        f'{td}<td>',
+        f'{pick}<div class="pick">',
+        f'{container}<div class="img_container {{team_status}}">',
+        f'{container}</div>',
+        f'{container}<div class="games {{games_status}}"></div>',
+        f'{pick}</div>',
+        f'{td}</td>',
+    ])
+    return with_pick, without_pick
+
+
+def pick_cell_html(level: int, result: PickResult) -> str:
+    with_pick, without_pick = pick_cell_templates(level)
+    team_status = result.team_status.name.lower()
+    games_status = result.games_status.name.lower()
+    if not result.pick:
+        return without_pick.format(team_status=team_status, games_status=games_status)
+    return with_pick.format(
+        team_status=team_status,
+        games_status=games_status,
+        logo=attribute(result.pick.team.logo),
+        short=attribute(result.pick.team.short),
+        games=text(result.pick.games)
+    )
+
+
+@lru_cache(maxsize=None)
+def round_row_templates(level: int) -> tuple[str, str]:
+    tr, td = indent(level), indent(level + 1)
+    start = "\n".join([
+        f'{tr}<tr>',
+        f'{td}<td class="person{{leader}}">{{person}}</td>',
+    ])
+    end = "\n".join([
+        f'{td}<td class="points{{leader}}">{{points}}</td>',
+        f'{td}<td class="rank{{leader}}">{{rank}}</td>',
+        f'{td}<td class="possible_points">{{possible_points}}</td>',
+        f'{tr}</tr>',
+    ])
+    return start, end
+
+
+def round_row_html(
+    level: int,
+    person: str,
+    leader_class: str,
+    results: list[PickResult],
+    points: str,
+    rank: int,
+    possible_points: str
+) -> str:
+    start, end = round_row_templates(level)
+    leader = attribute(leader_class)
+    return "\n".join([
+        start.format(leader=leader, person=text(person)),
+        *(pick_cell_html(level, result) for result in results),
+        end.format(leader=leader, points=text(points), rank=text(rank), possible_points=text(possible_points)),
+    ])
+
+
+@lru_cache(maxsize=None)
+def summary_row_templates(level: int) -> tuple[str, str, str]:
+    tr, td = indent(level), indent(level + 1)
+    start = "\n".join([
+        f'{tr}<tr class="{{leader}}">',
+        f'{td}<td class="person">{{person}}</td>',
+    ])
+    round_total = f'{td}<td class="round_total">{{total}}</td>'
+    end = "\n".join([
+        f'{td}<td class="points">{{points}}</td>',
+        f'{td}<td class="rank">{{rank}}</td>',
+        f'{td}<td class="possible_points">{{possible_points}}</td>',
+        f'{tr}</tr>',
+    ])
+    return start, round_total, end
+
+
+def summary_row_html(
+    level: int,
+    person: str,
+    leader_class: str,
+    round_totals: list[str],
+    points: str,
+    rank: int,
+    possible_points: str
+) -> str:
+    start, round_total, end = summary_row_templates(level)
+    return "\n".join([
+        start.format(leader=attribute(leader_class), person=text(person)),
+        *(round_total.format(total=text(total)) for total in round_totals),
+        end.format(points=text(points), rank=text(rank), possible_points=text(possible_points)),
+    ])
@@ -1,24 +1,22 @@
-from collections import defaultdict, namedtuple
+from collections import namedtuple
 
-from .common import PickStatus, Row, SummaryRow
+from .common import SummaryRow
+from .standings import Standings
 
 Leaders = namedtuple("Leaders", "leaders teams_map games_map winner")
 
 
 class LeaderCalculator:
-    def calculate(
-        self,
-        all_rows: list[list[Row]],
-        summary_map: dict[str, SummaryRow],
-        rank_map: dict[str, int]
-    ) -> Leaders:
-        leaders = self._get_current_leaders(summary_map, rank_map)
+    def calculate(self, standings: Standings) -> Leaders:
+        leaders = self._get_current_leaders(standings.summary_map, standings.rank_map)
         leaders_obj = Leaders(leaders, {}, {}, None)
 
         if len(leaders) == 1:
             return leaders_obj._replace(winner=leaders[0])
 
-        num_teams_correct, num_games_correct = self._calculate_tiebreaker_data(all_rows, leaders)
+        # tiebreaker time
+        num_teams_correct = {person: standings.teams_correct[person] for person in leaders}
+        num_games_correct = {person: standings.games_correct[person] for person in leaders}
         leaders_obj = leaders_obj._replace(teams_map=num_teams_correct, games_map=num_games_correct)
 
         # first compare who got the most games correct
@@ -43,25 +41,6 @@ class LeaderCalculator:
             raise Exception(f"something went wrong {rank_map}")
         return [person for person in leaders if scores[person].total_points > 0]
 
-    def _calculate_tiebreaker_data(
-        self,
-        all_rows: list[list[Row]],
-        leaders: list[str]
-    ) -> tuple[dict[str, int], dict[str, int]]:
-        # tiebreaker time
-        num_teams_correct = defaultdict(int)
-        num_games_correct = defaultdict(int)
-        for round_rows in all_rows:
-            for row in round_rows:
-                if row.person not in leaders:
-                    continue
-                for result in row.pick_results:
-                    if result.team_status == PickStatus.CORRECT:
-                        num_teams_correct[row.person] += 1
-                    if result.games_status == PickStatus.CORRECT:
-                        num_games_correct[row.person] += 1
-        return num_teams_correct, num_games_correct
-
     def _tiebreak(
         self,
         data: dict[str, int],
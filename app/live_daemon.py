@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .bracket_cache import BracketCache, CachedBracket, DiskStorage
+from .csv_to_html import render, write_html
+from .nhl_api_handler import NHL_API_URL
+from .page_shards import SHARDS_DIR_NAME, PageShards, write_shards
+from .standings_feed import StandingsFeed, write_feed
+from .warm_state import WarmState
+
+# seconds between polls, starting low and backing off while nothing changes
+ACTIVE_POLL_SECONDS = (20, 120)  # some series is still being played
+IDLE_POLL_SECONDS = (5 * 60, 30 * 60)  # between rounds, waiting on the next series to be set
+POLL_BACKOFF = 1.5
+HEARTBEAT_SECONDS = 15
+
+# only on the page the daemon serves: keeps a copy of standings.json current from the pushed events
+# and writes each person's totals and rank into the overall table
+live_js = """
+(function() {
+    let standings = null;
+
+    function applyDelta(delta) {
+        // false when it doesn't start from the revision we have, a reset delta starts from null
+        if (delta.from !== null && (!standings || delta.from !== standings.revision)) {
+            return false;
+        }
+        for (const [path, value] of delta.set) {
+            if (!path.length) {
+                standings = value;
+                continue;
+            }
+            let target = standings;
+            path.slice(0, -1).forEach(function(key) { target = target[key]; });
+            target[path[path.length - 1]] = value;
+        }
+        for (const path of delta.remove) {
+            let target = standings;
+            path.slice(0, -1).forEach(function(key) { target = target[key]; });
+            delete target[path[path.length - 1]];
+        }
+        return true;
+    }
+
+    function showStandings() {
+        document.querySelectorAll('#summaryTable tr').forEach(function(row) {
+            const person = row.querySelector('.person');
+            const standing = person && standings.standings[person.textContent];
+            if (!standing) {
+                return;
+            }
+            row.querySelectorAll('.round_total').forEach(function(cell, i) {
+                cell.textContent = standing.round_totals[i];
+            });
+            row.querySelector('.points').textContent = standing.total_points;
+            row.querySelector('.rank').textContent = standing.rank;
+            row.querySelector('.possible_points').textContent = standing.possible_points;
+            row.classList.toggle('leader', standing.rank === 1);
+        });
+    }
+
+    const events = new EventSource('events');
+    events.addEventListener('standings', function(event) {
+        standings = JSON.parse(event.data);
+        showStandings();
+    });
+    events.addEventListener('delta', function(event) {
+        if (applyDelta(JSON.parse(event.data))) {
+            showStandings();
+            return;
+        }
+        // missed an update, start again from the whole document
+        fetch('standings.json')
+            .then(response => response.json())
+            .then(function(latest) {
+                standings = latest;
+                showStandings();
+            });
+    });
+})();
+"""
+
+
+def scores_key(payload: dict) -> tuple:
+    # everything a poll can change that the standings depend on
+    return tuple(
+        (
+            series["seriesLetter"],
+            series["topSeedTeam"]["abbrev"],
+            series["bottomSeedTeam"]["abbrev"],
+            series["topSeedWins"],
+            series["bottomSeedWins"],
+        )
+        for series in payload["series"]
+        if "seriesUrl" in series
+    )
+
+
+def with_live_client(html: str) -> str:
+    return html.replace("</body>", f"<script>{live_js}</script>\n</body>", 1)
+
+
+def has_active_series(payload: dict) -> bool:
+    return any(
+        max(series["topSeedWins"], series["bottomSeedWins"]) < 4
+        for series in payload["series"]
+        if "seriesUrl" in series
+    )
+
+
+class PollSchedule:
+    def __init__(
+        self,
+        active_seconds: tuple[float, float] = ACTIVE_POLL_SECONDS,
+        idle_seconds: tuple[float, float] = IDLE_POLL_SECONDS
+    ):
+        self.active_seconds = active_seconds
+        self.idle_seconds = idle_seconds
+        self.interval: float = None
+
+    def next(self, changed: bool, active: bool) -> float:
+        low, high = self.active_seconds if active else self.idle_seconds
+        if changed or self.interval is None:
+            self.interval = low
+        else:
+            self.interval = min(max(self.interval * POLL_BACKOFF, low), high)
+        return self.interval
+
+
+class Broadcaster:
+    # one queue per connected browser, every event is handed to all of them
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clients: set[queue.Queue] = set()
+
+    def subscribe(self) -> queue.Queue:
+        client = queue.Queue()
+        with self.lock:
+            self.clients.add(client)
+        return client
+
+    def unsubscribe(self, client: queue.Queue):
+        with self.lock:
+            self.clients.discard(client)
+
+    def publish(self, event: str, data: str):
+        with self.lock:
+            for client in self.clients:
+                client.put((event, data))
+
+
+class LiveDaemon:
+    # renders YEAR/ in the working directory, the same as run_locally
+    def __init__(self, year: int, url: str, schedule: PollSchedule = None):
+        self.year = year
+        self.url = url
+        storage = DiskStorage(".")
+        # every poll is a conditional request, renders only read back what the poll just stored
+        self.poll_cache = BracketCache(storage, ttl_seconds=0)
+        self.render_cache = BracketCache(storage, offline=True)
+        self.state = WarmState()
+        self.schedule = schedule or PollSchedule()
+        self.broadcaster = Broadcaster()
+
+        self.lock = threading.Lock()
+        self.scores: tuple = None
+        self.html: str = None
+        self.document: dict = None
+        self.shard_files: dict[str, str] = {}
+
+    def poll(self) -> tuple[bool, dict]:
+        payload = self.poll_cache.get(self.year, self.url)
+        scores = scores_key(payload)
+        if scores == self.scores:
+            return False, payload
+        self.refresh()
+        self.scores = scores
+        return True, payload
+
+    def refresh(self):
+        start = time.perf_counter()
+        folder_name = str(self.year)
+        feed = StandingsFeed(self.document)
+        shards = PageShards()
+        chunks, out_path = render(folder_name, self.render_cache, state=self.state, feed=feed, shards=shards)
+        html = "".join(chunks)
+        write_html([html], out_path)
+        write_feed(folder_name, feed)
+        write_shards(folder_name, shards)
+        with self.lock:
+            self.html, self.document, self.shard_files = with_live_client(html), feed.document, shards.files()
+
+        delta = feed.delta()
+        if delta:
+            self.broadcaster.publish("delta", json.dumps(delta, separators=(",", ":")))
+        else:
+            self.broadcaster.publish("standings", json.dumps(feed.document, separators=(",", ":")))
+        print(f"Updated {self.year} to {feed.document['revision']} in {time.perf_counter() - start:.3f}s")
+
+    def run(self):
+        while True:
+            try:
+                changed, payload = self.poll()
+            except Exception as e:
+                # the api being down for a bit shouldn't end the night, try again later
+                print(f"Poll failed: {e}")
+                time.sleep(self.schedule.next(False, True))
+                continue
+            if CachedBracket(payload, None, None, 0).is_season_complete():
+                print(f"The {self.year} season is over")
+                return
+            time.sleep(self.schedule.next(changed, has_active_series(payload)))
+
+
+def make_handler(daemon: LiveDaemon) -> type[BaseHTTPRequestHandler]:
+    class LiveHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path in ("/", "/index.html"):
+                self._send(daemon.html, "text/html; charset=utf-8")
+            elif self.path == "/standings.json":
+                self._send(daemon.document and json.dumps(daemon.document), "application/json")
+            elif self.path == "/events":
+                self._stream_events()
+            elif self.path.startswith(f"/{SHARDS_DIR_NAME}/") and self.path[1:] in daemon.shard_files:
+                content_type = "application/json" if self.path.endswith(".json") else "text/html; charset=utf-8"
+                self._send(daemon.shard_files[self.path[1:]], content_type)
+            else:
+                self.send_error(404)
+
+        def _send(self, body: str, content_type: str):
+            if body is None:
+                self.send_error(503, "Still rendering the first update")
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _stream_events(self):
+            # server-sent events: the whole document on connect, then a delta for every change
+            client = daemon.broadcaster.subscribe()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            try:
+                with daemon.lock:
+                    document = daemon.document
+                if document:
+                    self._write_event("standings", json.dumps(document, separators=(",", ":")))
+                while True:
+                    try:
+                        event, data = client.get(timeout=HEARTBEAT_SECONDS)
+                    except queue.Empty:
+                        self.wfile.write(b": keep-alive\n\n")  # so proxies don't drop an idle stream
+                        self.wfile.flush()
+                        continue
+                    self._write_event(event, data)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the browser went away
+            finally:
+                daemon.broadcaster.unsubscribe(client)
+
+        def _write_event(self, event: str, data: str):
+            self.wfile.write(f"event: {event}\ndata: {data}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+    return LiveHandler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("year", type=int)
+    parser.add_argument("--port", type=int, default=8000, help="where browsers connect, events are at /events")
+    parser.add_argument(
+        "--api-url",
+        default=NHL_API_URL,
+        help="bracket url, {0} is the year. Point it at app.bracket_stand_in to run without the real api"
+    )
+    parser.add_argument("--poll-seconds", type=float, help="shortest time between polls while series are active")
+    args = parser.parse_args()
+
+    schedule = None
+    if args.poll_seconds:
+        low = args.poll_seconds
+        idle_low = low * IDLE_POLL_SECONDS[0] / ACTIVE_POLL_SECONDS[0]
+        schedule = PollSchedule((low, low * 6), (idle_low, idle_low * 6))
+    daemon = LiveDaemon(args.year, args.api_url.format(args.year), schedule=schedule)
+
+    server = ThreadingHTTPServer(("localhost", args.port), make_handler(daemon))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Pushing {args.year} standings on http://localhost:{args.port}/events")
+    daemon.run()
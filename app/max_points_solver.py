@@ -0,0 +1,227 @@
+from collections import namedtuple
+
+from .common import Pick, Row, Scoring, Team, Winner
+from .nhl_api_handler import NhlApiHandler
+from .scoring import get_outcome_points
+from .series import ALL_SERIES, WINNER_MAP
+
+# points is the most a person can still finish with, outcome is how every live series has to go to get there
+MaxPoints = namedtuple("MaxPoints", "points outcome")
+# best remaining points in a series' part of the bracket if team wins it, the games it should win in
+# and who should win the other feeder series
+Branch = namedtuple("Branch", "points games other_winner")
+
+
+class MaxPointsSolver:
+    def __init__(
+        self,
+        all_rows: list[list[Row]],
+        all_picks: list[dict[str, list[Pick]]],
+        nhl_api_handler: NhlApiHandler,
+        scoring: list[Scoring]
+    ):
+        self.all_rows = all_rows
+        self.all_picks = all_picks
+        self.api = nhl_api_handler
+        self.scoring = scoring
+
+        # a series' branches only depend on the picks inside its part of the bracket, so people
+        # with the same picks there share them. Each distinct set of picks gets a small id.
+        self.subtree_ids: dict[tuple, int] = {}
+        self.subtree_branches: dict[int, dict[Team, Branch]] = {}
+        self.subtree_best: dict[int, tuple[int, Team]] = {}
+        self.subtree_outcomes: dict[tuple[int, Team], dict[str, Winner]] = {}
+
+        # every series that feeds into a series, all the way down to the first round
+        self.earlier_series: dict[str, list[str]] = {}
+        for letters in ALL_SERIES:
+            for letter in letters:
+                self.earlier_series[letter] = [
+                    earlier
+                    for feeder in WINNER_MAP.get(letter, [])
+                    for earlier in [feeder, *self.earlier_series[feeder]]
+                ]
+
+    def solve(self) -> dict[str, MaxPoints]:
+        over_letters = {
+            letter
+            for letters in ALL_SERIES
+            for letter in letters
+            if self.api.get_series(letter).is_over()
+        }
+
+        decided_points: dict[str, int] = {}
+        for round_rows in self.all_rows:
+            for row in round_rows:
+                decided_points.setdefault(row.person, 0)
+                for result in row.pick_results:
+                    if result.series_letter in over_letters:
+                        decided_points[row.person] += result.points
+
+        picks_by_person: dict[str, dict[str, Pick]] = {}
+        for round_picks in self.all_picks:
+            for person, picks in round_picks.items():
+                person_picks = picks_by_person.setdefault(person, {})
+                for pick in reversed(picks):  # first pick wins on duplicates
+                    person_picks[pick.series_letter] = pick
+
+        live_series = [
+            (letter, WINNER_MAP.get(letter, []))
+            for letters in ALL_SERIES
+            for letter in letters
+            if letter not in over_letters
+        ]
+
+        return {
+            person: self._solve_person(points, picks_by_person.get(person, {}), live_series)
+            for person, points in decided_points.items()
+        }
+
+    def _solve_person(
+        self,
+        decided_points: int,
+        picks: dict[str, Pick],
+        live_series: list[tuple[str, list[str]]]
+    ) -> MaxPoints:
+        if not live_series:
+            return MaxPoints(decided_points, {})
+
+        # series feeding into a pick need to know who could come out of them
+        needs_teams = set()
+        for letter in picks:
+            needs_teams.update(self.earlier_series[letter])
+
+        # dynamic programming up the bracket: every series only needs the best result of each
+        # of its two feeder series for each team that could come out of them
+        branches: dict[str, dict[Team, Branch]] = {}
+        subtree_ids: dict[str, int] = {}
+        best: dict[str, tuple[int, Team]] = {}
+        for letter, feeders in live_series:
+            pick = picks.get(letter)
+            if pick is None and letter not in needs_teams:
+                # nothing here or later depends on who wins, so only the best total matters
+                best[letter] = self._best(letter, feeders, best)
+                continue
+
+            subtree_key = (
+                letter,
+                (pick.team.short, pick.games) if pick else None,
+                *(subtree_ids.get(feeder) for feeder in feeders)
+            )
+            subtree_id = self.subtree_ids.setdefault(subtree_key, len(self.subtree_ids))
+            subtree_ids[letter] = subtree_id
+            if subtree_id in self.subtree_branches:
+                branches[letter] = self.subtree_branches[subtree_id]
+                best[letter] = self.subtree_best[subtree_id]
+                continue
+
+            series = self.api.get_series(letter)
+            scoring = self.scoring[series.round - 1]
+
+            if series.top_seed:
+                # (team, wins the other team already has, points from feeders, other feeder winner)
+                candidates = [
+                    (series.top_seed, series.bottom_seed_wins, 0, None),
+                    (series.bottom_seed, series.top_seed_wins, 0, None)
+                ]
+            else:
+                top_options, bottom_options = (self._options(feeder, branches) for feeder in WINNER_MAP[letter])
+                best_top = max(top_options, key=top_options.get)
+                best_bottom = max(bottom_options, key=bottom_options.get)
+                candidates = (
+                    [(team, 0, points + bottom_options[best_bottom], best_bottom) for team, points in top_options.items()]
+                    + [(team, 0, points + top_options[best_top], best_top) for team, points in bottom_options.items()]
+                )
+
+            node = {}
+            for team, other_wins, feeder_points, other_winner in candidates:
+                games, points = self._best_games(scoring, pick, team, 4 + other_wins)
+                node[team] = Branch(feeder_points + points, games, other_winner)
+            champion = max(node, key=lambda team: node[team].points)
+            branches[letter] = node
+            best[letter] = (node[champion].points, champion)
+            self.subtree_branches[subtree_id] = node
+            self.subtree_best[subtree_id] = best[letter]
+
+        final_letter = ALL_SERIES[-1][0]
+        points, champion = best[final_letter]
+        if final_letter in branches:
+            outcome = self._outcome(final_letter, champion, branches, subtree_ids)
+        else:
+            outcome = {}
+            self._best_outcome(final_letter, best, branches, subtree_ids, outcome)
+        return MaxPoints(decided_points + points, outcome)
+
+    def _best(
+        self,
+        letter: str,
+        feeders: list[str],
+        best: dict[str, tuple[int, Team]]
+    ) -> tuple[int, Team]:
+        series = self.api.get_series(letter)
+        if series.top_seed:
+            return 0, series.top_seed
+        points = 0
+        for feeder in feeders:
+            if feeder in best:
+                points += best[feeder][0]
+        top_letter = feeders[0]
+        top = best[top_letter][1] if top_letter in best else self.api.get_series(top_letter).get_winner().team
+        return points, top
+
+    def _best_outcome(
+        self,
+        letter: str,
+        best: dict[str, tuple[int, Team]],
+        branches: dict[str, dict[Team, Branch]],
+        subtree_ids: dict[str, int],
+        outcome: dict[str, Winner]
+    ):
+        series = self.api.get_series(letter)
+        if series.top_seed:
+            outcome[letter] = Winner(series.top_seed, 4 + series.bottom_seed_wins)
+            return
+        outcome[letter] = Winner(best[letter][1], 4)
+        for feeder in WINNER_MAP[letter]:
+            if feeder in branches:
+                outcome.update(self._outcome(feeder, best[feeder][1], branches, subtree_ids))
+            elif feeder in best:
+                self._best_outcome(feeder, best, branches, subtree_ids, outcome)
+
+    def _options(self, letter: str, branches: dict[str, dict[Team, Branch]]) -> dict[Team, int]:
+        if letter in branches:
+            return {team: branch.points for team, branch in branches[letter].items()}
+        return {self.api.get_series(letter).get_winner().team: 0}  # already over
+
+    @staticmethod
+    def _best_games(scoring: Scoring, pick: Pick, team: Team, min_games: int) -> tuple[int, int]:
+        if pick is None:
+            return min_games, 0
+        # matching the picked games never scores less than any other length
+        if pick.games >= min_games:
+            return pick.games, get_outcome_points(scoring, pick, team, pick.games)
+        return min_games, get_outcome_points(scoring, pick, team, min_games)
+
+    def _outcome(
+        self,
+        letter: str,
+        team: Team,
+        branches: dict[str, dict[Team, Branch]],
+        subtree_ids: dict[str, int]
+    ) -> dict[str, Winner]:
+        # walk back down the bracket to find how every live series went to reach the best branch
+        key = (subtree_ids[letter], team)
+        if key in self.subtree_outcomes:
+            return self.subtree_outcomes[key]
+
+        branch = branches[letter][team]
+        outcome = {letter: Winner(team, branch.games)}
+        if not self.api.get_series(letter).top_seed:  # otherwise both feeders are already over
+            for feeder in WINNER_MAP[letter]:
+                if feeder not in branches:
+                    continue
+                feeder_winner = team if team in branches[feeder] else branch.other_winner
+                outcome.update(self._outcome(feeder, feeder_winner, branches, subtree_ids))
+
+        self.subtree_outcomes[key] = outcome
+        return outcome
@@ -1,6 +1,5 @@
 from typing import Generator
-import requests
-
+from .bracket_cache import BracketCache
 from .common import Team
 from .series import Series, ALL_SERIES
 
@@ -8,27 +7,65 @@ NHL_API_URL = "https://api-web.nhle.com/v1/playoff-bracket/{0:d}"  # TODO
 TOP = "top"
 BOTTOM = "bottom"
 
+# handle team discrepancies between picks and api
+# also handle older years when picks were only shorthand
+TEAM_ALIASES = {
+    "BUFF": "BUF",
+    "CAL": "CGY",
+    "CLB": "CBJ",
+    "LA": "LAK",
+    "LV": "VGK",
+    "MON": "MTL",
+    "Montreal Canadiens": "Montréal Canadiens",
+    "NAS": "NSH",
+    "NASH": "NSH",
+    "NJ": "NJD",
+    "PHE": "PHX",
+    "PHO": "PHX",
+    "PITT": "PIT",
+    "SJ": "SJS",
+    "St Louis Blues": "St. Louis Blues",
+    "TB": "TBL",
+    "WAS": "WSH",
+    "WASH": "WSH",
+}
+
 
 class NhlApiHandler:
-    def __init__(self, year: int):
+    def __init__(self, year: int, cache: BracketCache = None):
         self.year = year
         self.url = NHL_API_URL.format(year)
+        self.cache = cache
+        # size of the body the last fetch got from the api, 0 if the cache already had it
+        self.fetched_bytes = 0
         self.teams: dict[str, Team] = {}
         self.series: list[Series] = []
 
-    def load(self):
+        # lookup indexes, filled in as the bracket is loaded
+        self.teams_by_alias: dict[str, Team] = {}
+        self.series_by_letter: dict[str, Series] = {}
+
+    def fetch(self) -> dict:
+        if self.cache:
+            payload = self.cache.get(self.year, self.url)
+            self.fetched_bytes = self.cache.fetched_bytes.get(self.year, 0)
+            return payload
+        from .bracket_fetcher import BracketFetcher  # only imports requests when it's needed
         print(f"Calling API: {self.url}")
-        response = requests.get(self.url)
+        response = BracketFetcher().fetch(self.url)
         response.raise_for_status()
+        self.fetched_bytes = len(response.content)
+        return response.json()
 
-        for series in response.json()["series"]:
+    def load(self, payload: dict):
+        for series in payload["series"]:
             if "seriesUrl" not in series:
                 continue  # series not fully set yet
 
             top_seed = self._build_team(series, TOP)
             bottom_seed = self._build_team(series, BOTTOM)
 
-            self.series.append(Series(
+            self._add_series(Series(
                 letter=series["seriesLetter"],
                 round=series["playoffRound"],
                 top_seed=top_seed,
@@ -41,12 +78,11 @@ class NhlApiHandler:
                 break
 
         # add future series to the list
-        existing_letters = map(lambda s: s.letter, self.series)
         for i, round in enumerate(ALL_SERIES):
             for series_letter in round:
-                if series_letter in existing_letters:
+                if series_letter in self.series_by_letter:
                     continue  # already have a record of it
-                self.series.append(Series(
+                self._add_series(Series(
                     letter=series_letter,
                     round=i+1,
                     top_seed=None,
@@ -55,6 +91,12 @@ class NhlApiHandler:
                     bottom_seed_wins=0
                 ))
 
+    def reload(self, payload: dict):
+        # the teams stay, so every pick already resolved against them stays valid, only the series are rebuilt
+        self.series = []
+        self.series_by_letter = {}
+        self.load(payload)
+
     def _build_team(self, series: dict, top_or_bottom: str) -> Team:
         seed = series[f"{top_or_bottom}SeedTeam"]
         short = seed["abbrev"]
@@ -72,55 +114,33 @@ class NhlApiHandler:
         )
 
         self.teams[team.short] = team
+        self._index_team(team)
         return team
 
+    def _index_team(self, team: Team):
+        names = [team.name, team.short]
+        for name in names:
+            self.teams_by_alias.setdefault(name, team)
+        for alias, name in TEAM_ALIASES.items():
+            if name in names:
+                self.teams_by_alias[alias] = team
+
+    def _add_series(self, series: Series):
+        self.series.append(series)
+        self.series_by_letter.setdefault(series.letter, series)
+
     # team_pick_str matches the full name of the team in picks.csv
     def get_team(self, team_pick_str: str) -> Team:
-        # handle team discrepancies between picks and api
-        # also handle older years when picks were only shorthand
-        conversion_map = {
-            "BUFF": "BUF",
-            "CAL": "CGY",
-            "CLB": "CBJ",
-            "LA": "LAK",
-            "LV": "VGK",
-            "MON": "MTL",
-            "Montreal Canadiens": "Montréal Canadiens",
-            "NAS": "NSH",
-            "NASH": "NSH",
-            "NJ": "NJD",
-            "PHE": "PHX",
-            "PHO": "PHX",
-            "PITT": "PIT",
-            "SJ": "SJS",
-            "St Louis Blues": "St. Louis Blues",
-            "TB": "TBL",
-            "WAS": "WSH",
-            "WASH": "WSH",
-        }
-        team_pick_str = conversion_map.get(team_pick_str, team_pick_str)
-
         try:
-            return next(  # return first occurrence or die
-                team
-                for team in self.teams.values()
-                if team_pick_str in [team.name, team.short]
-            )
-        except StopIteration:
-            raise Exception(f"Could not find {team_pick_str}")
+            return self.teams_by_alias[team_pick_str]
+        except KeyError:
+            raise Exception(f"Could not find {TEAM_ALIASES.get(team_pick_str, team_pick_str)}")
 
     def get_series(self, letter: str) -> Series:
-        return next(  # return first occurrence or die
-            series
-            for series in self.series
-            if series.letter == letter
-        )
+        return self.series_by_letter[letter]
 
     def get_series_or_none(self, letter: str) -> Series:
-        try:
-            return self.get_series(letter)
-        except (StopIteration):
-            return None
+        return self.series_by_letter.get(letter)
 
     def series_iter(self, round: int) -> Generator[str, any, any]:
         order = ALL_SERIES[round-1]
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import os
+import re
+
+from .bracket_cache import CachedBracket, DiskStorage
+from .nhl_api_handler import TEAM_ALIASES
+from .series import ALL_SERIES
+
+ROUND_TITLES = ["First Round", "Second Round", "Conference Final", "Stanley Cup Final"]
+# what the api calls each team, the pages only show the abbreviation. Picks before 2019 were typed
+# as abbreviations so only newer seasons ever match a pick on these.
+TEAM_NAMES = {
+    "ANA": "Anaheim Ducks",
+    "ARI": "Arizona Coyotes",
+    "ATL": "Atlanta Thrashers",
+    "BOS": "Boston Bruins",
+    "BUF": "Buffalo Sabres",
+    "CAR": "Carolina Hurricanes",
+    "CBJ": "Columbus Blue Jackets",
+    "CGY": "Calgary Flames",
+    "CHI": "Chicago Blackhawks",
+    "COL": "Colorado Avalanche",
+    "DAL": "Dallas Stars",
+    "DET": "Detroit Red Wings",
+    "EDM": "Edmonton Oilers",
+    "FLA": "Florida Panthers",
+    "HFD": "Hartford Whalers",
+    "LAK": "Los Angeles Kings",
+    "MIN": "Minnesota Wild",
+    "MTL": "Montréal Canadiens",
+    "NJD": "New Jersey Devils",
+    "NSH": "Nashville Predators",
+    "NYI": "New York Islanders",
+    "NYR": "New York Rangers",
+    "OTT": "Ottawa Senators",
+    "PHI": "Philadelphia Flyers",
+    "PHX": "Phoenix Coyotes",
+    "PIT": "Pittsburgh Penguins",
+    "SEA": "Seattle Kraken",
+    "SJS": "San Jose Sharks",
+    "STL": "St. Louis Blues",
+    "TBL": "Tampa Bay Lightning",
+    "TOR": "Toronto Maple Leafs",
+    "UTA": "Utah Hockey Club",
+    "VAN": "Vancouver Canucks",
+    "VGK": "Vegas Golden Knights",
+    "WPG": "Winnipeg Jets",
+    "WSH": "Washington Capitals",
+}
+SERIES_HEADER = re.compile(
+    r'<span>Series ([A-O]):</span>\s*<br />\s*<span class="[^"]*">(\w+) (\d)</span>'
+    r'\s*<br />\s*<span class="[^"]*">(\w+) (\d)</span>'
+)
+LOGO = re.compile(r'<img src="([^"]*)" alt="(\w+)"')
+RANKED_TEAM = re.compile(r'^(.+) \((\w+)\)$')  # "Dallas Stars (WC2)" in the forms since 2019
+
+
+def bracket_from_page(html: str, ranks: dict[str, str]) -> dict:
+    # the series headers of a published page hold every team and final series score. Logos come from
+    # the picks shown on the page, a team nobody ever picked never shows one and gets none.
+    logos = {short: src for src, short in LOGO.findall(html)}
+    series = {}
+    for letter, top, top_wins, bottom, bottom_wins in SERIES_HEADER.findall(html):
+        round = next(i for i, letters in enumerate(ALL_SERIES) if letter in letters)
+        series[letter] = {
+            "seriesUrl": "",
+            "seriesTitle": ROUND_TITLES[round],
+            "seriesLetter": letter,
+            "playoffRound": round + 1,
+            "topSeedRankAbbrev": ranks.get(TEAM_NAMES.get(top), ""),
+            "topSeedWins": int(top_wins),
+            "bottomSeedRankAbbrev": ranks.get(TEAM_NAMES.get(bottom), ""),
+            "bottomSeedWins": int(bottom_wins),
+            "topSeedTeam": _team_json(top, logos),
+            "bottomSeedTeam": _team_json(bottom, logos),
+        }
+    if len(series) != sum(map(len, ALL_SERIES)):
+        raise Exception(f"Only found {len(series)} finished series on the page")
+    return {"series": [series[letter] for letters in ALL_SERIES for letter in letters]}
+
+
+def _team_json(short: str, logos: dict[str, str]) -> dict:
+    if short not in TEAM_NAMES:
+        raise Exception(f"No name for {short}, add it to TEAM_NAMES")
+    return {"abbrev": short, "name": {"default": TEAM_NAMES[short]}, "logo": logos.get(short, "")}
+
+
+def read_ranks(folder_name: str) -> dict[str, str]:
+    # team name -> seed, from the "Name (seed)" cells of the forms that had them
+    ranks = {}
+    for round in range(1, len(ALL_SERIES) + 1):
+        path = os.path.join(folder_name, f"round{round}.csv")
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8-sig") as f:
+            for row in csv.reader(f):
+                for cell in row:
+                    match = RANKED_TEAM.match(cell.strip())
+                    if match:
+                        name, rank = match.groups()
+                        ranks.setdefault(TEAM_ALIASES.get(name, name), rank)
+    return ranks
+
+
+def record_year(year: int):
+    folder_name = str(year)
+    with open(os.path.join(folder_name, "index.html"), "r") as f:
+        payload = bracket_from_page(f.read(), read_ranks(folder_name))
+    DiskStorage(".").write(year, CachedBracket(payload, None, None, 0))
+    print(f"Recorded {folder_name}/bracket.json from {folder_name}/index.html")
+
+
+if __name__ == "__main__":
+    # for seasons that finished before brackets were recorded, so they can be rebuilt offline
+    parser = argparse.ArgumentParser()
+    parser.add_argument("years", type=int, nargs="+")
+    args = parser.parse_args()
+    for year in args.years:
+        record_year(year)
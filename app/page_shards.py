@@ -0,0 +1,65 @@
+import json
+import os
+import shutil
+
+SHARDS_DIR_NAME = "shards"
+SEARCH_INDEX_FILE_NAME = "search.json"
+# pools up to this size still get one document, past it every per person table is loaded a shard at a time
+SHARD_PEOPLE = 1000
+ROWS_PER_SHARD = 500
+
+
+# the page adds the shard number and .html
+def shard_url_prefix(table_id: str) -> str:
+    return f"{SHARDS_DIR_NAME}/{table_id}-"
+
+
+def shard_file_name(table_id: str, shard: int) -> str:
+    return f"{shard_url_prefix(table_id)}{shard}.html"
+
+
+class PageShards:
+    # the rows of every per person table, cut into files the page fetches as they scroll into view,
+    # plus a search index saying which shard of each table holds each person's row
+    def __init__(self, min_people: int = SHARD_PEOPLE, rows_per_shard: int = ROWS_PER_SHARD):
+        self.min_people = min_people
+        self.rows_per_shard = rows_per_shard
+        self.shards: dict[str, str] = {}
+        self.locations: dict[str, dict[str, int]] = {}  # table id -> person -> shard
+
+    def wanted(self, num_people: int) -> bool:
+        return num_people > self.min_people
+
+    def add(self, table_id: str, shard: int, people: list[str], html: str):
+        self.shards[shard_file_name(table_id, shard)] = html
+        self.locations.setdefault(table_id, {}).update(dict.fromkeys(people, shard))
+
+    def search_index(self) -> dict:
+        # names sorted the way people look for them, and for every table the shard of each name or -1
+        names = sorted({person for people in self.locations.values() for person in people}, key=lambda n: (n.lower(), n))
+        return {
+            "names": names,
+            "tables": {
+                table_id: [people.get(name, -1) for name in names]
+                for table_id, people in self.locations.items()
+            },
+        }
+
+    def files(self) -> dict[str, str]:
+        # relative to the page, nothing when the page wasn't sharded
+        if not self.shards:
+            return {}
+        files = dict(self.shards)
+        files[f"{SHARDS_DIR_NAME}/{SEARCH_INDEX_FILE_NAME}"] = json.dumps(self.search_index(), separators=(",", ":"))
+        return files
+
+
+def write_shards(folder_name: str, shards: PageShards):
+    # start over so a pool that shrank doesn't leave shards behind that no page asks for
+    shutil.rmtree(os.path.join(folder_name, SHARDS_DIR_NAME), ignore_errors=True)
+    files = shards.files()
+    if files:
+        os.makedirs(os.path.join(folder_name, SHARDS_DIR_NAME))
+    for file_name, text in files.items():
+        with open(os.path.join(folder_name, file_name), 'w') as f:
+            f.write(text)
@@ -0,0 +1,57 @@
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+# fields are numbers worth keeping with the timing, ie how big the fetched bracket was
+Span = namedtuple("Span", "phase seconds fields")
+
+
+class PhaseTimer:
+    # wall time of each phase of a run in the order they finished. A phase that runs more than once,
+    # like reading each round's picks, gets a span every time.
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    @contextmanager
+    def span(self, phase: str, **fields) -> Iterator[dict]:
+        # the body can add fields it only knows once it's done
+        start = time.perf_counter()
+        try:
+            yield fields
+        finally:
+            self.add(phase, time.perf_counter() - start, **fields)
+
+    def add(self, phase: str, seconds: float, **fields):
+        self.spans.append(Span(phase, seconds, fields))
+
+    def time_chunks(self, phase: str, chunks: Iterable[str]) -> Iterator[str]:
+        # for a page that's streamed out, only the time spent making the chunks counts, not writing them.
+        # The span is added once the last chunk has been taken.
+        seconds = 0.0
+        characters = 0
+        iterator = iter(chunks)
+        while True:
+            start = time.perf_counter()
+            chunk = next(iterator, None)
+            seconds += time.perf_counter() - start
+            if chunk is None:
+                break
+            characters += len(chunk)
+            yield chunk
+        self.add(phase, seconds, characters=characters)
+
+    def seconds(self, phase: str) -> float:
+        return sum(span.seconds for span in self.spans if span.phase == phase)
+
+    def totals(self) -> dict[str, float]:
+        totals: dict[str, float] = {}
+        for span in self.spans:
+            totals[span.phase] = totals.get(span.phase, 0.0) + span.seconds
+        return totals
+
+    def report(self) -> str:
+        lines = [f"{'Phase':<16} {'Seconds':>9}"]
+        for phase, seconds in self.totals().items():
+            lines.append(f"{phase:<16} {seconds:>9.4f}")
+        return "\n".join(lines)
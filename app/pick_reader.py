@@ -0,0 +1,166 @@
+import csv
+import itertools
+from collections import namedtuple
+from typing import Iterable, Iterator
+
+from .common import Pick, Team
+from .nhl_api_handler import NhlApiHandler
+from .series import ALL_SERIES
+
+# google forms export, a header then timestamp, name and alternating team/games columns (2008 on)
+FORMS = "forms"
+# hand typed, no header, name then "Team - games" cells (before 2008)
+LEGACY = "legacy"
+FORMS_HEADER = "Timestamp"
+
+# names people typed into the old sheets
+PERSON_ALIASES = {
+    "dad": "Derrick",
+    "mom": "Chrissy",
+    "chris": "Chrissy",
+    "m.c.b.": "Marc",
+}
+VALID_GAMES = range(4, 8)
+NO_GAMES = 0  # some old pools didn't pick games for the final, only ever allowed there
+MAX_REPORTED = 50
+# bump whenever what a csv parses to or what passes the checks changes, ie an alias or a check is added,
+# so rounds compiled into picks.bin by the old reader are read again
+PICK_READER_VERSION = 2
+
+PickProblem = namedtuple("PickProblem", "line person message")
+
+
+def detect_format(first_row: list[str]) -> str:
+    if first_row and first_row[0].strip() == FORMS_HEADER:
+        return FORMS
+    return LEGACY
+
+
+def strip_rank(team_name: str) -> str:
+    i = team_name.find('(')
+    if i == -1:
+        return team_name
+    return team_name[:i-1]  # strip the end, including the space before (
+
+
+def _forms_pick_cells(row: list[str]) -> tuple[str, Iterator[tuple[str, str]]]:
+    cells = iter(row[2:])
+    return row[1], zip(cells, cells)
+
+
+def _legacy_pick_cells(row: list[str]) -> tuple[str, Iterator[tuple[str, str]]]:
+    person = row[0]
+    person = PERSON_ALIASES.get(person.lower(), person)
+    return person, (cell.rpartition("-")[::2] for cell in row[1:])
+
+
+class PickParser:
+    # reads a whole file in one pass, collecting every problem instead of stopping at the first
+    def __init__(self, nhl_api_handler: NhlApiHandler, series_order: list[str]):
+        self.nhl_api_handler = nhl_api_handler
+        self.series_order = series_order
+        # raw cell -> team, so each distinct way a team was written is only resolved once
+        self.teams_by_cell: dict[str, Team] = {}
+        # (position, team cell, games cell) -> (team, games, problems), a pool only picks a few dozen ways
+        self.checked_picks: dict[tuple[int, str, str], tuple[Team, int, list[str]]] = {}
+        self.errors: list[PickProblem] = []
+        self.warnings: list[PickProblem] = []
+
+    def get_team(self, cell: str) -> Team:
+        try:
+            return self.teams_by_cell[cell]
+        except KeyError:
+            team = self.nhl_api_handler.teams_by_alias.get(strip_rank(cell.strip()))
+            self.teams_by_cell[cell] = team
+            return team
+
+    def check_pick(self, i: int, team_cell: str, games_cell: str) -> tuple[Team, int, list[str]]:
+        letter = self.series_order[i]
+        series = self.nhl_api_handler.get_series_or_none(letter)
+        problems = []
+
+        team = self.get_team(team_cell)
+        if team is None:
+            problems.append(f"unknown team '{team_cell.strip()}' in series {letter}")
+        elif series and series.top_seed and team is not series.top_seed and team is not series.bottom_seed:
+            problems.append(f"{team.short} isn't in series {letter}, {series.get_short_desc()}")
+
+        games = games_cell.strip()
+        games = int(games) if games.isdigit() else None
+        if games == NO_GAMES and letter not in ALL_SERIES[-1]:
+            problems.append(f"games for series {letter} must be 4-7, only the final can be 0")
+        elif games not in VALID_GAMES and games != NO_GAMES:
+            problems.append(f"games for series {letter} must be 4-7, not '{games_cell.strip()}'")
+        return team, games, problems
+
+    def parse(self, rows: Iterable[tuple[int, list[str]]], pick_format: str) -> dict[str, list[Pick]]:
+        pick_cells = _forms_pick_cells if pick_format == FORMS else _legacy_pick_cells
+        num_series = len(self.series_order)
+        seen_on: dict[str, int] = {}
+
+        picks_by_person = {}
+        for line, row in rows:
+            if not any(row):
+                continue
+            person, cells = pick_cells(row)
+            person = person.strip().capitalize()
+            picks = []
+            for i, (team_cell, games_cell) in enumerate(cells):
+                if i >= num_series:
+                    self.errors.append(PickProblem(line, person, f"more than the {num_series} picks this round has"))
+                    break
+                key = (i, team_cell, games_cell)
+                checked = self.checked_picks.get(key)
+                if checked is None:
+                    checked = self.checked_picks[key] = self.check_pick(i, team_cell, games_cell)
+                team, games, problems = checked
+                for problem in problems:
+                    self.errors.append(PickProblem(line, person, problem))
+                picks.append(Pick(self.series_order[i], team, games))
+
+            if len(picks) < num_series:
+                self.errors.append(PickProblem(line, person, f"{len(picks)} of the {num_series} picks this round has"))
+            if person in seen_on:
+                self.warnings.append(PickProblem(
+                    line, person, f"also submitted on line {seen_on[person]}, keeping this one"
+                ))
+            seen_on[person] = line
+            picks_by_person[person] = picks
+        return picks_by_person
+
+    def report(self, source: str) -> str:
+        problems = "".join(
+            f"\n  line {problem.line} ({problem.person}): {problem.message}" for problem in self.errors[:MAX_REPORTED]
+        )
+        if len(self.errors) > MAX_REPORTED:
+            problems += f"\n  and {len(self.errors) - MAX_REPORTED} more"
+        return f"{source} has {len(self.errors)} invalid picks:{problems}"
+
+
+def parse_picks(
+    rows: Iterable[list[str]],
+    nhl_api_handler: NhlApiHandler,
+    series_order: list[str],
+    pick_format: str,
+    source: str = "picks"
+) -> dict[str, list[Pick]]:
+    parser = PickParser(nhl_api_handler, series_order)
+    first_line = 2 if pick_format == FORMS else 1  # rows start after the header
+    picks_by_person = parser.parse(enumerate(rows, first_line), pick_format)
+    for warning in parser.warnings:
+        print(f"{source} line {warning.line} ({warning.person}): {warning.message}")
+    if parser.errors:
+        raise Exception(parser.report(source))
+    return picks_by_person
+
+
+def read_pick_file(file_path: str, nhl_api_handler: NhlApiHandler, series_order: list[str]) -> dict[str, list[Pick]]:
+    # streams straight from the file, the rows are never all held at once
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        first_row = next(reader, None)
+        if first_row is None:
+            return {}
+        pick_format = detect_format(first_row)
+        rows = reader if pick_format == FORMS else itertools.chain([first_row], reader)
+        return parse_picks(rows, nhl_api_handler, series_order, pick_format, file_path)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+import argparse
+import array
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Callable
+
+from .common import Pick, Team
+from .nhl_api_handler import NhlApiHandler
+from .pick_reader import PICK_READER_VERSION
+from .series import ALL_SERIES
+
+PICK_STORE_FILE_NAME = "picks.bin"
+MAGIC = b"PICKS\x00\x00\x01"
+HEADER_LENGTH = struct.Struct("<I")
+LETTERS = [letter for letters in ALL_SERIES for letter in letters]
+# one fixed width array per column, every pick of every season is one row across them
+COLUMNS = [
+    ("people", "I"),
+    ("letters", "B"),
+    ("teams", "H"),
+    ("games", "B"),
+]
+ALIGNMENT = 8
+
+
+def source_key(file_path: str, series_order: list[str]) -> str:
+    # everything a round's stored picks came from: the csv, the series its columns are for and how it
+    # was parsed and checked. Any of them changing makes the stored round stale
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        digest.update(f.read())
+    digest.update(json.dumps([PICK_READER_VERSION, series_order]).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _column_offsets(data_start: int, count: int) -> dict[str, int]:
+    offsets = {}
+    offset = data_start
+    for name, typecode in COLUMNS:
+        offset += -offset % ALIGNMENT
+        offsets[name] = offset
+        offset += count * array.array(typecode).itemsize
+    return offsets
+
+
+# seasons is (year, round) -> (source key of the round's csv, picks read from it)
+def write_store(path: str, seasons: dict[tuple[int, int], tuple[str, dict[str, list[Pick]]]]):
+    people: dict[str, int] = {}
+    teams: dict[str, int] = {}
+    columns = {name: array.array(typecode) for name, typecode in COLUMNS}
+    segments = []
+    for (year, round), (key, picks_by_person) in sorted(seasons.items()):
+        start = len(columns["games"])
+        for person, picks in picks_by_person.items():
+            person_id = people.setdefault(person, len(people))
+            for pick in picks:
+                columns["people"].append(person_id)
+                columns["letters"].append(LETTERS.index(pick.series_letter))
+                columns["teams"].append(teams.setdefault(pick.team.short, len(teams)))
+                columns["games"].append(pick.games)
+        segments.append([year, round, start, len(columns["games"]) - start, key])
+
+    header = json.dumps({
+        "people": list(people),
+        "teams": list(teams),
+        "segments": segments,
+        "count": len(columns["games"]),
+    }).encode("utf-8")
+    data_start = len(MAGIC) + HEADER_LENGTH.size + len(header)
+    offsets = _column_offsets(data_start, len(columns["games"]))
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(HEADER_LENGTH.pack(len(header)))
+        f.write(header)
+        for name, _ in COLUMNS:
+            f.write(b"\0" * (offsets[name] - f.tell()))
+            column = columns[name]
+            if sys.byteorder == "big":
+                column.byteswap()  # always stored little endian
+            f.write(column.tobytes())
+    os.replace(temp_path, path)
+
+
+class PickStore:
+    # every season's picks in one memory mapped file, nothing is parsed until a round is asked for
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mm[:len(MAGIC)] != MAGIC:
+            raise Exception(f"{path} is not a pick store, recompile it")
+
+        header_start = len(MAGIC) + HEADER_LENGTH.size
+        (header_length,) = HEADER_LENGTH.unpack_from(self.mm, len(MAGIC))
+        header = json.loads(self.mm[header_start:header_start + header_length])
+        self.people: list[str] = header["people"]
+        self.teams: list[str] = header["teams"]
+        self.segments: dict[tuple[int, int], tuple[int, int, str]] = {
+            (year, round): (start, count, key)
+            for year, round, start, count, key in header["segments"]
+        }
+
+        count = header["count"]
+        offsets = _column_offsets(header_start + header_length, count)
+        self.columns = {}
+        for name, typecode in COLUMNS:
+            size = count * array.array(typecode).itemsize
+            raw = memoryview(self.mm)[offsets[name]:offsets[name] + size]
+            if sys.byteorder == "little":
+                self.columns[name] = raw.cast(typecode)
+            else:
+                column = array.array(typecode, raw.tobytes())
+                column.byteswap()
+                self.columns[name] = column
+
+    def is_current(self, year: int, round: int, key: str) -> bool:
+        segment = self.segments.get((year, round))
+        return segment is not None and segment[2] == key
+
+    def get(self, year: int, round: int, key: str, nhl_api_handler: NhlApiHandler) -> dict[str, list[Pick]]:
+        # None when the round was never compiled or its csv, series order or reader has changed since
+        if not self.is_current(year, round, key):
+            return None
+        return self.read_round(year, round, nhl_api_handler.get_team)
+
+    def read_round(self, year: int, round: int, get_team: Callable[[str], Team]) -> dict[str, list[Pick]]:
+        start, count, _ = self.segments[(year, round)]
+        people, letters, teams, games = (
+            self.columns[name][start:start + count] for name, _ in COLUMNS
+        )
+        # only the teams this round uses, a season's payload doesn't know every franchise ever stored
+        resolved_teams = {team_id: get_team(self.teams[team_id]) for team_id in set(teams)}
+        all_people = self.people
+        picks_by_person: dict[str, list[Pick]] = {}
+        last_person_id = None
+        for person_id, letter, team_id, num_games in zip(people, letters, teams, games):
+            if person_id != last_person_id:
+                picks = picks_by_person.setdefault(all_people[person_id], [])
+                last_person_id = person_id
+            picks.append(Pick(LETTERS[letter], resolved_teams[team_id], num_games))
+        return picks_by_person
+
+
+def compile_store(path: str, payloads: dict[int, dict]) -> dict[tuple[int, int], tuple[str, dict[str, list[Pick]]]]:
+    # csv_to_html reads from the store, so not at the top
+    from .csv_to_html import get_series_import_order, read_round_picks
+
+    seasons = {}
+    if os.path.exists(path):
+        # every other year's rounds are carried over, so compiling some years never drops the rest.
+        # Only abbreviations are stored, which is all write_store needs of a team
+        store = PickStore(path)
+        for (year, round), (_, _, key) in store.segments.items():
+            if year not in payloads:
+                picks_by_person = store.read_round(year, round, lambda short: Team(short, short, "", "", False))
+                seasons[(year, round)] = (key, picks_by_person)
+    for year, payload in payloads.items():
+        nhl_api_handler = NhlApiHandler(year)
+        nhl_api_handler.load(payload)
+        for round in range(1, 5):
+            csv_path = os.path.join(str(year), f"round{round}.csv")
+            if os.path.exists(csv_path):
+                picks_by_person = read_round_picks(csv_path, nhl_api_handler, year, round)
+                seasons[(year, round)] = (source_key(csv_path, get_series_import_order(year, round)), picks_by_person)
+    write_store(path, seasons)
+    return seasons
+
+
+def is_store_current(path: str, years: list[int]) -> bool:
+    from .csv_to_html import get_series_import_order
+
+    if not os.path.exists(path):
+        return False
+    store = PickStore(path)
+    for year in years:
+        for round in range(1, 5):
+            csv_path = os.path.join(str(year), f"round{round}.csv")
+            if os.path.exists(csv_path) and not store.is_current(
+                year, round, source_key(csv_path, get_series_import_order(year, round))
+            ):
+                return False
+    return True
+
+
+if __name__ == "__main__":
+    from .bracket_cache import BracketCache, DiskStorage
+    from .build import parse_years
+    from .nhl_api_handler import NHL_API_URL
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--years", required=True, help="ie 1997-2024 or 2022,2024")
+    parser.add_argument("--offline", action="store_true", help="only use the recorded YEAR/bracket.json files")
+    args = parser.parse_args()
+
+    years = [year for year in parse_years(args.years) if os.path.isdir(str(year))]
+    payloads = BracketCache(DiskStorage("."), offline=args.offline).get_many(
+        {year: NHL_API_URL.format(year) for year in years}
+    )
+    seasons = compile_store(PICK_STORE_FILE_NAME, payloads)
+    print(f"Compiled {len(years)} years into {PICK_STORE_FILE_NAME}, which holds {len(seasons)} rounds")
@@ -0,0 +1,70 @@
+import cProfile
+import os
+import sys
+import threading
+from collections import Counter
+from types import FrameType
+
+# how often the sampler looks at the profiled thread's stack
+SAMPLE_INTERVAL = 0.005
+
+
+def frame_name(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    # cProfile only keeps caller -> callee pairs, so for full stacks a thread samples the profiled one's
+    # stack every few milliseconds and counts each stack it sees, the folded format flamegraph.pl reads
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        self._thread_id = threading.get_ident()
+        self._stop.clear()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            names = []
+            while frame is not None:
+                names.append(frame_name(frame))
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+class Profiler:
+    # cProfile for exact per function totals, written as PREFIX.pstats for pstats or snakeviz,
+    # and sampled stacks for a flame graph, written as PREFIX.collapsed
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+        self.profile = cProfile.Profile()
+        self.sampler = StackSampler()
+
+    def __enter__(self):
+        self.sampler.start()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.disable()
+        self.sampler.stop()
+        self.profile.dump_stats(f"{self.prefix}.pstats")
+        with open(f"{self.prefix}.collapsed", "w") as f:
+            f.write(self.sampler.collapsed())
+        print(f"Wrote {self.prefix}.pstats and {self.prefix}.collapsed")
@@ -1,8 +1,10 @@
 from collections import defaultdict
 from dataclasses import dataclass
 
-from .common import Row, Team, Scoring, Pick, excel_rank
+from .common import Row, Team, Scoring, Pick
 from .nhl_api_handler import NhlApiHandler
+from .scoring import get_outcome_points
+from .standings import person_ranks
 
 
 @dataclass
@@ -55,8 +57,7 @@ class ProjectionCalculator:
                         games
                     )
 
-                all_points = points.values()
-                rank_map = {person: excel_rank(all_points, score) for person, score in points.items()}
+                rank_map = person_ranks(points)
                 loser_rank = max(rank_map.values())
 
                 cells[team] = ProjectionCell(
@@ -105,18 +106,8 @@ class ProjectionCalculator:
         team: str,
         games: int
     ) -> int:
-        team_points = scoring.team if pick.team == team else 0
-        game_points = scoring.games if pick.games == games else 0
-        bonus_points = scoring.bonus if team_points > 0 and game_points > 0 else 0
-        return team_points + game_points + bonus_points
-
-    def _create_empty_table(self) -> list[list[ProjectionCell]]:
-        return [
-            ProjectionCell(
-                winners="-",
-                losers="-",
-                is_possible=None
-            )
-            for _ in range(4, 8)  # games 4 -> 7
-            for _ in range(2)  # 2 teams left
-        ]
+        return get_outcome_points(scoring, pick, team, games)
+
+    def _create_empty_table(self) -> dict[int, dict[str, ProjectionCell]]:
+        # nothing to project until both finalists are known
+        return {}
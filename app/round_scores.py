@@ -0,0 +1,65 @@
+from .common import PickResult, PickStatus, Row, Scoring
+from .nhl_api_handler import NhlApiHandler
+from .scoring import SeriesScorer
+from .series import Series
+
+
+def series_state(series: Series) -> tuple:
+    # everything a pick's result in this series depends on
+    return (series.top_seed, series.bottom_seed, series.top_seed_wins, series.bottom_seed_wins)
+
+
+class RoundScores:
+    # one round's rows, kept up to date a series at a time. A pick result only depends on its own
+    # series, and a row's totals are sums of its pick results, so when one series moves only that
+    # series' results are rescored and each total is adjusted by the difference.
+    def __init__(
+        self,
+        rows: list[Row],
+        nhl_api_handler: NhlApiHandler,
+        scoring: Scoring,
+        series_letters: list[str]
+    ):
+        self.rows = rows
+        self.scoring = scoring
+        self.series_letters = series_letters
+        self.positions = {letter: i for i, letter in enumerate(series_letters)}
+        self.states = {letter: series_state(nhl_api_handler.get_series(letter)) for letter in series_letters}
+
+    def changed_series(self, nhl_api_handler: NhlApiHandler) -> list[str]:
+        return [
+            letter
+            for letter in self.series_letters
+            if series_state(nhl_api_handler.get_series(letter)) != self.states[letter]
+        ]
+
+    def update(self, nhl_api_handler: NhlApiHandler) -> list[Row]:
+        changed = self.changed_series(nhl_api_handler)
+        if not changed:
+            return self.rows
+
+        scorers = [
+            (self.positions[letter], SeriesScorer(nhl_api_handler.get_series(letter), self.scoring))
+            for letter in changed
+        ]
+        rows = []
+        for row in self.rows:
+            pick_results = list(row.pick_results)
+            total_points = row.total_points
+            total_possible_points = row.possible_points
+            teams_correct = row.teams_correct
+            games_correct = row.games_correct
+            for i, scorer in scorers:
+                old = pick_results[i]
+                points, possible_points, team_status, games_status = scorer.score(old.pick)
+                pick_results[i] = PickResult(old.series_letter, old.pick, points, possible_points, team_status, games_status)
+                total_points += points - old.points
+                total_possible_points += possible_points - old.possible_points
+                teams_correct += (team_status == PickStatus.CORRECT) - (old.team_status == PickStatus.CORRECT)
+                games_correct += (games_status == PickStatus.CORRECT) - (old.games_status == PickStatus.CORRECT)
+            rows.append(Row(row.person, pick_results, total_points, total_possible_points, teams_correct, games_correct))
+
+        self.rows = rows
+        for letter in changed:
+            self.states[letter] = series_state(nhl_api_handler.get_series(letter))
+        return rows
@@ -0,0 +1,89 @@
+import gzip
+import hashlib
+import tempfile
+from collections import namedtuple
+from typing import Iterable
+
+from .aws import s3_resource
+
+# s3 won't take a multipart upload part smaller than this, except for the last one
+MIN_PART_SIZE = 5 * 1024 * 1024
+HASH_METADATA_KEY = "sha256"
+# pages change every few minutes during a game so browsers always check back, using the etag
+HTML_CACHE_CONTROL = "no-cache"
+CSS_CACHE_CONTROL = "public, max-age=604800"
+
+# bytes are the compressed size, written if uploaded and skipped if the stored copy was already identical
+PublishResult = namedtuple("PublishResult", "key bytes_written bytes_skipped")
+
+
+class S3Publisher:
+    def __init__(self, bucket_name: str, s3_client=None):
+        from boto3.s3.transfer import TransferConfig
+        self.bucket_name = bucket_name
+        self.s3 = s3_client or s3_resource().meta.client
+        self.transfer_config = TransferConfig(multipart_threshold=MIN_PART_SIZE, multipart_chunksize=MIN_PART_SIZE)
+
+    def publish(
+        self,
+        key: str,
+        chunks: Iterable[str | bytes],
+        content_type: str,
+        cache_control: str
+    ) -> PublishResult:
+        # compress into a spool that only goes to disk once it outgrows a part, hashing the
+        # uncompressed bytes on the way so the result can be compared with what's stored
+        digest = hashlib.sha256()
+        with tempfile.SpooledTemporaryFile(max_size=MIN_PART_SIZE) as spool:
+            with gzip.GzipFile(fileobj=spool, mode="wb", mtime=0) as compressed:
+                for chunk in chunks:
+                    data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+                    digest.update(data)
+                    compressed.write(data)
+            size = spool.tell()
+
+            if self._stored_hash(key) == digest.hexdigest():
+                print(f"Skipping unchanged s3://{self.bucket_name}/{key}")
+                return PublishResult(key, 0, size)
+
+            spool.seek(0)
+            self.s3.upload_fileobj(
+                spool,
+                self.bucket_name,
+                key,
+                ExtraArgs={
+                    "ContentType": content_type,
+                    "ContentEncoding": "gzip",
+                    "CacheControl": cache_control,
+                    "Metadata": {HASH_METADATA_KEY: digest.hexdigest()},
+                },
+                Config=self.transfer_config
+            )
+            print(f"Uploaded s3://{self.bucket_name}/{key}")
+            return PublishResult(key, size, 0)
+
+    def publish_file(self, path: str, key: str, content_type: str, cache_control: str) -> PublishResult:
+        with open(path, "rb") as f:
+            return self.publish(key, iter(lambda: f.read(MIN_PART_SIZE), b""), content_type, cache_control)
+
+    def read(self, key: str) -> bytes:
+        # what publish stored under key, uncompressed, or None if nothing has been
+        from botocore.exceptions import ClientError
+        try:
+            response = self.s3.get_object(Bucket=self.bucket_name, Key=key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        body = response["Body"].read()
+        return gzip.decompress(body) if response.get("ContentEncoding") == "gzip" else body
+
+    def _stored_hash(self, key: str) -> str:
+        from botocore.exceptions import ClientError
+        try:
+            response = self.s3.head_object(Bucket=self.bucket_name, Key=key)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return response.get("Metadata", {}).get(HASH_METADATA_KEY)
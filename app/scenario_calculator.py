@@ -0,0 +1,250 @@
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+
+from .common import Pick, Row, Scoring, Team
+from .nhl_api_handler import NhlApiHandler
+from .scoring import get_outcome_points
+from .series import ALL_SERIES, WINNER_MAP
+
+# about 7 seconds of tallying, see _work. A 16 person pool with all 8 first round series still to play is
+# about 4.8 million, so every round fits for pools up to 20 people. A 1000 person pool only gets odds once
+# one or two series are left. Reports are kept between polls, so this is paid once per game played.
+MAX_SCENARIO_WORK = 8_000_000
+# (winning team, points gained by each person, number of scenarios)
+Outcome = tuple[Team, tuple[int, ...], int]
+
+
+@dataclass
+class ScenarioOdds:
+    person: str
+    first: int
+    second: int
+    third: int
+    last: int
+    is_clinched: bool
+    is_eliminated: bool
+
+
+@dataclass
+class ScenarioReport:
+    num_scenarios: int
+    odds: dict[str, ScenarioOdds]  # None when there were too many scenarios to check in time
+
+
+class ScenarioCalculator:
+    def __init__(
+        self,
+        all_rows: list[list[Row]],
+        all_picks: list[dict[str, list[Pick]]],
+        nhl_api_handler: NhlApiHandler,
+        scoring: list[Scoring]
+    ):
+        self.all_rows = all_rows
+        self.all_picks = all_picks
+        self.api = nhl_api_handler
+        self.scoring = scoring
+
+        self.people = sorted({row.person for round_rows in all_rows for row in round_rows})
+        self.person_index = {person: i for i, person in enumerate(self.people)}
+
+        self.picks_by_letter: dict[str, list[tuple[int, Pick]]] = defaultdict(list)
+        for picks_by_person in all_picks:
+            for person, picks in picks_by_person.items():
+                for pick in picks:
+                    self.picks_by_letter[pick.series_letter].append((self.person_index[person], pick))
+
+    def calculate(self, max_work: int = None) -> ScenarioReport:
+        left, right, multiplier = self._plan()
+        if max_work is not None and self._work(left, right) > max_work:
+            num_scenarios = multiplier * math.prod(sum(group.values()) for group in left + right)
+            return ScenarioReport(num_scenarios, None)
+        left = [self._add_baseline(left[0])] + left[1:]
+        return self._tally(self._combine(left), self._combine(right), multiplier)
+
+    def _plan(self) -> tuple[list[dict[tuple[int, ...], int]], list[dict[tuple[int, ...], int]], int]:
+        live_letters = [
+            letter
+            for letters in ALL_SERIES
+            for letter in letters
+            if not self.api.get_series(letter).is_over()
+        ]
+
+        # a live series only needs its winner remembered if a later series with picks depends on it
+        needed_winners = set()
+        for letter in reversed(live_letters):
+            series = self.api.get_series(letter)
+            if series.top_seed is None and (letter in self.picks_by_letter or letter in needed_winners):
+                needed_winners.update(WINNER_MAP[letter])
+
+        # every live series nobody downstream depends on is independent of the others, and once
+        # its winner is forgotten outcomes giving everyone the same points collapse into one
+        multiplier = 1
+        groups: list[dict[tuple[int, ...], int]] = []
+        for letter in live_letters:
+            if letter in needed_winners:
+                continue  # folded into the series that needs it
+            points = defaultdict(int)
+            for _, delta, count in self._outcomes(letter, False):
+                points[delta] += count
+            if len(points) == 1:
+                multiplier *= next(iter(points.values()))
+            else:
+                groups.append(points)
+
+        left, right = self._split(groups)
+        return left, right, multiplier
+
+    def _work(self, left: list[dict[tuple[int, ...], int]], right: list[dict[tuple[int, ...], int]]) -> int:
+        # every pair of people builds masks over the right halves then checks every left half against
+        # them. Fitted to timed runs, a unit is about a microsecond. Outcomes can merge, so the halves'
+        # sizes are upper bounds.
+        left_size = math.prod(map(len, left))
+        right_size = math.prod(map(len, right))
+        return len(self.people) ** 2 * (8 + left_size + right_size + left_size * right_size // 1600)
+
+    def _outcomes(self, letter: str, needs_winner: bool) -> list[Outcome]:
+        series = self.api.get_series(letter)
+        no_points = (0,) * len(self.people)
+
+        if series.is_over():
+            # its points are already part of the baseline
+            return [(series.get_winner().team, no_points, 1)]
+
+        if series.top_seed is not None:
+            feeder_outcomes = [(series.top_seed, series.bottom_seed, no_points, 1)]
+        elif letter in self.picks_by_letter or needs_winner:
+            top_letter, bottom_letter = WINNER_MAP[letter]
+            feeder_outcomes = [
+                (top_team, bottom_team, self._add(top_delta, bottom_delta), top_count * bottom_count)
+                for top_team, top_delta, top_count in self._outcomes(top_letter, True)
+                for bottom_team, bottom_delta, bottom_count in self._outcomes(bottom_letter, True)
+            ]
+        else:
+            # nobody picked it and nobody needs to know who wins, so the teams don't matter
+            feeder_outcomes = [(None, None, no_points, 1)]
+
+        picks = self.picks_by_letter.get(letter, [])
+        scoring = self.scoring[series.round - 1]
+        merged = defaultdict(int)
+        for top_seed, bottom_seed, feeder_delta, count in feeder_outcomes:
+            # a team winning in g games means the other team finished with g - 4 wins
+            for team, other_wins in [(top_seed, series.bottom_seed_wins), (bottom_seed, series.top_seed_wins)]:
+                for games in range(4 + other_wins, 8):
+                    delta = list(feeder_delta)
+                    for person, pick in picks:
+                        delta[person] += get_outcome_points(scoring, pick, team, games)
+                    merged[(team if needs_winner else None, tuple(delta))] += count
+        return [(team, delta, count) for (team, delta), count in merged.items()]
+
+    @staticmethod
+    def _add(a: tuple[int, ...], b: tuple[int, ...]) -> tuple[int, ...]:
+        return tuple(x + y for x, y in zip(a, b))
+
+    def _add_baseline(self, group: dict[tuple[int, ...], int]) -> dict[tuple[int, ...], int]:
+        # points already locked in from finished series
+        baseline = [0] * len(self.people)
+        for round_rows in self.all_rows:
+            for row in round_rows:
+                for result in row.pick_results:
+                    if self.api.get_series(result.series_letter).is_over():
+                        baseline[self.person_index[row.person]] += result.points
+        return {self._add(delta, tuple(baseline)): count for delta, count in group.items()}
+
+    def _split(
+        self,
+        groups: list[dict[tuple[int, ...], int]]
+    ) -> tuple[list[dict[tuple[int, ...], int]], list[dict[tuple[int, ...], int]]]:
+        # meet in the middle: balance the number of combinations on each side
+        no_points = {(0,) * len(self.people): 1}
+        left, right = [no_points], [no_points]
+        left_size, right_size = 0, 0
+        for group in sorted(groups, key=len, reverse=True):
+            if left_size <= right_size:
+                left.append(group)
+                left_size += math.log(len(group))
+            else:
+                right.append(group)
+                right_size += math.log(len(group))
+        return left, right
+
+    def _combine(self, groups: list[dict[tuple[int, ...], int]]) -> dict[tuple[int, ...], int]:
+        combined = groups[0]
+        for group in groups[1:]:
+            new_combined = defaultdict(int)
+            for points, count in combined.items():
+                for delta, delta_count in group.items():
+                    new_combined[self._add(points, delta)] += count * delta_count
+            combined = new_combined
+        return combined
+
+    def _tally(
+        self,
+        left: dict[tuple[int, ...], int],
+        right: dict[tuple[int, ...], int],
+        multiplier: int
+    ) -> ScenarioReport:
+        # every scenario is one left half plus one right half. The right halves are kept as bits of
+        # a big int so each left half is checked against all of them with a handful of bitwise ops.
+        right_points = list(right.keys())
+        right_counts = list(right.values())
+        all_bits = (1 << len(right_points)) - 1
+        count_planes = [
+            sum(1 << i for i, count in enumerate(right_counts) if count >> plane & 1)
+            for plane in range(max(right_counts).bit_length())
+        ]
+
+        def count_scenarios(bits: int) -> int:
+            return sum((bits & plane).bit_count() << i for i, plane in enumerate(count_planes))
+
+        num_scenarios = sum(left.values()) * sum(right_counts) * multiplier
+        odds = {}
+        for p, person in enumerate(self.people):
+            masks = self._right_half_masks(p, right_points)
+            finishes = [0, 0, 0, 0]  # 1st, 2nd, 3rd, last
+            for points, count in left.items():
+                none_above, one_above, two_above, none_below = all_bits, 0, 0, all_bits
+                for q, (above, below, low) in masks.items():
+                    i = min(max(points[p] - points[q] - low, 0), len(above) - 1)
+                    two_above = (two_above & ~above[i]) | (one_above & above[i])
+                    one_above = (one_above & ~above[i]) | (none_above & above[i])
+                    none_above &= ~above[i]
+                    none_below &= ~below[i]
+                finishes[0] += count * count_scenarios(none_above)
+                finishes[1] += count * count_scenarios(one_above)
+                finishes[2] += count * count_scenarios(two_above)
+                finishes[3] += count * count_scenarios(none_below)
+
+            first, second, third, last = (finish * multiplier for finish in finishes)
+            odds[person] = ScenarioOdds(
+                person=person,
+                first=first,
+                second=second,
+                third=third,
+                last=last,
+                is_clinched=first == num_scenarios,
+                is_eliminated=first == 0
+            )
+        return ScenarioReport(num_scenarios, odds)
+
+    def _right_half_masks(self, p: int, right_points: list[tuple[int, ...]]) -> dict[int, tuple]:
+        # p's left half lead over q is points[p] - points[q]. For each opponent q and each possible
+        # lead this holds the right halves where q still finishes strictly ahead of p (above) or
+        # strictly behind p (below), indexed by lead - low.
+        masks = {}
+        for q in range(len(self.people)):
+            if q == p:
+                continue
+            diffs = [points[q] - points[p] for points in right_points]
+            low, high = min(diffs) - 1, max(diffs) + 1
+            buckets = [0] * (high - low + 1)
+            for i, diff in enumerate(diffs):
+                buckets[diff - low] |= 1 << i
+
+            above, below = [0] * len(buckets), [0] * len(buckets)
+            for i in reversed(range(len(buckets) - 1)):
+                above[i] = above[i + 1] | buckets[i + 1]
+            for i in range(1, len(buckets)):
+                below[i] = below[i - 1] | buckets[i - 1]
+            masks[q] = (above, below, low)
+        return masks
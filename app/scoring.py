@@ -0,0 +1,124 @@
+from collections import namedtuple
+
+from .common import Pick, PickStatus, Scoring, Team, Winner
+from .series import Series
+
+PickScore = namedtuple("PickScore", "points possible_points team_status games_status")
+
+
+class SeriesScorer:
+    # a pick's result only depends on the series and the team and games picked, so there are at most
+    # 8 distinct results per series. Score each once and hand the same result to everyone who picked it.
+    def __init__(self, series: Series, scoring: Scoring):
+        self.series = series
+        self.scoring = scoring
+        self.winner = series.get_winner()
+        self.scores: dict[tuple[str, int], PickScore] = {}
+
+    def score(self, pick: Pick) -> PickScore:
+        key = (pick.team.short, pick.games)
+        score = self.scores.get(key)
+        if score is None:
+            score = self._score(pick)
+            self.scores[key] = score
+        return score
+
+    def _score(self, pick: Pick) -> PickScore:
+        team_status = get_team_status(pick, self.winner)
+        games_status = get_games_status(pick, self.winner, self.series)
+        points = get_points(self.scoring, team_status, games_status)
+        possible_points = (
+            points
+            if self.winner else
+            calculate_possible_points(pick, self.series, self.scoring, team_status, games_status)
+        )
+        return PickScore(points, possible_points, team_status, games_status)
+
+
+# points a pick would earn if team went on to win the series in games
+def get_outcome_points(scoring: Scoring, pick: Pick, team: Team, games: int) -> int:
+    team_points = scoring.team if team and pick.team.short == team.short else 0
+    game_points = scoring.games if pick.games == games else 0
+    bonus_points = scoring.bonus if team_points > 0 and game_points > 0 else 0
+    return team_points + game_points + bonus_points
+
+
+def get_pick_status(pick: Pick, winner: Winner, predicate: callable) -> PickStatus:
+    if not winner:
+        return PickStatus.UNKNOWN
+    if predicate(pick, winner):
+        return PickStatus.CORRECT
+    return PickStatus.INCORRECT
+
+
+def get_team_status(pick: Pick, winner: Winner) -> PickStatus:
+    return get_pick_status(
+        pick,
+        winner,
+        lambda p, w: p.team.short == w.team.short
+    )
+
+
+def get_games_status(pick: Pick, winner: Winner, series: Series) -> PickStatus:
+    # sometimes we can assign correctness early
+    if winner is None:
+        games_played = series.total_games()
+        # since we know the 7th game will be the last we can give points early
+        if games_played == 6 and pick.games == 7:
+            return PickStatus.CORRECT
+        # if >= games than the guess have been played, it's a bad guess
+        if games_played >= pick.games:
+            return PickStatus.INCORRECT
+        # certain games become impossible, ie both teams win 1 each so 4 games is impossible
+        min_games_for_winner = min(series.top_seed_wins, series.bottom_seed_wins) + 4
+        if pick.games < min_games_for_winner:
+            return PickStatus.INCORRECT
+    return get_pick_status(
+        pick,
+        winner,
+        lambda p, w: p.games == w.games
+    )
+
+
+def get_points(scoring: Scoring, team_status: PickStatus, games_status: PickStatus) -> int:
+    correct_team = team_status == PickStatus.CORRECT
+    correct_games = games_status == PickStatus.CORRECT
+    points = 0
+    points += scoring.team if correct_team else 0
+    points += scoring.games if correct_games else 0
+    points += scoring.bonus if correct_team and correct_games else 0
+    return points
+
+
+# this function should ONLY be called when there is no winner
+def calculate_possible_points(
+    pick: Pick,
+    series: Series,
+    scoring: Scoring,
+    team_status: PickStatus,
+    games_status: PickStatus
+) -> int:
+    possible_from_team = scoring.team if team_status in [PickStatus.CORRECT, PickStatus.UNKNOWN] else 0
+    possible_from_games = scoring.games if games_status in [PickStatus.CORRECT, PickStatus.UNKNOWN] else 0
+
+    if series.top_seed_wins < series.bottom_seed_wins:
+        current_loser_team = series.bottom_seed
+        current_loser_wins = series.bottom_seed_wins
+        current_leader_team = series.top_seed
+        current_leader_wins = series.top_seed_wins
+    else:
+        current_loser_team = series.top_seed
+        current_loser_wins = series.top_seed_wins
+        current_leader_team = series.bottom_seed
+        current_leader_wins = series.bottom_seed_wins
+
+    num_games_leader_needs = 4 - current_leader_wins
+    num_games_loser_needs = 4 - current_loser_wins
+
+    is_loser_bonus_possible = pick.team == current_loser_team and pick.games >= (num_games_loser_needs + current_loser_wins + current_leader_wins)
+    is_leader_bonus_possible = pick.team == current_leader_team and pick.games >= (num_games_leader_needs + current_leader_wins + current_loser_wins)
+    is_bonus_possible = is_loser_bonus_possible or is_leader_bonus_possible
+
+    if is_bonus_possible:
+        return possible_from_team + possible_from_games + scoring.bonus
+    return max(possible_from_team, possible_from_games)
@@ -0,0 +1,210 @@
+import csv
+import math
+import os
+import random
+from collections import namedtuple
+from dataclasses import dataclass
+
+from .common import Pick, Row, Scoring, Team, excel_ranks
+from .nhl_api_handler import NhlApiHandler
+from .scoring import get_outcome_points
+from .series import ALL_SERIES, WINNER_MAP
+
+PROBABILITIES_FILE_NAME = "win_probabilities.csv"
+DEFAULT_STRENGTH = 0.5
+WILD_CARD_STRENGTH = 0.47
+DIVISION_RANK_STRENGTHS = {"1": 0.56, "2": 0.53, "3": 0.5}
+CHUNK_SIZE = 50_000
+Z_95 = 1.96
+
+Probability = namedtuple("Probability", "estimate low high")
+# the parts of a Series the simulation needs, top and bottom are None until the matchup is set
+LiveSeries = namedtuple("LiveSeries", "letter round top bottom top_wins bottom_wins")
+
+
+@dataclass
+class SimulationOdds:
+    person: str
+    first: Probability
+    second: Probability
+    third: Probability
+    last: Probability
+
+
+@dataclass
+class SimulationReport:
+    num_simulations: int
+    odds: dict[str, SimulationOdds]
+
+
+@dataclass
+class SimulationModel:
+    # everything a worker process needs, pickled once per chunk
+    live_series: list[LiveSeries]
+    winners: dict[str, Team]
+    strengths: dict[str, float]
+    picks_by_letter: dict[str, list[tuple[int, Pick]]]
+    scoring: list[Scoring]
+    baseline: list[int]
+
+
+# seeds look like D1/P2/A3/M1/C2 for division rank or WC1/WC2 for wild cards
+def strength_from_rank(rank: str) -> float:
+    if not rank:
+        return DEFAULT_STRENGTH
+    if rank.startswith("WC"):
+        return WILD_CARD_STRENGTH
+    return DIVISION_RANK_STRENGTHS.get(rank[-1], DEFAULT_STRENGTH)
+
+
+def read_strengths(folder_name: str, nhl_api_handler: NhlApiHandler) -> dict[str, float]:
+    strengths = {
+        short: strength_from_rank(team.rank)
+        for short, team in nhl_api_handler.teams.items()
+    }
+    file_path = os.path.join(folder_name, PROBABILITIES_FILE_NAME)
+    if os.path.exists(file_path):
+        with open(file_path, 'r') as f:
+            for row in csv.DictReader(f):
+                strengths[nhl_api_handler.get_team(row["team"]).short] = float(row["probability"])
+    return strengths
+
+
+# chance that a team with strength a beats a team with strength b in one game
+def game_win_probability(a: float, b: float) -> float:
+    return a * (1 - b) / (a * (1 - b) + b * (1 - a))
+
+
+def wilson_interval(successes: int, trials: int) -> Probability:
+    if trials == 0:
+        return Probability(0.0, 0.0, 0.0)
+    p = successes / trials
+    denominator = 1 + Z_95 ** 2 / trials
+    centre = (p + Z_95 ** 2 / (2 * trials)) / denominator
+    margin = Z_95 * math.sqrt(p * (1 - p) / trials + Z_95 ** 2 / (4 * trials ** 2)) / denominator
+    return Probability(p, max(0.0, centre - margin), min(1.0, centre + margin))
+
+
+class Simulator:
+    def __init__(
+        self,
+        all_rows: list[list[Row]],
+        all_picks: list[dict[str, list[Pick]]],
+        nhl_api_handler: NhlApiHandler,
+        scoring: list[Scoring],
+        strengths: dict[str, float]
+    ):
+        self.api = nhl_api_handler
+        self.people = sorted({row.person for round_rows in all_rows for row in round_rows})
+        person_index = {person: i for i, person in enumerate(self.people)}
+
+        picks_by_letter: dict[str, list[tuple[int, Pick]]] = {}
+        for picks_by_person in all_picks:
+            for person, picks in picks_by_person.items():
+                for pick in picks:
+                    picks_by_letter.setdefault(pick.series_letter, []).append((person_index[person], pick))
+
+        # points already locked in from finished series
+        baseline = [0] * len(self.people)
+        for round_rows in all_rows:
+            for row in round_rows:
+                for result in row.pick_results:
+                    if self.api.get_series(result.series_letter).is_over():
+                        baseline[person_index[row.person]] += result.points
+
+        live_series = []
+        winners = {}
+        for letters in ALL_SERIES:
+            for letter in letters:
+                series = self.api.get_series(letter)
+                winner = series.get_winner()
+                if winner:
+                    winners[letter] = winner.team
+                    continue
+                live_series.append(LiveSeries(
+                    letter,
+                    series.round,
+                    series.top_seed,
+                    series.bottom_seed,
+                    series.top_seed_wins,
+                    series.bottom_seed_wins
+                ))
+
+        self.model = SimulationModel(live_series, winners, strengths, picks_by_letter, scoring, baseline)
+
+    def calculate(self, num_simulations: int, seed: int = 0, jobs: int = None) -> SimulationReport:
+        # the work is always cut into the same chunks, each seeded from its index, so the
+        # result only depends on the seed and not on how many processes ran it
+        chunks = [
+            (self.model, seed, i, min(CHUNK_SIZE, num_simulations - start))
+            for i, start in enumerate(range(0, num_simulations, CHUNK_SIZE))
+        ]
+        from concurrent.futures import ProcessPoolExecutor  # multiprocessing is slow to import, only pay for it here
+        finishes = [[0, 0, 0, 0] for _ in self.people]  # 1st, 2nd, 3rd, last
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for chunk_finishes in executor.map(_simulate_chunk, chunks):
+                for person_finishes, chunk_person_finishes in zip(finishes, chunk_finishes):
+                    for i, count in enumerate(chunk_person_finishes):
+                        person_finishes[i] += count
+
+        return SimulationReport(
+            num_simulations,
+            {
+                person: SimulationOdds(person, *(wilson_interval(count, num_simulations) for count in counts))
+                for person, counts in zip(self.people, finishes)
+            }
+        )
+
+
+def _simulate_chunk(chunk: tuple[SimulationModel, int, int, int]) -> list[list[int]]:
+    model, seed, chunk_index, num_simulations = chunk
+    rng = random.Random(f"{seed}-{chunk_index}")
+    finishes = [[0, 0, 0, 0] for _ in model.baseline]
+    points_cache: dict[tuple[str, str, int], list[tuple[int, int]]] = {}
+
+    for _ in range(num_simulations):
+        winners = dict(model.winners)
+        scores = model.baseline[:]
+        for series in model.live_series:
+            top = series.top or winners[WINNER_MAP[series.letter][0]]
+            bottom = series.bottom or winners[WINNER_MAP[series.letter][1]]
+            top_wins, bottom_wins = series.top_wins, series.bottom_wins
+            p = game_win_probability(
+                model.strengths.get(top.short, DEFAULT_STRENGTH),
+                model.strengths.get(bottom.short, DEFAULT_STRENGTH)
+            )
+            while top_wins < 4 and bottom_wins < 4:
+                if rng.random() < p:
+                    top_wins += 1
+                else:
+                    bottom_wins += 1
+            winner = top if top_wins == 4 else bottom
+            winners[series.letter] = winner
+
+            key = (series.letter, winner.short, top_wins + bottom_wins)
+            points = points_cache.get(key)
+            if points is None:
+                points = _outcome_points(model, series, winner, top_wins + bottom_wins)
+                points_cache[key] = points
+            for person, person_points in points:
+                scores[person] += person_points
+
+        ranks = excel_ranks(scores)
+        lowest = min(scores)
+        for person, score in enumerate(scores):
+            rank = ranks[score]
+            if rank <= 3:
+                finishes[person][rank - 1] += 1
+            if score == lowest:
+                finishes[person][3] += 1
+    return finishes
+
+
+def _outcome_points(model: SimulationModel, series: LiveSeries, winner: Team, games: int) -> list[tuple[int, int]]:
+    scoring = model.scoring[series.round - 1]
+    points = []
+    for person, pick in model.picks_by_letter.get(series.letter, []):
+        person_points = get_outcome_points(scoring, pick, winner, games)
+        if person_points:
+            points.append((person, person_points))
+    return points
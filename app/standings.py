@@ -0,0 +1,94 @@
+from collections import namedtuple
+from operator import attrgetter
+
+from .common import Row, SummaryRow, excel_ranks
+from .max_points_solver import MaxPoints
+
+# everything the page, the feed, the history and the leaders need about where each person stands. Everything
+# is keyed by person except round_ranks, which maps each round's point totals to the rank they earn that round.
+Standings = namedtuple("Standings", "summary_map rank_map round_ranks teams_correct games_correct")
+
+get_person = attrgetter("person")
+get_total_points = attrgetter("total_points")
+get_possible_points = attrgetter("possible_points")
+get_teams_correct = attrgetter("teams_correct")
+get_games_correct = attrgetter("games_correct")
+
+
+def person_ranks(scores: dict[str, int]) -> dict[str, int]:
+    ranks = excel_ranks(scores.values())
+    return {person: ranks[score] for person, score in scores.items()}
+
+
+def calculate_standings(all_rows: list[list[Row]], max_points: dict[str, MaxPoints] = None) -> Standings:
+    # rows are lined up by person so every round is added a whole column at a time, which keeps
+    # python's per row work to a handful of C calls and lets a 100k person pool rank in a fraction of a second
+    people = dict.fromkeys(map(get_person, all_rows[0])) if all_rows else {}
+    order = list(people)
+    columns = []
+    for round_rows in all_rows:
+        persons = list(map(get_person, round_rows))
+        if persons == order:
+            columns.append(round_rows)  # already lined up, rounds are usually built from the same csv order
+            continue
+        by_person = dict(zip(persons, round_rows))
+        if len(round_rows) != len(people) or by_person.keys() != people.keys():
+            # someone is missing from a round or in it twice, add them up a row at a time instead
+            return _calculate_standings_by_row(all_rows, max_points)
+        columns.append(list(map(by_person.__getitem__, order)))
+
+    round_points = [list(map(get_total_points, rows)) for rows in columns]
+    total_points = dict(zip(order, map(sum, zip(*round_points))))
+    possible_points = dict(zip(order, map(sum, zip(*(map(get_possible_points, rows) for rows in columns)))))
+    teams_correct = dict(zip(order, map(sum, zip(*(map(get_teams_correct, rows) for rows in columns)))))
+    games_correct = dict(zip(order, map(sum, zip(*(map(get_games_correct, rows) for rows in columns)))))
+    round_totals = dict(zip(order, map(list, zip(*round_points))))
+    round_ranks = [excel_ranks(points) for points in round_points]
+    return _standings(round_totals, total_points, possible_points, round_ranks, teams_correct, games_correct, max_points)
+
+
+def _calculate_standings_by_row(all_rows: list[list[Row]], max_points: dict[str, MaxPoints]) -> Standings:
+    round_totals: dict[str, list[int]] = {}
+    total_points: dict[str, int] = {}
+    possible_points: dict[str, int] = {}
+    teams_correct: dict[str, int] = {}
+    games_correct: dict[str, int] = {}
+    for round_rows in all_rows:
+        for row in round_rows:
+            person = row.person
+            if person in total_points:
+                round_totals[person].append(row.total_points)
+                total_points[person] += row.total_points
+                possible_points[person] += row.possible_points
+                teams_correct[person] += row.teams_correct
+                games_correct[person] += row.games_correct
+            else:
+                round_totals[person] = [row.total_points]
+                total_points[person] = row.total_points
+                possible_points[person] = row.possible_points
+                teams_correct[person] = row.teams_correct
+                games_correct[person] = row.games_correct
+    round_ranks = [excel_ranks(map(get_total_points, round_rows)) for round_rows in all_rows]
+    return _standings(round_totals, total_points, possible_points, round_ranks, teams_correct, games_correct, max_points)
+
+
+def _standings(
+    round_totals: dict[str, list[int]],
+    total_points: dict[str, int],
+    possible_points: dict[str, int],
+    round_ranks: list[dict[int, int]],
+    teams_correct: dict[str, int],
+    games_correct: dict[str, int],
+    max_points: dict[str, MaxPoints]
+) -> Standings:
+    # picks in different series can conflict, so prefer the bracket-wide maximum when we have it
+    if max_points:
+        for person, person_max in max_points.items():
+            if person in possible_points:
+                possible_points[person] = person_max.points
+
+    summary_map = dict(zip(
+        total_points,
+        map(SummaryRow, total_points, round_totals.values(), total_points.values(), possible_points.values())
+    ))
+    return Standings(summary_map, person_ranks(total_points), round_ranks, teams_correct, games_correct)
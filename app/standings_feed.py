@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+
+from .common import PickResult, Row
+from .leader_calculator import Leaders
+from .nhl_api_handler import NhlApiHandler
+from .projection_calculator import ProjectionCell
+from .series import Series
+from .standings import Standings
+
+FEED_FILE_NAME = "standings.json"
+DELTA_FILE_NAME = "standings.delta.json"
+# bump whenever a field changes meaning or goes away, adding one doesn't need it
+FEED_SCHEMA = 1
+
+
+def _pick_json(result: PickResult) -> dict:
+    pick = result.pick
+    return {
+        "team": pick.team.short if pick else None,
+        "games": pick.games if pick else None,
+        "points": result.points,
+        "possible_points": result.possible_points,
+        "team_status": result.team_status.name.lower(),
+        "games_status": result.games_status.name.lower(),
+    }
+
+
+def _series_json(series: Series) -> dict:
+    return {
+        "round": series.round,
+        "top_seed": series.top_seed.short if series.top_seed else None,
+        "bottom_seed": series.bottom_seed.short if series.bottom_seed else None,
+        "top_seed_wins": series.top_seed_wins,
+        "bottom_seed_wins": series.bottom_seed_wins,
+    }
+
+
+def _projection_json(cell: ProjectionCell) -> dict:
+    return {
+        "first": cell.first,
+        "second": cell.second,
+        "third": cell.third,
+        "losers": cell.losers,
+        "is_possible": cell.is_possible,
+    }
+
+
+def revision(document: dict) -> str:
+    content = {key: value for key, value in document.items() if key != "revision"}
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def make_feed(
+    year: int,
+    nhl_api_handler: NhlApiHandler,
+    all_rows: list[list[Row]],
+    standings: Standings,
+    leaders: Leaders,
+    projections: dict[int, dict[str, ProjectionCell]]
+) -> dict:
+    # keyed by person, series and team rather than listed, so a delta can point at exactly what moved
+    document = {
+        "schema": FEED_SCHEMA,
+        "year": year,
+        "standings": {
+            person: {
+                "rank": standings.rank_map[person],
+                "total_points": summary_row.total_points,
+                "possible_points": summary_row.possible_points,
+                "round_totals": summary_row.round_totals,
+            }
+            for person, summary_row in standings.summary_map.items()
+        },
+        "leaders": {"leaders": leaders.leaders, "winner": leaders.winner},
+        "rounds": [
+            {
+                row.person: {
+                    "total_points": row.total_points,
+                    "possible_points": row.possible_points,
+                    "picks": {result.series_letter: _pick_json(result) for result in row.pick_results},
+                }
+                for row in round_rows
+            }
+            for round_rows in all_rows
+        ],
+        "series": {series.letter: _series_json(series) for series in nhl_api_handler.series},
+        "projections": {
+            str(games): {team.short: _projection_json(cell) for team, cell in cells.items()}
+            for games, cells in projections.items()
+        },
+    }
+    document["revision"] = revision(document)
+    return document
+
+
+def _diff(previous, current, path: list, changed: list, removed: list):
+    if isinstance(previous, dict) and isinstance(current, dict):
+        for key, value in current.items():
+            if key not in previous:
+                changed.append([path + [key], value])
+            else:
+                _diff(previous[key], value, path + [key], changed, removed)
+        removed.extend(path + [key] for key in previous if key not in current)
+    elif isinstance(previous, list) and isinstance(current, list) and len(previous) == len(current):
+        for i, (before, after) in enumerate(zip(previous, current)):
+            _diff(before, after, path + [i], changed, removed)
+    elif previous != current:
+        changed.append([path, current])
+
+
+def make_delta(previous: dict, current: dict) -> dict:
+    # what turns the previous document into the current one, set every [path, value] and drop every path
+    changed, removed = [], []
+    _diff(previous, current, [], changed, removed)
+    return {
+        "schema": FEED_SCHEMA,
+        "year": current["year"],
+        "from": previous["revision"],
+        "to": current["revision"],
+        "set": changed,
+        "remove": removed,
+    }
+
+
+def reset_delta(current: dict) -> dict:
+    # for when there's no previous document to diff, from nothing and setting the whole document
+    return {
+        "schema": FEED_SCHEMA,
+        "year": current["year"],
+        "from": None,
+        "to": current["revision"],
+        "set": [[[], current]],
+        "remove": [],
+    }
+
+
+class StandingsFeed:
+    # the json twin of index.html, filled in by render from the same rows the page is drawn from
+    def __init__(self, previous: dict = None):
+        if previous and previous.get("schema") != FEED_SCHEMA:
+            previous = None  # can't describe a change from a shape we no longer write
+        self.previous = previous
+        self.document: dict = None
+
+    def update(self, document: dict):
+        self.document = document
+
+    def delta(self) -> dict:
+        if not self.previous:
+            return None
+        return make_delta(self.previous, self.document)
+
+    def files(self) -> dict[str, str]:
+        # file name -> json, written next to index.html. Always a delta, one from an older document
+        # left in place would take a reader from the wrong revision
+        delta = self.delta() or reset_delta(self.document)
+        return {
+            FEED_FILE_NAME: json.dumps(self.document, separators=(",", ":")),
+            DELTA_FILE_NAME: json.dumps(delta, separators=(",", ":")),
+        }
+
+
+def read_feed(folder_name: str) -> dict:
+    path = os.path.join(folder_name, FEED_FILE_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def write_feed(folder_name: str, feed: StandingsFeed):
+    for file_name, text in feed.files().items():
+        with open(os.path.join(folder_name, file_name), 'w') as f:
+            f.write(text)
@@ -0,0 +1,88 @@
+import hashlib
+from typing import Callable
+
+from .bracket_cache import BracketCache
+from .common import Pick, Row, Scoring
+from .nhl_api_handler import NhlApiHandler
+from .phase_timer import PhaseTimer
+from .round_scores import RoundScores, series_state
+from .scenario_calculator import ScenarioReport
+
+
+class WarmState:
+    # everything that survives between invocations while a lambda container stays warm. Picks only
+    # change when a round's csv does, so only the bracket is refreshed and rows rescored when it moves.
+    def __init__(self):
+        self.apis: dict[int, NhlApiHandler] = {}
+        # file path -> (file hash and teams it was resolved against, picks)
+        self.picks: dict[str, tuple[tuple, dict[str, list[Pick]]]] = {}
+        # file path -> (picks key, the round's rows as of the last series states seen)
+        self.rows: dict[str, tuple[tuple, RoundScores]] = {}
+        # (picks keys and series states, report) of the last render
+        self.scenarios: tuple[tuple, ScenarioReport] = None
+
+    def get_api(self, year: int, bracket_cache: BracketCache, timer: PhaseTimer = None) -> NhlApiHandler:
+        timer = timer or PhaseTimer()
+        nhl_api_handler = self.apis.get(year)
+        fresh = nhl_api_handler is None
+        if fresh:
+            nhl_api_handler = NhlApiHandler(year, bracket_cache)
+            self.apis[year] = nhl_api_handler
+        else:
+            nhl_api_handler.cache = bracket_cache
+        with timer.span("fetch bracket") as fields:
+            payload = nhl_api_handler.fetch()
+            fields["fetched_bytes"] = nhl_api_handler.fetched_bytes
+        with timer.span("resolve teams"):
+            if fresh:
+                nhl_api_handler.load(payload)
+            else:
+                nhl_api_handler.reload(payload)
+        return nhl_api_handler
+
+    def get_picks(
+        self,
+        file_path: str,
+        nhl_api_handler: NhlApiHandler,
+        read: Callable[[], dict[str, list[Pick]]]
+    ) -> tuple[tuple, dict[str, list[Pick]]]:
+        with open(file_path, 'rb') as f:
+            file_hash = hashlib.sha256(f.read()).hexdigest()
+        key = (file_hash, tuple(nhl_api_handler.teams.values()))
+        cached = self.picks.get(file_path)
+        if cached and cached[0] == key:
+            return cached
+        self.picks[file_path] = (key, read())
+        return self.picks[file_path]
+
+    def get_rows(
+        self,
+        file_path: str,
+        picks_key: tuple,
+        nhl_api_handler: NhlApiHandler,
+        scoring: Scoring,
+        series_letters: list[str],
+        build: Callable[[], list[Row]]
+    ) -> list[Row]:
+        # same picks, so only the series that moved since the last call are rescored
+        cached = self.rows.get(file_path)
+        if cached and cached[0] == picks_key:
+            return cached[1].update(nhl_api_handler)
+        round_scores = RoundScores(build(), nhl_api_handler, scoring, series_letters)
+        self.rows[file_path] = (picks_key, round_scores)
+        return round_scores.rows
+
+    def get_scenarios(
+        self,
+        file_paths: list[str],
+        nhl_api_handler: NhlApiHandler,
+        calculate: Callable[[], ScenarioReport]
+    ) -> ScenarioReport:
+        # the odds only move when a game is played or picks change, most polls see neither
+        key = (
+            tuple(self.picks[file_path][0] for file_path in file_paths),
+            tuple(map(series_state, nhl_api_handler.series))
+        )
+        if self.scenarios is None or self.scenarios[0] != key:
+            self.scenarios = (key, calculate())
+        return self.scenarios[1]
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+import argparse
+import json
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from operator import add
+from urllib.parse import parse_qsl, urlsplit
+
+from .bracket_cache import BracketCache, DiskStorage
+from .common import Row, Scoring, Team, excel_ranks
+from .csv_to_html import SCORING, read_rounds
+from .nhl_api_handler import NhlApiHandler
+from .scoring import get_outcome_points
+from .series import WINNER_MAP
+
+# winner is anything a picks csv could call the team, ie FLA or Florida Panthers
+SeriesOutcome = namedtuple("SeriesOutcome", "letter winner games")
+WhatIfRow = namedtuple("WhatIfRow", "person points rank current_points current_rank")
+
+NO_PICK = 0  # the pick group of everyone who didn't pick a series
+
+
+class WhatIfCalculator:
+    # a pick's points only depend on the team and games picked, so everyone's picks in a series are grouped
+    # by what they picked and every outcome of the series gets the points each group would gain by it.
+    # A query is then a lookup of each person's group in the tables of the series it decides, added to
+    # the current totals, instead of rerunning the pipeline.
+    def __init__(self, all_rows: list[list[Row]], nhl_api_handler: NhlApiHandler, scoring: list[Scoring]):
+        self.api = nhl_api_handler
+        self.scoring = scoring
+
+        self.people = sorted({row.person for round_rows in all_rows for row in round_rows})
+        self.person_index = {person: i for i, person in enumerate(self.people)}
+        self.current_points = [0] * len(self.people)
+
+        # letter -> each person's pick group, and letter -> group -> (pick, points it has now)
+        self.pick_groups: dict[str, list[int]] = {}
+        group_keys: dict[str, dict[tuple[str, int], int]] = {}
+        group_picks: dict[str, list[tuple]] = {}
+        for round_rows in all_rows:
+            for row in round_rows:
+                p = self.person_index[row.person]
+                self.current_points[p] += row.total_points
+                for result in row.pick_results:
+                    if result.pick is None:
+                        continue
+                    letter = result.series_letter
+                    if letter not in self.pick_groups:
+                        self.pick_groups[letter] = [NO_PICK] * len(self.people)
+                        group_keys[letter] = {}
+                        group_picks[letter] = [(None, 0)]
+                    key = (result.pick.team.short, result.pick.games)
+                    group = group_keys[letter].get(key)
+                    if group is None:
+                        group = group_keys[letter][key] = len(group_picks[letter])
+                        group_picks[letter].append((result.pick, result.points))
+                    self.pick_groups[letter][p] = group
+
+        # letter -> (winner's short name, games) -> points each group gains, a winner nobody picked is None
+        self.outcome_points: dict[str, dict[tuple[str, int], list[int]]] = {
+            letter: self._outcome_points(letter, picks) for letter, picks in group_picks.items()
+        }
+        self.current_ranks = excel_ranks(self.current_points)
+
+    def _outcome_points(self, letter: str, picks: list[tuple]) -> dict[tuple[str, int], list[int]]:
+        scoring = self.scoring[self.api.get_series(letter).round - 1]
+        teams = {pick.team.short: pick.team for pick, _ in picks[1:]}
+        tables = {}
+        for team in [*teams.values(), None]:
+            for games in range(4, 8):
+                tables[(team and team.short, games)] = [0] + [
+                    get_outcome_points(scoring, pick, team, games) - points for pick, points in picks[1:]
+                ]
+        return tables
+
+    def standings(self, outcomes: list[SeriesOutcome]) -> list[WhatIfRow]:
+        totals = self.current_points
+        for letter, team, games in self._resolve(outcomes):
+            tables = self.outcome_points.get(letter)
+            if tables is None:
+                continue  # nobody has picked it yet
+            gains = tables.get((team.short, games)) or tables[(None, games)]
+            totals = list(map(add, totals, map(gains.__getitem__, self.pick_groups[letter])))
+
+        ranks = excel_ranks(totals)
+        rows = [
+            WhatIfRow(person, points, ranks[points], current, self.current_ranks[current])
+            for person, points, current in zip(self.people, totals, self.current_points)
+        ]
+        rows.sort(key=lambda row: (row.rank, row.person))
+        return rows
+
+    def _resolve(self, outcomes: list[SeriesOutcome]) -> list[tuple[str, Team, int]]:
+        # check every outcome could still happen given the real results and the other outcomes
+        winners: dict[str, Team] = {}
+        resolved = []
+        for letter, winner, games in outcomes:
+            series = self.api.get_series_or_none(letter)
+            if series is None:
+                raise Exception(f"There is no series {letter}")
+            if letter in winners:
+                raise Exception(f"Series {letter} has more than one outcome")
+            if games not in range(4, 8):
+                raise Exception(f"A series can't be won in {games} games")
+            team = self.api.get_team(winner)
+            winners[letter] = team
+            resolved.append((letter, team, games))
+
+        for letter, team, games in resolved:
+            series = self.api.get_series(letter)
+            result = series.get_winner()
+            if result is not None:
+                if (result.team.short, result.games) != (team.short, games):
+                    raise Exception(f"Series {letter} is over, {result.team.short} won in {result.games}")
+                continue
+            if team.short not in self._contenders(letter, winners):
+                raise Exception(f"{team.short} can't win series {letter}")
+            if series.top_seed is not None:
+                loser_wins = series.bottom_seed_wins if team.short == series.top_seed.short else series.top_seed_wins
+                if loser_wins > games - 4:
+                    raise Exception(f"{team.short} can't win series {letter} in {games}, it's already gone longer")
+        return resolved
+
+    def _contenders(self, letter: str, winners: dict[str, Team]) -> set[str]:
+        # teams that can still win the series, given the real results and the other outcomes
+        series = self.api.get_series(letter)
+        result = series.get_winner()
+        if result is not None:
+            return {result.team.short}
+        if series.top_seed is not None:
+            return {series.top_seed.short, series.bottom_seed.short}
+        top_letter, bottom_letter = WINNER_MAP[letter]
+        return self._feeder_winners(top_letter, winners) | self._feeder_winners(bottom_letter, winners)
+
+    def _feeder_winners(self, letter: str, winners: dict[str, Team]) -> set[str]:
+        if letter in winners:
+            return {winners[letter].short}
+        return self._contenders(letter, winners)
+
+
+def load_what_if(folder_name: str, bracket_cache: BracketCache = None) -> WhatIfCalculator:
+    nhl_api_handler = NhlApiHandler(int(folder_name.rstrip('/')), bracket_cache)
+    nhl_api_handler.load(nhl_api_handler.fetch())
+    all_rows, _ = read_rounds(folder_name, nhl_api_handler)
+    return WhatIfCalculator(all_rows, nhl_api_handler, SCORING)
+
+
+def parse_outcomes(query: str) -> list[SeriesOutcome]:
+    # A=FLA-6&I=FLA-7, one series letter per outcome
+    outcomes = []
+    for letter, value in parse_qsl(query):
+        winner, _, games = value.rpartition("-")
+        if not winner or not games.isdigit():
+            raise Exception(f"Expected {letter}=TEAM-GAMES, not {letter}={value}")
+        outcomes.append(SeriesOutcome(letter.upper(), winner, int(games)))
+    return outcomes
+
+
+def make_handler(what_if: WhatIfCalculator) -> type[BaseHTTPRequestHandler]:
+    class WhatIfHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path != "/what-if":
+                self.send_error(404)
+                return
+            try:
+                outcomes = parse_outcomes(url.query)
+                rows = what_if.standings(outcomes)
+            except Exception as e:
+                self._send(400, {"error": str(e)})
+                return
+            self._send(200, {
+                "outcomes": [outcome._asdict() for outcome in outcomes],
+                "standings": [row._asdict() for row in rows],
+            })
+
+        def _send(self, status: int, body: dict):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return WhatIfHandler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("year")
+    parser.add_argument("--port", type=int, default=8001, help="ask with /what-if?A=FLA-6&I=FLA-7")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="use only the recorded YEAR/bracket.json, never call the api"
+    )
+    args = parser.parse_args()
+
+    what_if = load_what_if(args.year, BracketCache(DiskStorage("."), offline=args.offline))
+    server = ThreadingHTTPServer(("localhost", args.port), make_handler(what_if))
+    print(f"Answering what-ifs for {args.year} on http://localhost:{args.port}/what-if")
+    server.serve_forever()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+import argparse
+import random
+import time
+
+from app.csv_to_html import SCORING, build_data
+from app.round_scores import RoundScores
+from app.series import ALL_SERIES
+
+from .synthetic import make_api, make_bracket_payload, make_picks
+
+
+def play_games(rng: random.Random, payload: dict) -> int:
+    # a few random games across random unfinished series, what a night of polls sees
+    live = [s for s in payload["series"] if max(s["topSeedWins"], s["bottomSeedWins"]) < 4]
+    games = 0
+    for series in rng.sample(live, min(len(live), rng.randint(0, 3))):
+        series["topSeedWins" if rng.random() < 0.5 else "bottomSeedWins"] += 1
+        games += 1
+    return games
+
+
+def run(sizes: list[int], updates: int, seed: int):
+    # every update is checked against a full rescore, any difference fails the run
+    print(f"{'People':>8} {'Updates':>8} {'Games':>6} {'Full (ms)':>10} {'Incremental (ms)':>17} {'Speedup':>8}")
+    for size in sizes:
+        rng = random.Random(seed)
+        payload = make_bracket_payload(seed, rounds_complete=0, live_wins=(0, 0))
+        api = make_api(payload, 2025)
+        picks_by_person = make_picks(api, size, rounds=1, seed=seed)[0]
+        round_scores = RoundScores(
+            build_data(SCORING[0], api, picks_by_person, ALL_SERIES[0]),
+            api,
+            SCORING[0],
+            ALL_SERIES[0]
+        )
+
+        full_seconds = incremental_seconds = 0.0
+        total_games = 0
+        for update in range(updates):
+            total_games += play_games(rng, payload)
+            api.reload(payload)
+
+            start = time.perf_counter()
+            incremental_rows = round_scores.update(api)
+            incremental_seconds += time.perf_counter() - start
+
+            start = time.perf_counter()
+            full_rows = build_data(SCORING[0], api, picks_by_person, ALL_SERIES[0])
+            full_seconds += time.perf_counter() - start
+
+            if incremental_rows != full_rows:
+                raise Exception(f"incremental rows differ from a full rescore for {size} people, update {update}")
+        print(
+            f"{size:>8} {updates:>8} {total_games:>6} {full_seconds / updates * 1000:>10.2f} "
+            f"{incremental_seconds / updates * 1000:>17.2f} {full_seconds / incremental_seconds:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--people", type=int, nargs="+", default=[16, 1000, 10000])
+    parser.add_argument("--updates", type=int, default=50, help="polls per pool, each plays 0-3 random games")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.people, args.updates, args.seed)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+import argparse
+import time
+
+from app.csv_to_html import SCORING, build_data
+from app.nhl_api_handler import TEAM_ALIASES
+from app.pick_reader import FORMS, parse_picks
+from app.series import ALL_SERIES
+
+from .synthetic import make_api, make_bracket_payload, make_csv_rows, make_picks
+
+
+# the scans NhlApiHandler and build_data used before the indexes, kept here as the baseline
+def linear_get_series(api, letter):
+    return next(series for series in api.series if series.letter == letter)
+
+
+def linear_get_team(api, team_pick_str):
+    team_pick_str = TEAM_ALIASES.get(team_pick_str, team_pick_str)
+    return next(team for team in api.teams.values() if team_pick_str in [team.name, team.short])
+
+
+def linear_find_picks(picks_by_person, series_letters):
+    return [
+        next(p for p in picks if p.series_letter == series_letter)
+        for picks in picks_by_person.values()
+        for series_letter in series_letters
+    ]
+
+
+def indexed_find_picks(picks_by_person, series_letters):
+    found = []
+    for picks in picks_by_person.values():
+        picks_by_letter = {p.series_letter: p for p in reversed(picks)}
+        found.extend(picks_by_letter[series_letter] for series_letter in series_letters)
+    return found
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def run(sizes: list[int]):
+    api = make_api(make_bracket_payload())
+    team_names = [team.name for team in api.teams.values()] + [team.short for team in api.teams.values()]
+
+    print(f"{'People':>8} {'Stage':<14} {'Linear (s)':>11} {'Indexed (s)':>12} {'Speedup':>8}")
+    for size in sizes:
+        lookups = size * len(ALL_SERIES[0])
+        series_letters = [letter for letters in ALL_SERIES for letter in letters]
+        picks_by_person = make_picks(api, size, rounds=1)[0]
+        stages = [
+            (
+                "get_series",
+                lambda: [linear_get_series(api, series_letters[i % 15]) for i in range(lookups)],
+                lambda: [api.get_series(series_letters[i % 15]) for i in range(lookups)],
+            ),
+            (
+                "get_team",
+                lambda: [linear_get_team(api, team_names[i % len(team_names)]) for i in range(lookups)],
+                lambda: [api.get_team(team_names[i % len(team_names)]) for i in range(lookups)],
+            ),
+            (
+                "find_picks",
+                lambda: linear_find_picks(picks_by_person, ALL_SERIES[0]),
+                lambda: indexed_find_picks(picks_by_person, ALL_SERIES[0]),
+            ),
+        ]
+        for name, linear, indexed in stages:
+            linear_seconds = timed(linear)
+            indexed_seconds = timed(indexed)
+            print(f"{size:>8} {name:<14} {linear_seconds:>11.4f} {indexed_seconds:>12.4f} {linear_seconds / indexed_seconds:>7.1f}x")
+
+        csv_rows = make_csv_rows(api, size)
+        read_seconds = timed(parse_picks, csv_rows, api, ALL_SERIES[0], FORMS)
+        build_seconds = timed(build_data, SCORING[0], api, picks_by_person, ALL_SERIES[0])
+        print(f"{size:>8} {'parse_picks':<14} {'':>11} {read_seconds:>12.4f}")
+        print(f"{size:>8} {'build_data':<14} {'':>11} {build_seconds:>12.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--people", type=int, nargs="+", default=[16, 1000, 10000])
+    args = parser.parse_args()
+    run(args.people)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import json
+import os
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+from app.csv_to_html import SCORING, build_data, read_round_picks
+from app.html_generator import HtmlGenerator
+from app.leader_calculator import LeaderCalculator
+from app.max_points_solver import MaxPointsSolver
+from app.nhl_api_handler import NhlApiHandler
+from app.projection_calculator import ProjectionCalculator
+from app.scenario_calculator import ScenarioCalculator
+from app.series import ALL_SERIES
+
+from .synthetic import make_bracket_payload, make_csv_rows
+
+YEAR = 2025  # a year without a hardcoded pick order, so synthetic picks follow the api's
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+# recorded once from make_bracket_payload so timings stay comparable even if the generator changes
+FIXTURES = {
+    "round1": {"rounds_complete": 0},
+    "round3": {"rounds_complete": 2},
+    "final": {"rounds_complete": 4},
+}
+# scenarios walk every remaining outcome for every person, past this many people a run takes minutes
+SCENARIO_PEOPLE = 1000
+
+
+def load_bracket(path: str) -> dict:
+    with open(path, "r") as f:
+        record = json.load(f)
+    return record.get("payload", record)  # a YEAR/bracket.json or a bare api response
+
+
+def record_fixtures():
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for name, kwargs in FIXTURES.items():
+        with open(os.path.join(FIXTURES_DIR, f"{name}.json"), "w") as f:
+            json.dump(make_bracket_payload(**kwargs), f, indent=1)
+
+
+def write_pool(folder: str, api: NhlApiHandler, num_people: int) -> list[str]:
+    # a roundN.csv for every round whose series are set, the way the google form exports them
+    paths = []
+    for round, letters in enumerate(ALL_SERIES, start=1):
+        if any(api.get_series(letter).top_seed is None for letter in letters):
+            break
+        path = os.path.join(folder, f"round{round}.csv")
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Timestamp", "Your name"] + ["Team", "Games"] * len(letters))
+            writer.writerows(make_csv_rows(api, num_people, round))
+        paths.append(path)
+    return paths
+
+
+def run_stages(payload: dict, csv_paths: list[str], measure: Callable, skip: set[str]) -> dict[str, tuple]:
+    # measure(func) runs func and records it, stages run in the order render runs them
+    results = {}
+
+    def stage(name: str, func: Callable):
+        if name in skip:
+            return None
+        value, results[name] = measure(func)
+        return value
+
+    api = NhlApiHandler(YEAR)
+    stage("load bracket", lambda: api.load(payload))
+    all_picks = stage("read picks", lambda: [
+        read_round_picks(path, api, YEAR, round) for round, path in enumerate(csv_paths, start=1)
+    ])
+    all_rows = stage("build_data", lambda: [
+        build_data(SCORING[i], api, picks_by_person, ALL_SERIES[i]) for i, picks_by_person in enumerate(all_picks)
+    ])
+    projections = stage(
+        "projections",
+        lambda: ProjectionCalculator(all_rows, all_picks, api, YEAR).calculate(SCORING, api.get_scf_teams())
+    )
+    scenarios = stage("scenarios", lambda: ScenarioCalculator(all_rows, all_picks, api, SCORING).calculate())
+    max_points = stage("max points", lambda: MaxPointsSolver(all_rows, all_picks, api, SCORING).solve())
+    html_generator = stage("summary+ranks", lambda: HtmlGenerator(api, all_rows, max_points))
+    stage("leaders", lambda: LeaderCalculator().calculate(html_generator.standings))
+    stage("html", lambda: html_generator.make_html(SCORING, YEAR, projections, scenarios))
+    return results
+
+
+def timed(func: Callable) -> tuple:
+    start = time.perf_counter()
+    value = func()
+    return value, time.perf_counter() - start
+
+
+def traced(func: Callable) -> tuple:
+    tracemalloc.start()
+    try:
+        value = func()
+        return value, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(sizes: list[int], fixture: str, memory: bool, scenario_people: int) -> list[dict]:
+    payload = load_bracket(fixture)
+    api = NhlApiHandler(YEAR)
+    api.load(payload)
+
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as folder:
+            csv_paths = write_pool(folder, api, size)
+            skip = {"scenarios"} if size > scenario_people else set()
+            seconds = run_stages(payload, csv_paths, timed, skip)
+            # a second pass under tracemalloc, tracing slows everything so it isn't timed
+            peaks = run_stages(payload, csv_paths, traced, skip) if memory else {}
+        for stage, stage_seconds in seconds.items():
+            results.append({
+                "people": size,
+                "stage": stage,
+                "seconds": round(stage_seconds, 6),
+                "peak_bytes": peaks.get(stage),
+            })
+    return results
+
+
+def print_results(results: list[dict], baseline: list[dict]):
+    before = {(r["people"], r["stage"]): r for r in baseline}
+    print(f"{'People':>8} {'Stage':<14} {'Seconds':>9} {'Peak (MB)':>10} {'Baseline (s)':>13} {'Change':>8}")
+    for r in results:
+        peak = f"{r['peak_bytes'] / 1e6:.1f}" if r["peak_bytes"] is not None else "-"
+        old = before.get((r["people"], r["stage"]))
+        if old and old["seconds"]:
+            comparison = f"{old['seconds']:>13.4f} {r['seconds'] / old['seconds'] - 1:>+8.0%}"
+        else:
+            comparison = f"{'-':>13} {'-':>8}"
+        print(f"{r['people']:>8} {r['stage']:<14} {r['seconds']:>9.4f} {peak:>10} {comparison}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--people", type=int, nargs="+", default=[16, 1000, 10000, 100000])
+    parser.add_argument(
+        "--bracket",
+        default=os.path.join(FIXTURES_DIR, "round3.json"),
+        help="a recorded bracket, one of benchmarks/fixtures or any YEAR/bracket.json"
+    )
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument(
+        "--scenario-people",
+        type=int,
+        default=SCENARIO_PEOPLE,
+        help="skip the scenarios stage for pools bigger than this"
+    )
+    parser.add_argument("--save", help="where to write the results, default benchmarks/results/<commit>.json")
+    parser.add_argument("--compare", help="a saved results file to compare against")
+    parser.add_argument("--record-fixtures", action="store_true", help="regenerate benchmarks/fixtures and exit")
+    args = parser.parse_args()
+
+    if args.record_fixtures:
+        record_fixtures()
+    else:
+        revision = git_revision()
+        results = run(args.people, args.bracket, not args.no_memory, args.scenario_people)
+        baseline = []
+        if args.compare:
+            with open(args.compare, "r") as f:
+                baseline = json.load(f)["results"]
+        print_results(results, baseline)
+
+        save_path = args.save or os.path.join(RESULTS_DIR, f"{revision}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(save_path)), exist_ok=True)
+        with open(save_path, "w") as f:
+            json.dump({"revision": revision, "bracket": os.path.basename(args.bracket), "results": results}, f, indent=1)
+        print(f"Saved to {save_path}")
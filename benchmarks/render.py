@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+import argparse
+import time
+
+from app.csv_to_html import SCORING, build_data
+from app.html_generator import HtmlGenerator
+from app.series import ALL_SERIES
+
+from .synthetic import make_api, make_bracket_payload, make_picks
+
+
+def render(api, all_rows, use_templates: bool) -> tuple[float, str]:
+    start = time.perf_counter()
+    html = HtmlGenerator(api, list(all_rows), use_templates=use_templates).make_html(SCORING, 2024, {})
+    return time.perf_counter() - start, html
+
+
+def run(sizes: list[int]):
+    api = make_api(make_bracket_payload())
+
+    print(f"{'People':>8} {'Airium (s)':>11} {'Templates (s)':>14} {'Speedup':>8} {'Page (MB)':>10}")
+    for size in sizes:
+        all_picks = make_picks(api, size)
+        all_rows = [
+            build_data(SCORING[i], api, picks_by_person, ALL_SERIES[i])
+            for i, picks_by_person in enumerate(all_picks)
+        ]
+        airium_seconds, airium_html = render(api, all_rows, False)
+        template_seconds, template_html = render(api, all_rows, True)
+        if airium_html != template_html:
+            raise Exception(f"template output differs from airium for {size} people")
+        print(
+            f"{size:>8} {airium_seconds:>11.3f} {template_seconds:>14.3f} "
+            f"{airium_seconds / template_seconds:>7.1f}x {len(template_html) / 1e6:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--people", type=int, nargs="+", default=[16, 1000, 50000])
+    args = parser.parse_args()
+    run(args.people)
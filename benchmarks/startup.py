@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from app.bracket_cache import CachedBracket, DiskStorage
+
+from .synthetic import make_api, make_bracket_payload, make_csv_rows
+
+# cold start budget in milliseconds, this fails when a change goes over it
+IMPORT_BUDGET_MS = 150
+FIRST_CALL_BUDGET_MS = 1500  # mostly counting round one scenarios
+YEAR = 2025  # a year without a hardcoded pick order, so synthetic picks follow the api's
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# runs in a fresh interpreter so nothing is imported yet, the same as a cold lambda container
+FIRST_CALL_SCRIPT = """
+import json, sys, time
+import lambda_handler
+from app.bracket_cache import BracketCache, DiskStorage
+start = time.perf_counter()
+chunks, _ = lambda_handler.render(sys.argv[1], BracketCache(DiskStorage("."), offline=True))
+html = "".join(chunks)
+print(json.dumps({"first_call_ms": (time.perf_counter() - start) * 1000}))
+"""
+
+
+def import_times(statement: str) -> list[tuple[int, int, str]]:
+    # (self us, cumulative us, module) for every module imported while running statement
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=PACKAGE_ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        times.append((int(self_us), int(cumulative_us), module.strip()))
+    return times
+
+
+def make_season(folder: str, num_people: int):
+    # a pool in the middle of the first round, recorded so the first call never needs the network
+    payload = make_bracket_payload(rounds_complete=0)
+    DiskStorage(folder).write(YEAR, CachedBracket(payload, None, None, 0))
+    rows = make_csv_rows(make_api(payload, YEAR), num_people)
+    with open(os.path.join(folder, str(YEAR), "round1.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Timestamp", "Your name"] + ["Team", "Games"] * 8)
+        writer.writerows(rows)
+
+
+def first_call(num_people: int) -> dict[str, float]:
+    with tempfile.TemporaryDirectory() as folder:
+        make_season(folder, num_people)
+        result = subprocess.run(
+            [sys.executable, "-c", FIRST_CALL_SCRIPT, str(YEAR)],
+            cwd=folder,
+            env={**os.environ, "PYTHONPATH": PACKAGE_ROOT},
+            capture_output=True,
+            text=True,
+            check=True
+        )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def run(num_people: int, top: int) -> bool:
+    # the interpreter imports some modules before any of ours, leave those out
+    startup_modules = {module for _, _, module in import_times("pass")}
+    times = [t for t in import_times("import lambda_handler") if t[2] not in startup_modules]
+    total_us = next(cumulative for _, cumulative, module in times if module == "lambda_handler")
+    print("Slowest imports under lambda_handler (python -X importtime):")
+    print(f"{'Self (ms)':>10} {'Total (ms)':>11}  Module")
+    for self_us, cumulative_us, module in sorted(times, reverse=True)[:top]:
+        print(f"{self_us / 1000:>10.1f} {cumulative_us / 1000:>11.1f}  {module}")
+
+    timings = first_call(num_people)
+    checks = [
+        ("import lambda_handler", total_us / 1000, IMPORT_BUDGET_MS),
+        (f"first render, {num_people} people", timings["first_call_ms"], FIRST_CALL_BUDGET_MS),
+    ]
+    print()
+    print(f"{'Stage':<28} {'ms':>8} {'Budget':>8}")
+    within_budget = True
+    for name, ms, budget in checks:
+        status = "" if ms <= budget else "  OVER BUDGET"
+        within_budget = within_budget and ms <= budget
+        print(f"{name:<28} {ms:>8.1f} {budget:>8}{status}")
+    return within_budget
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--people", type=int, default=16)
+    parser.add_argument("--top", type=int, default=10, help="how many of the slowest imports to list")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.people, args.top) else 1)
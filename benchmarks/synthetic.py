@@ -0,0 +1,129 @@
+import random
+
+from app.common import Pick
+from app.nhl_api_handler import NhlApiHandler
+from app.series import ALL_SERIES, WINNER_MAP
+
+TEAMS = [
+    ("BOS", "Boston Bruins"),
+    ("CAR", "Carolina Hurricanes"),
+    ("COL", "Colorado Avalanche"),
+    ("DAL", "Dallas Stars"),
+    ("EDM", "Edmonton Oilers"),
+    ("FLA", "Florida Panthers"),
+    ("LAK", "Los Angeles Kings"),
+    ("NSH", "Nashville Predators"),
+    ("NYI", "New York Islanders"),
+    ("NYR", "New York Rangers"),
+    ("TBL", "Tampa Bay Lightning"),
+    ("TOR", "Toronto Maple Leafs"),
+    ("VAN", "Vancouver Canucks"),
+    ("VGK", "Vegas Golden Knights"),
+    ("WPG", "Winnipeg Jets"),
+    ("WSH", "Washington Capitals"),
+]
+ROUND_TITLES = ["First Round", "Second Round", "Conference Final", "Stanley Cup Final"]
+RANKS = ["D1", "D2", "D3", "WC1"]
+
+
+def _team_json(short: str, name: str) -> dict:
+    return {
+        "abbrev": short,
+        "name": {"default": name},
+        "logo": f"https://assets.nhle.com/logos/nhl/svg/{short}_dark.svg",
+    }
+
+
+def make_bracket_payload(
+    seed: int = 0,
+    rounds_complete: int = 4,
+    live_wins: tuple[int, int] = (2, 1)
+) -> dict:
+    # a bracket in the shape of api-web.nhle.com/v1/playoff-bracket/YEAR, with
+    # rounds_complete finished rounds and the next round live at live_wins
+    rng = random.Random(seed)
+    teams = TEAMS[:]
+    rng.shuffle(teams)
+
+    winners: dict[str, tuple[str, str]] = {}
+    ranks: dict[str, str] = {}
+    series_json = []
+    for i, letters in enumerate(ALL_SERIES):
+        if i > rounds_complete:
+            break
+        for j, letter in enumerate(letters):
+            if i == 0:
+                top, bottom = teams[2 * j], teams[2 * j + 1]
+                ranks[top[0]] = RANKS[j % 2]
+                ranks[bottom[0]] = RANKS[2 + j % 2]
+            else:
+                top, bottom = (winners[feeder] for feeder in WINNER_MAP[letter])
+
+            if i < rounds_complete:
+                loser_wins = rng.randint(0, 3)
+                if rng.random() < 0.5:
+                    top_wins, bottom_wins = 4, loser_wins
+                    winners[letter] = top
+                else:
+                    top_wins, bottom_wins = loser_wins, 4
+                    winners[letter] = bottom
+            else:
+                top_wins, bottom_wins = live_wins
+
+            series_json.append({
+                "seriesUrl": f"/series/{letter}",
+                "seriesTitle": ROUND_TITLES[i],
+                "seriesLetter": letter,
+                "playoffRound": i + 1,
+                "topSeedRankAbbrev": ranks[top[0]],
+                "topSeedWins": top_wins,
+                "bottomSeedRankAbbrev": ranks[bottom[0]],
+                "bottomSeedWins": bottom_wins,
+                "topSeedTeam": _team_json(*top),
+                "bottomSeedTeam": _team_json(*bottom),
+            })
+    return {"series": series_json}
+
+
+def make_api(payload: dict, year: int = 2024) -> NhlApiHandler:
+    api = NhlApiHandler(year)
+    api.load(payload)
+    return api
+
+
+def make_picks(
+    api: NhlApiHandler,
+    num_people: int,
+    rounds: int = 4,
+    seed: int = 0
+) -> list[dict[str, list[Pick]]]:
+    rng = random.Random(seed)
+    people = [f"Person{i:06d}" for i in range(num_people)]
+    all_picks = []
+    for letters in ALL_SERIES[:rounds]:
+        series = [api.get_series(letter) for letter in letters]
+        if any(s.top_seed is None for s in series):
+            break
+        all_picks.append({
+            person: [
+                Pick(s.letter, rng.choice([s.top_seed, s.bottom_seed]), rng.randint(4, 7))
+                for s in series
+            ]
+            for person in people
+        })
+    return all_picks
+
+
+def make_csv_rows(api: NhlApiHandler, num_people: int, round: int = 1, seed: int = 0) -> list[list[str]]:
+    # rows as parse_picks expects them, after the header: timestamp, name, then team/games pairs
+    rng = random.Random(seed)
+    series = [api.get_series(letter) for letter in ALL_SERIES[round - 1]]
+    rows = []
+    for i in range(num_people):
+        row = ["4/19/2024 8:21:33", f"Person{i:06d}"]
+        for s in series:
+            team = rng.choice([s.top_seed, s.bottom_seed])
+            row.append(f"{team.name} ({team.rank})")
+            row.append(str(rng.randint(4, 7)))
+        rows.append(row)
+    return rows
@@ -1,8 +1 @@
-for i in {1996..2024}; do
-    if [ -d $i ]; then
-        ./run_locally.py $i;
-    else
-        echo "skipping $i";
-    fi
-done
-
+python3 -m app.build --years 1996-2024 "$@"
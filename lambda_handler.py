@@ -1,20 +1,138 @@
 #!/usr/bin/env python3
+import json
+import os
+import time
 from datetime import datetime
+from functools import lru_cache
 
-import boto3
-
-from app.csv_to_html import main
+from app.bracket_cache import BracketCache, S3Storage
+from app.csv_to_html import render
+from app.fragment_cache import FragmentCache, S3FragmentStorage
+from app.history import S3HistoryStorage, load_history, save_history
+from app.history_html import history_pages
+from app.page_shards import PageShards
+from app.phase_timer import PhaseTimer
+from app.s3_publisher import CSS_CACHE_CONTROL, HTML_CACHE_CONTROL, PublishResult, S3Publisher
+from app.standings_feed import FEED_FILE_NAME, StandingsFeed
+from app.warm_state import WarmState
 
 BUCKET_NAME = "playoff-pools"
+CSS_DIR = "css"
+METRICS_NAMESPACE = "PlayoffPools"
+# parsed picks and the bracket, reused by every invocation this container handles
+WARM_STATE = WarmState()
+
+
+# built on the first invocation rather than at import, then kept for as long as the container stays warm
+# so later invocations reuse the same s3 resource and keep-alive http session
+@lru_cache(maxsize=None)
+def get_bracket_cache() -> BracketCache:
+    return BracketCache(S3Storage(BUCKET_NAME))
+
+
+@lru_cache(maxsize=None)
+def get_fragment_cache() -> FragmentCache:
+    return FragmentCache(S3FragmentStorage(BUCKET_NAME))
+
+
+@lru_cache(maxsize=None)
+def get_history_storage() -> S3HistoryStorage:
+    return S3HistoryStorage(BUCKET_NAME)
+
+
+@lru_cache(maxsize=None)
+def get_publisher() -> S3Publisher:
+    return S3Publisher(BUCKET_NAME)
 
 
 def lambda_handler(event, context):
     current_year = datetime.today().year
-    html, file_name = main(str(current_year))
-    stream_to_s3(html, file_name)
+    history = load_history(get_history_storage())
+    publisher = get_publisher()
+    previous_feed = publisher.read(f"{current_year}/{FEED_FILE_NAME}")
+    feed = StandingsFeed(json.loads(previous_feed) if previous_feed else None)
+    shards = PageShards()
+    timer = PhaseTimer()
+    chunks, file_name = render(
+        str(current_year),
+        get_bracket_cache(),
+        fragment_cache=get_fragment_cache(),
+        state=WARM_STATE,
+        history=history,
+        feed=feed,
+        shards=shards,
+        timer=timer
+    )
+
+    # the page is rendered as it's uploaded, so its render span comes out of the upload time
+    upload_start = time.perf_counter()
+    results = [publisher.publish(file_name, chunks, "text/html; charset=utf-8", HTML_CACHE_CONTROL)]
+    for feed_file_name, text in feed.files().items():
+        results.append(publisher.publish(
+            f"{current_year}/{feed_file_name}",
+            [text],
+            "application/json",
+            HTML_CACHE_CONTROL
+        ))
+    # empty unless the pool is big enough to shard, the shards fill in only as the page streams out
+    for shard_file_name, text in shards.files().items():
+        content_type = "application/json" if shard_file_name.endswith(".json") else "text/html; charset=utf-8"
+        results.append(publisher.publish(
+            f"{current_year}/{shard_file_name}",
+            [text],
+            content_type,
+            HTML_CACHE_CONTROL
+        ))
+    # only this year's season changed, the other years' standings come from history.json
+    save_history(get_history_storage(), history)
+    for history_file_name, html in history_pages(history).items():
+        results.append(publisher.publish(history_file_name, [html], "text/html; charset=utf-8", HTML_CACHE_CONTROL))
+    for css_file in sorted(os.listdir(CSS_DIR)):
+        results.append(publisher.publish_file(
+            os.path.join(CSS_DIR, css_file),
+            f"{CSS_DIR}/{css_file}",
+            "text/css; charset=utf-8",
+            CSS_CACHE_CONTROL
+        ))
+    timer.add(
+        "upload",
+        time.perf_counter() - upload_start - timer.seconds("render"),
+        files=len(results),
+        written_bytes=sum(result.bytes_written for result in results)
+    )
+    print_phase_metrics(timer)
+    print_publish_metrics(results)
+
+
+def print_metrics(dimensions: dict[str, str], metrics: dict[str, tuple[float, str]]):
+    # cloudwatch embedded metric format, lambda ships anything printed like this as metrics.
+    # metrics map a name to its value and unit
+    print(json.dumps({
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": METRICS_NAMESPACE,
+                "Dimensions": [list(dimensions)],
+                "Metrics": [{"Name": name, "Unit": unit} for name, (_, unit) in metrics.items()],
+            }],
+        },
+        **dimensions,
+        **{name: value for name, (value, _) in metrics.items()},
+    }))
+
+
+def print_phase_metrics(timer: PhaseTimer):
+    # one record per span so a phase that ran once per round shows up once per round
+    for span in timer.spans:
+        metrics = {"Duration": (round(span.seconds * 1000, 3), "Milliseconds")}
+        for field, value in span.fields.items():
+            name = "".join(word.capitalize() for word in field.split("_"))
+            metrics[name] = (value, "Bytes" if field.endswith("_bytes") else "Count")
+        print_metrics({"Phase": span.phase}, metrics)
 
 
-def stream_to_s3(html: str, file_name: str):
-    encoded_string = html.encode("utf-8")
-    s3 = boto3.resource("s3")
-    s3.Bucket(BUCKET_NAME).put_object(Key=file_name, Body=encoded_string)
+def print_publish_metrics(results: list[PublishResult]):
+    print_metrics({}, {
+        "BytesWritten": (sum(result.bytes_written for result in results), "Bytes"),
+        "BytesSkipped": (sum(result.bytes_skipped for result in results), "Bytes"),
+    })
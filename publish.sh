@@ -14,8 +14,28 @@ cp ~/localgit/hockeydraft/$year/index.html playoffs/$year.html
 
 sed -i -E 's;\.\./css;css;g' playoffs/$year.html
 
+# big pools load their rows from shards next to the page
+rm -rf playoffs/$year
+if [ -d ~/localgit/hockeydraft/$year/shards ]; then
+    mkdir -p playoffs/$year
+    cp -r ~/localgit/hockeydraft/$year/shards playoffs/$year/
+    sed -i -E "s;\"shards/;\"$year/shards/;g" playoffs/$year.html
+fi
+
+# the year index and all time pages from the last build, linking to the published year pages. They're
+# only written once history.json has every season, until then the published ones are left alone
+history_pages=""
+if [ -f ~/localgit/hockeydraft/index.html ] && [ -f ~/localgit/hockeydraft/all_time.html ]; then
+    cp ~/localgit/hockeydraft/index.html ~/localgit/hockeydraft/all_time.html playoffs/
+    sed -i -E 's;href="([0-9]{4})/index\.html";href="\1.html";g' playoffs/index.html
+    history_pages="playoffs/index.html playoffs/all_time.html"
+else
+    echo "no index.html or all_time.html, build every year with python3 -m app.build to publish them"
+fi
+
 git --no-pager diff && \
-    git add playoffs/$year.html playoffs/index.html playoffs/js && \
+    git add playoffs/$year.html $history_pages playoffs/js && \
+    { git add -A playoffs/$year 2>/dev/null || true; } && \
     git commit -m "$msg" && \
     git push
 
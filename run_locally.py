@@ -1,9 +1,68 @@
 #!/usr/bin/env python3
-import sys
+import argparse
+from contextlib import nullcontext
 
-from app.csv_to_html import main, write_html
+from app.bracket_cache import BracketCache, DiskStorage
+from app.csv_to_html import render, write_html
+from app.fragment_cache import DiskFragmentStorage, FragmentCache
+from app.history import DiskHistoryStorage, load_history, save_history
+from app.history_html import write_history_pages
+from app.page_shards import SHARD_PEOPLE, PageShards, write_shards
+from app.phase_timer import PhaseTimer
+from app.profiling import Profiler
+from app.standings_feed import StandingsFeed, read_feed, write_feed
 
 
 if __name__ == "__main__":
-    html, out_path = main(sys.argv[1])
-    write_html(html, out_path)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("year")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="render only from the recorded YEAR/bracket.json, never call the api"
+    )
+    parser.add_argument(
+        "--simulations",
+        type=int,
+        default=0,
+        help="monte carlo simulations of the rest of the playoffs, uses YEAR/win_probabilities.csv if present"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed for --simulations")
+    parser.add_argument(
+        "--shard-people",
+        type=int,
+        default=SHARD_PEOPLE,
+        help="pools bigger than this get a summary page that loads its rows from YEAR/shards as you scroll or search"
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PREFIX",
+        help="profile the render, writing PREFIX.pstats from cProfile and PREFIX.collapsed for flamegraph.pl"
+    )
+    args = parser.parse_args()
+
+    bracket_cache = BracketCache(DiskStorage("."), offline=args.offline)
+    fragment_cache = FragmentCache(DiskFragmentStorage("."))
+    history_storage = DiskHistoryStorage(".")
+    history = load_history(history_storage)
+    feed = StandingsFeed(read_feed(args.year))
+    shards = PageShards(args.shard_people)
+    timer = PhaseTimer()
+    with Profiler(args.profile) if args.profile else nullcontext():
+        chunks, out_path = render(
+            args.year,
+            bracket_cache,
+            args.simulations,
+            args.seed,
+            fragment_cache,
+            history=history,
+            feed=feed,
+            shards=shards,
+            timer=timer
+        )
+        write_html(chunks, out_path)  # the page is only rendered as it's written
+    write_feed(args.year, feed)
+    write_shards(args.year, shards)
+    save_history(history_storage, history)
+    write_history_pages(history, ".")
+    print(timer.report())
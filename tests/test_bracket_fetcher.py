@@ -0,0 +1,132 @@
+import asyncio
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.bracket_cache import BracketCache, DiskStorage
+from app.bracket_fetcher import BracketFetcher
+from app.bracket_stand_in import make_handler
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "fixtures", "round3.json")
+YEAR = 2025
+
+
+@contextmanager
+def serve(handler: type[BaseHTTPRequestHandler]):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class ScriptedHandler(BaseHTTPRequestHandler):
+    # answers each request with the next (status, delay) of the script, repeating the last one
+    protocol_version = "HTTP/1.1"
+    script: list[tuple[int, float]] = []
+    lock = threading.Lock()
+    hits = 0
+    active = 0
+    most_active = 0
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            status, delay = cls.script[min(cls.hits, len(cls.script) - 1)]
+            cls.hits += 1
+            cls.active += 1
+            cls.most_active = max(cls.most_active, cls.active)
+        try:
+            time.sleep(delay)
+            body = b"{}"
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up
+        finally:
+            with cls.lock:
+                cls.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+def scripted(*script: tuple[int, float]) -> type[ScriptedHandler]:
+    return type("Handler", (ScriptedHandler,), {"script": list(script), "lock": threading.Lock()})
+
+
+def test_retries_a_503():
+    handler = scripted((503, 0), (200, 0))
+    with serve(handler) as url:
+        response = BracketFetcher(backoff_seconds=0.01).fetch(url)
+    assert response.status_code == 200
+    assert handler.hits == 2
+
+
+def test_gives_up_on_a_503_after_the_last_retry():
+    handler = scripted((503, 0))
+    with serve(handler) as url:
+        response = BracketFetcher(retries=2, backoff_seconds=0.01).fetch(url)
+    assert response.status_code == 503
+    assert handler.hits == 3
+
+
+def test_one_deadline_covers_every_attempt():
+    handler = scripted((200, 2))
+    fetcher = BracketFetcher(timeout_seconds=10, deadline_seconds=0.5, retries=3, backoff_seconds=0.01)
+    with serve(handler) as url:
+        start = time.perf_counter()
+        with pytest.raises(asyncio.TimeoutError):
+            fetcher.fetch(url)
+        seconds = time.perf_counter() - start
+    assert handler.hits == 1
+    assert seconds < 1.5  # the stuck thread is cut off by the socket timeout, shrunk to fit the deadline
+
+
+def test_slow_requests_keep_their_slot_past_the_deadline():
+    handler = scripted((200, 0.6), (200, 0))
+    fetcher = BracketFetcher(concurrency=1, deadline_seconds=0.3, retries=0)
+    with serve(handler) as url:
+        with pytest.raises(asyncio.TimeoutError):
+            fetcher.fetch_all({1: (f"{url}/1", {}), 2: (f"{url}/2", {})})
+    # the second request waited for the first's thread instead of hitting the slow server alongside it
+    assert handler.most_active == 1
+
+
+def test_revalidates_with_a_304(tmp_path):
+    bracket_path = tmp_path / "bracket.json"
+    shutil.copy(FIXTURE, bracket_path)
+    seen_etags = []
+
+    class Handler(make_handler(str(bracket_path))):
+        def do_GET(self):
+            seen_etags.append(self.headers.get("If-None-Match"))
+            super().do_GET()
+
+        def log_message(self, *args):
+            pass
+
+    storage = DiskStorage(str(tmp_path))
+    with serve(Handler) as url:
+        cache = BracketCache(storage, ttl_seconds=0)
+        first = cache.get_many({YEAR: url})[YEAR]
+        first_bytes = cache.fetched_bytes[YEAR]
+        stored = storage.read(YEAR)
+        second = cache.get_many({YEAR: url})[YEAR]
+
+    with open(FIXTURE, "r") as f:
+        assert first == second == json.load(f)
+    assert seen_etags == [None, stored.etag]
+    assert (first_bytes, cache.fetched_bytes[YEAR]) == (os.path.getsize(FIXTURE), 0)
+    assert storage.read(YEAR).fetched_at >= stored.fetched_at
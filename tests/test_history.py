@@ -0,0 +1,27 @@
+from app.history import HistoryIndex, Season, Standing
+
+
+def season(year: int, complete: bool, ranks: dict[str, int]) -> Season:
+    standings = [
+        Standing(person, rank, 10 - rank, 10 - rank, [10 - rank, 0, 0, 0], 1, 1, 2)
+        for person, rank in ranks.items()
+    ]
+    winner = next((person for person, rank in ranks.items() if rank == 1), None) if complete else None
+    return Season(year, complete, winner, standings)
+
+
+def test_careers_only_count_finished_seasons():
+    history = HistoryIndex()
+    history.update(season(2023, True, {"Marc": 2, "Jaclyn": 1}))
+    history.update(season(2024, False, {"Marc": 1, "Jaclyn": 2, "Stephanie": 3}))
+
+    assert set(history.careers) == {"Marc", "Jaclyn"}
+    assert (history.careers["Marc"].seasons, history.careers["Marc"].best_finish()) == (1, 2)
+    assert history.careers["Jaclyn"].titles == 1
+    assert history.to_json() == HistoryIndex.from_json(history.to_json()).to_json()
+
+    # a lead that doesn't hold until the end never counts
+    history.update(season(2024, True, {"Marc": 3, "Jaclyn": 1, "Stephanie": 2}))
+    assert (history.careers["Marc"].seasons, history.careers["Marc"].best_finish()) == (2, 2)
+    assert history.careers["Jaclyn"].titles == 2
+    assert history.careers["Stephanie"].finishes == {2024: 2}
@@ -0,0 +1,122 @@
+import csv
+import json
+import queue
+import threading
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from app.bracket_stand_in import make_handler
+from app.live_daemon import LiveDaemon, PollSchedule
+from benchmarks.synthetic import make_api, make_bracket_payload, make_csv_rows
+
+YEAR = 2025  # no hardcoded pick order, so the synthetic picks follow the api's
+PEOPLE = 4
+
+
+@contextmanager
+def stand_in(bracket_path: str, requests: list):
+    # app.bracket_stand_in serving bracket_path, noting the status of every response
+    class Handler(make_handler(bracket_path)):
+        def send_response(self, code, message=None):
+            requests.append(code)
+            super().send_response(code, message)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    # a first round in progress and everyone's picks for it, returns the bracket's path and payload
+    monkeypatch.chdir(tmp_path)
+    payload = make_bracket_payload(rounds_complete=0, live_wins=(2, 1))
+    (tmp_path / str(YEAR)).mkdir()
+    with open(tmp_path / str(YEAR) / "round1.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Timestamp", "Name"])
+        writer.writerows(make_csv_rows(make_api(payload, YEAR), PEOPLE))
+    bracket_path = tmp_path / "bracket.json"
+    bracket_path.write_text(json.dumps(payload))
+    return bracket_path, payload
+
+
+def counting_renders(daemon: LiveDaemon) -> list:
+    renders = []
+    refresh = daemon.refresh
+
+    def counted():
+        renders.append(1)
+        refresh()
+
+    daemon.refresh = counted
+    return renders
+
+
+def test_a_304_is_not_rendered_again(pool):
+    bracket_path, _ = pool
+    requests = []
+    with stand_in(str(bracket_path), requests) as url:
+        daemon = LiveDaemon(YEAR, url)
+        renders = counting_renders(daemon)
+        assert daemon.poll()[0]
+        assert not daemon.poll()[0]
+    assert requests == [200, 304]
+    assert len(renders) == 1
+    assert "new EventSource('events')" in daemon.html
+
+
+def test_unchanged_scores_are_not_rendered_again(pool):
+    bracket_path, payload = pool
+    requests = []
+    with stand_in(str(bracket_path), requests) as url:
+        daemon = LiveDaemon(YEAR, url)
+        renders = counting_renders(daemon)
+        daemon.poll()
+        # a new response, but only a logo moved
+        payload["series"][0]["topSeedTeam"]["logo"] = "https://example.com/logo.svg"
+        bracket_path.write_text(json.dumps(payload))
+        assert not daemon.poll()[0]
+    assert requests == [200, 200]
+    assert len(renders) == 1
+
+
+def test_a_win_pushes_one_delta(pool):
+    bracket_path, payload = pool
+    requests = []
+    with stand_in(str(bracket_path), requests) as url:
+        daemon = LiveDaemon(YEAR, url)
+        daemon.poll()
+        revision = daemon.document["revision"]
+        client = daemon.broadcaster.subscribe()
+        payload["series"][0]["topSeedWins"] += 1
+        bracket_path.write_text(json.dumps(payload))
+        assert daemon.poll()[0]
+
+    event, data = client.get_nowait()
+    with pytest.raises(queue.Empty):
+        client.get_nowait()
+    delta = json.loads(data)
+    assert event == "delta"
+    assert (delta["from"], delta["to"]) == (revision, daemon.document["revision"])
+    assert [["series", "A", "top_seed_wins"], 3] in delta["set"]
+
+
+def test_poll_schedule_backs_off_and_resets():
+    schedule = PollSchedule(active_seconds=(10, 30), idle_seconds=(100, 400))
+    assert [schedule.next(False, True) for _ in range(5)] == [10, 15, 22.5, 30, 30]
+    assert schedule.next(True, True) == 10
+    # waiting on the next round starts from the idle floor and backs off to its ceiling
+    assert [schedule.next(False, False) for _ in range(5)] == [100, 150, 225, 337.5, 400]
+    assert schedule.next(True, False) == 100
+    assert schedule.next(False, True) == 30
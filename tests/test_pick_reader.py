@@ -0,0 +1,26 @@
+import pytest
+
+from app.pick_reader import LEGACY, NO_GAMES, parse_picks
+from app.series import ALL_SERIES
+from benchmarks.synthetic import make_api, make_bracket_payload
+
+API = make_api(make_bracket_payload(rounds_complete=3), 2025)
+
+
+def legacy_row(round: int, games: list[int]) -> list[str]:
+    # "Team - games" for the top seed of every series in the round
+    letters = ALL_SERIES[round - 1]
+    return ["Marc"] + [f"{API.get_series(letter).top_seed.short} - {g}" for letter, g in zip(letters, games)]
+
+
+def test_the_final_can_have_no_games():
+    picks_by_person = parse_picks([legacy_row(4, [NO_GAMES])], API, ALL_SERIES[3], LEGACY)
+    assert picks_by_person["Marc"][0].games == NO_GAMES
+
+
+@pytest.mark.parametrize("round", [1, 2, 3])
+def test_other_rounds_need_games(round):
+    games = [6] * len(ALL_SERIES[round - 1])
+    games[-1] = NO_GAMES
+    with pytest.raises(Exception, match=f"series {ALL_SERIES[round - 1][-1]} must be 4-7, only the final can be 0"):
+        parse_picks([legacy_row(round, games)], API, ALL_SERIES[round - 1], LEGACY)
@@ -0,0 +1,56 @@
+import os
+import shutil
+
+import pytest
+
+import app.csv_to_html as csv_to_html
+import app.pick_store as pick_store
+from app.bracket_cache import BracketCache, DiskStorage
+from app.csv_to_html import read_round_picks
+from app.nhl_api_handler import NhlApiHandler
+from app.pick_store import PICK_STORE_FILE_NAME, PickStore, compile_store, is_store_current
+
+YEAR = 2022
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+
+def compile_year(tmp_path, monkeypatch) -> NhlApiHandler:
+    shutil.copytree(os.path.join(ROOT, str(YEAR)), tmp_path / str(YEAR))
+    monkeypatch.chdir(tmp_path)
+    nhl_api_handler = NhlApiHandler(YEAR, BracketCache(DiskStorage("."), offline=True))
+    payload = nhl_api_handler.fetch()
+    nhl_api_handler.load(payload)
+    compile_store(PICK_STORE_FILE_NAME, {YEAR: payload})
+    return nhl_api_handler
+
+
+def test_stored_rounds_match_the_csvs(tmp_path, monkeypatch):
+    nhl_api_handler = compile_year(tmp_path, monkeypatch)
+    store = PickStore(PICK_STORE_FILE_NAME)
+    assert is_store_current(PICK_STORE_FILE_NAME, [YEAR])
+    for round in range(1, 5):
+        file_path = os.path.join(str(YEAR), f"round{round}.csv")
+        assert read_round_picks(file_path, nhl_api_handler, YEAR, round, store) == \
+            read_round_picks(file_path, nhl_api_handler, YEAR, round)
+
+
+def test_a_new_series_order_makes_the_round_stale(tmp_path, monkeypatch):
+    nhl_api_handler = compile_year(tmp_path, monkeypatch)
+    store = PickStore(PICK_STORE_FILE_NAME)
+    order = csv_to_html.get_series_import_order
+
+    def swapped(year: int, round: int) -> list[str]:
+        letters = order(year, round)
+        return letters[::-1] if round == 2 else letters
+
+    monkeypatch.setattr(csv_to_html, "get_series_import_order", swapped)
+    assert not is_store_current(PICK_STORE_FILE_NAME, [YEAR])
+    # read again from the csv and checked against the new order, which its picks don't fit
+    with pytest.raises(Exception, match="isn't in series"):
+        read_round_picks(os.path.join(str(YEAR), "round2.csv"), nhl_api_handler, YEAR, 2, store)
+
+
+def test_a_new_reader_version_makes_every_round_stale(tmp_path, monkeypatch):
+    compile_year(tmp_path, monkeypatch)
+    monkeypatch.setattr(pick_store, "PICK_READER_VERSION", pick_store.PICK_READER_VERSION + 1)
+    assert not is_store_current(PICK_STORE_FILE_NAME, [YEAR])
@@ -0,0 +1,36 @@
+import random
+
+import pytest
+
+from app.csv_to_html import SCORING, build_data
+from app.round_scores import RoundScores
+from app.series import ALL_SERIES
+from app.standings import calculate_standings
+from benchmarks.incremental import play_games
+from benchmarks.synthetic import make_api, make_bracket_payload, make_picks
+
+PEOPLE = 50
+UPDATES = 60
+
+
+@pytest.mark.parametrize("rounds_complete", [0, 1, 2, 3])
+def test_updates_match_a_full_rescore(rounds_complete):
+    # random games a few at a time until the live round is over, every poll checked against a full rescore
+    rng = random.Random(rounds_complete)
+    payload = make_bracket_payload(rounds_complete, rounds_complete=rounds_complete, live_wins=(0, 0))
+    api = make_api(payload, 2025)
+    all_picks = make_picks(api, PEOPLE, rounds=rounds_complete + 1, seed=rounds_complete)
+    rounds = range(len(all_picks))
+    round_scores = [
+        RoundScores(build_data(SCORING[i], api, all_picks[i], ALL_SERIES[i]), api, SCORING[i], ALL_SERIES[i])
+        for i in rounds
+    ]
+
+    for update in range(UPDATES):
+        play_games(rng, payload)
+        api.reload(payload)
+        incremental_rows = [scores.update(api) for scores in round_scores]
+        full_rows = [build_data(SCORING[i], api, all_picks[i], ALL_SERIES[i]) for i in rounds]
+        assert incremental_rows == full_rows, f"poll {update}"
+        assert calculate_standings(incremental_rows) == calculate_standings(full_rows), f"poll {update}"
+    assert all(api.get_series(letter).is_over() for letter in ALL_SERIES[rounds_complete])
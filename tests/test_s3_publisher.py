@@ -0,0 +1,126 @@
+import gzip
+import hashlib
+import random
+import tempfile
+
+import pytest
+from botocore.exceptions import ClientError
+
+from app.s3_publisher import CSS_CACHE_CONTROL, HTML_CACHE_CONTROL, MIN_PART_SIZE, S3Publisher
+
+BUCKET = "bucket"
+HTML = "text/html; charset=utf-8"
+
+
+class MemoryS3:
+    # the two calls S3Publisher.publish makes, keeping each upload's body, headers and transfer config
+    def __init__(self):
+        self.objects: dict[str, dict] = {}
+        self.configs: dict[str, object] = {}
+        self.uploads = 0
+
+    def head_object(self, Bucket: str, Key: str) -> dict:
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+        return {"Metadata": self.objects[Key]["Metadata"]}
+
+    def upload_fileobj(self, Fileobj, Bucket: str, Key: str, ExtraArgs: dict = None, Config=None):
+        self.objects[Key] = {"Body": Fileobj.read(), **ExtraArgs}
+        self.configs[Key] = Config
+        self.uploads += 1
+
+
+@pytest.fixture
+def rollovers(monkeypatch) -> list:
+    # one entry for every spool publish writes out to disk
+    rolled = []
+    spool = tempfile.SpooledTemporaryFile
+
+    class RecordingSpool(spool):
+        def rollover(self):
+            if not self._rolled:
+                rolled.append(self._max_size)
+            super().rollover()
+
+    monkeypatch.setattr(tempfile, "SpooledTemporaryFile", RecordingSpool)
+    return rolled
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_uploads_gzipped_with_headers_and_hash(rollovers):
+    s3 = MemoryS3()
+    chunks = ["<html>", "<body>2024</body>", "</html>"]
+    result = S3Publisher(BUCKET, s3).publish("2024/index.html", chunks, HTML, HTML_CACHE_CONTROL)
+
+    stored = s3.objects["2024/index.html"]
+    data = "".join(chunks).encode("utf-8")
+    assert gzip.decompress(stored["Body"]) == data
+    assert stored["ContentType"] == HTML
+    assert stored["ContentEncoding"] == "gzip"
+    assert stored["CacheControl"] == HTML_CACHE_CONTROL
+    assert stored["Metadata"] == {"sha256": sha256(data)}
+    assert result == ("2024/index.html", len(stored["Body"]), 0)
+    assert rollovers == []  # a small page never leaves memory
+
+
+def test_skips_when_the_hash_matches():
+    s3 = MemoryS3()
+    publisher = S3Publisher(BUCKET, s3)
+    first = publisher.publish("2024/index.html", ["<html>", "</html>"], HTML, HTML_CACHE_CONTROL)
+    # chunked differently but the same bytes
+    second = publisher.publish("2024/index.html", ["<html></html>"], HTML, HTML_CACHE_CONTROL)
+
+    assert s3.uploads == 1
+    assert second == ("2024/index.html", 0, first.bytes_written)
+
+
+def test_reuploads_when_the_content_changes():
+    s3 = MemoryS3()
+    publisher = S3Publisher(BUCKET, s3)
+    publisher.publish("2024/index.html", ["<html>1</html>"], HTML, HTML_CACHE_CONTROL)
+    result = publisher.publish("2024/index.html", ["<html>2</html>"], HTML, HTML_CACHE_CONTROL)
+
+    stored = s3.objects["2024/index.html"]
+    assert s3.uploads == 2
+    assert gzip.decompress(stored["Body"]) == b"<html>2</html>"
+    assert stored["Metadata"] == {"sha256": sha256(b"<html>2</html>")}
+    assert result.bytes_written == len(stored["Body"]) and result.bytes_skipped == 0
+
+
+def test_uploads_big_pages_in_parts(rollovers):
+    s3 = MemoryS3()
+    # random bytes barely compress, so the gzip is still more than two parts
+    data = random.Random(0).randbytes(2 * MIN_PART_SIZE + 1000)
+    chunks = [data[i:i + 64 * 1024] for i in range(0, len(data), 64 * 1024)]
+    result = S3Publisher(BUCKET, s3).publish("2024/index.html", chunks, HTML, HTML_CACHE_CONTROL)
+
+    # boto3 splits anything over the threshold into chunksize parts, s3's smallest allowed
+    config = s3.configs["2024/index.html"]
+    assert (config.multipart_threshold, config.multipart_chunksize) == (MIN_PART_SIZE, MIN_PART_SIZE)
+    # compressed into a spool that went to disk once it outgrew a part, rather than all in memory
+    assert rollovers == [MIN_PART_SIZE]
+    stored = s3.objects["2024/index.html"]
+    assert len(stored["Body"]) > 2 * MIN_PART_SIZE
+    assert gzip.decompress(stored["Body"]) == data
+    assert stored["Metadata"] == {"sha256": sha256(data)}
+    assert result.bytes_written == len(stored["Body"])
+
+
+def test_publishes_css_files(tmp_path):
+    s3 = MemoryS3()
+    path = tmp_path / "style.css"
+    path.write_bytes(b".leader { font-weight: bold; }\n")
+    publisher = S3Publisher(BUCKET, s3)
+    publisher.publish_file(str(path), "css/style.css", "text/css; charset=utf-8", CSS_CACHE_CONTROL)
+    again = publisher.publish_file(str(path), "css/style.css", "text/css; charset=utf-8", CSS_CACHE_CONTROL)
+
+    stored = s3.objects["css/style.css"]
+    assert gzip.decompress(stored["Body"]) == path.read_bytes()
+    assert stored["ContentType"] == "text/css; charset=utf-8"
+    assert stored["ContentEncoding"] == "gzip"
+    assert stored["CacheControl"] == CSS_CACHE_CONTROL
+    assert stored["Metadata"] == {"sha256": sha256(path.read_bytes())}
+    assert s3.uploads == 1 and again.bytes_written == 0